@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Output throughput benchmark for CNFgen package
+
+Measures how fast formulas are serialized, in MB/s, for some
+reference formula families. The formulas are built first, and only
+the time spent writing them is measured.
+
+Usage: cgbench.py [dimacs|opb] [repetitions]
+"""
+
+import os
+import sys
+from tempfile import TemporaryFile
+from time import perf_counter
+
+from cnfgen import PigeonholePrinciple, OrderingPrinciple
+from cnfgen import RamseyNumber, RandomKCNF
+
+
+REFERENCE_FAMILIES = [
+    ('php 60 59', lambda: PigeonholePrinciple(60, 59)),
+    ('op 50', lambda: OrderingPrinciple(50)),
+    ('ram 4 4 12', lambda: RamseyNumber(4, 4, 12)),
+    ('randkcnf 3 10000 40000', lambda: RandomKCNF(3, 10000, 40000)),
+]
+
+
+def throughput(F, fileformat, repetitions):
+    """Best output throughput in MB/s over some repetitions"""
+    best = None
+    size = 0
+    for _ in range(repetitions):
+        with TemporaryFile(mode='w+', encoding='ascii') as output:
+            start = perf_counter()
+            F.to_file(output, fileformat=fileformat, export_header=False)
+            output.flush()
+            elapsed = perf_counter() - start
+            size = os.fstat(output.fileno()).st_size
+        best = elapsed if best is None else min(best, elapsed)
+    return size, size / (best or 1e-9) / 2**20
+
+
+def main():
+    fileformat = sys.argv[1] if len(sys.argv) > 1 else 'dimacs'
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    if fileformat not in ['dimacs', 'opb']:
+        print("Usage: {} [dimacs|opb] [repetitions]".format(sys.argv[0]),
+              file=sys.stderr)
+        sys.exit(-1)
+
+    print("{:<25} {:>12} {:>10}".format('formula', 'bytes', 'MB/s'))
+    for name, build in REFERENCE_FAMILIES:
+        F = build()
+        size, speed = throughput(F, fileformat, repetitions)
+        print("{:<25} {:>12} {:>10.1f}".format(name, size, speed))
+
+
+if __name__ == '__main__':
+    main()
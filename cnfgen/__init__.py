@@ -9,6 +9,11 @@ transformations implemented, plus some IO functions.
 
 # Basic CNF object
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.cnf import CompactCNF
+from cnfgen.formula.cnf import StreamingCNF
+from cnfgen.formula.cnf import CountingCNF
+from cnfgen.formula.cnf import ShardCNF
+from cnfgen.formula.cnf import PipelineCNF
 
 # Graph IO functions
 from cnfgen.graphs import readGraph, writeGraph
@@ -16,6 +21,9 @@ from cnfgen.graphs import supported_graph_formats
 from cnfgen.graphs import Graph
 from cnfgen.graphs import DirectedGraph
 from cnfgen.graphs import BipartiteGraph
+from cnfgen.graphs import FrozenGraph
+from cnfgen.graphs import FrozenDirectedGraph
+from cnfgen.graphs import FrozenBipartiteGraph
 
 # SAT solvers
 from cnfgen.utils.solver import supported_satsolvers
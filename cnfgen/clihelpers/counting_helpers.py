@@ -8,15 +8,20 @@ https://massimolauria.net/cnfgen/
 
 from cnfgen.families.counting import CountingPrinciple, MutilatedChessboard
 from cnfgen.families.counting import PerfectMatchingPrinciple
+from cnfgen.families.counting import CountingPrincipleSize
+from cnfgen.families.counting import PerfectMatchingPrincipleSize
 from cnfgen.families.tseitin import TseitinFormula
+from cnfgen.families.tseitin import TseitinFormulaSize
+from cnfgen.formula.sizes import FormulaSize, parity_size
 from cnfgen.families.subsetcardinality import SubsetCardinalityFormula
+from cnfgen.formula.linear import CARDINALITY_ENCODINGS
 
 from cnfgen.clitools import ObtainSimpleGraph
 from cnfgen.clitools import ObtainBipartiteGraph
 from cnfgen.clitools import make_graph_from_spec, make_graph_doc
 
 from cnfgen.clitools import CLIParser, compose_two_parsers
-from cnfgen.clitools import positive_int, nonnegative_int
+from cnfgen.clitools import positive_int, nonnegative_int, parity_width
 
 from .formula_helpers import FormulaHelper
 
@@ -50,7 +55,11 @@ optional arguments:
 
     @staticmethod
     def build_formula(args, formula_class):
-        return CountingPrinciple(args.N, 2)
+        return CountingPrinciple(args.N, 2, formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        return CountingPrincipleSize(args.N, 2)
 
 
 class PMatchingCmdHelper(FormulaHelper):
@@ -79,7 +88,11 @@ optional arguments:
 
     @staticmethod
     def build_formula(args, formula_class):
-        return PerfectMatchingPrinciple(args.G)
+        return PerfectMatchingPrinciple(args.G, formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        return PerfectMatchingPrincipleSize(args.G)
 
 
 class CountingCmdHelper(FormulaHelper):
@@ -116,6 +129,10 @@ optional arguments:
         """
         return CountingPrinciple(args.M, args.p,formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return CountingPrincipleSize(args.M, args.p)
+
 
 tse_help_usage = """usage:
  {0} N                --- random 4-regular graph with N vertices.
@@ -148,6 +165,8 @@ positional arguments:
   <graph>        --- a simple undirected graph (see 'cnfgen --help-graph')
 
 optional arguments:
+  --xor-width W         split parities wider than W (at least 3) into
+                        chains of parities, with auxiliary variables
   --help, -h            show this help message and exit
 """
 
@@ -198,6 +217,11 @@ class TseitinCmdHelper(FormulaHelper):
             action=ObtainSimpleGraph)
 
         tsaction = compose_two_parsers(shortcut, longform)
+        parser.add_argument('--xor-width',
+                            metavar='W',
+                            type=parity_width,
+                            default=None,
+                            help="split wider parities into chains")
         parser.add_argument('args',
                             action=tsaction,
                             nargs='*',
@@ -262,7 +286,43 @@ class TseitinCmdHelper(FormulaHelper):
                 raise ValueError(
                     'Illegal charge specification on command line')
 
-        return TseitinFormula(G, charge)
+        return TseitinFormula(G, charge, maxwidth=args.xor_width,
+                              formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        """Size of the Tseitin formula
+
+        With random charges the size is an upper bound, because
+        the charge of isolated vertices matters."""
+        if not hasattr(args, 'G'):
+            N = args.N
+            d = args.d
+            if N <= d or N * d % 2 == 1:
+                raise ValueError(
+                    "There are no {}-regular graphs with {} vertices.".format(d, N))
+            size = parity_size(d, 1, args.xor_width)
+            return FormulaSize(N * d // 2 + N * size.variables,
+                               N * size.clauses,
+                               N * size.literals)
+        G = args.G
+        if not hasattr(args, 'charge') or args.charge == 'first':
+            charge = None
+        elif args.charge == 'zero':
+            charge = [0] * G.order()
+        else:
+            charge = [1] * G.order()
+        return TseitinFormulaSize(G, charge, maxwidth=args.xor_width)
+
+    @staticmethod
+    def size_is_upper_bound(args):
+        """Random charges matter only on isolated vertices"""
+        if not hasattr(args, 'G'):
+            return args.d == 0
+        if not hasattr(args, 'charge') or \
+           args.charge in ('first', 'zero', 'one'):
+            return False
+        return any(args.G.degree(v) == 0 for v in args.G.vertices())
 
 
 ssc_help_usage = """usage:
@@ -293,6 +353,8 @@ positional arguments:
 
 optional arguments:
   --equal, -e        encode cardinality constraints as equations
+  --encoding E       encoding of cardinality constraints (default: naive)
+                     {2}
   --help, -h         show this help message and exit
 """
 class SCCmdHelper(FormulaHelper):
@@ -304,7 +366,8 @@ class SCCmdHelper(FormulaHelper):
         parser.usage = ssc_help_usage.format(
             parser.prog, " " * len(parser.prog))
         parser.description = ssc_help_description.format(
-            parser.prog, " " * len(parser.prog))
+            parser.prog, " " * len(parser.prog),
+            ", ".join(CARDINALITY_ENCODINGS))
 
         # now we setup the main parser for the formula generation command
         firstparser = CLIParser()
@@ -324,6 +387,10 @@ class SCCmdHelper(FormulaHelper):
                             default=False,
                             action='store_true',
                             help="encode cardinality constraints as equations")
+        parser.add_argument('--encoding',
+                            default='naive',
+                            choices=CARDINALITY_ENCODINGS,
+                            help="encoding of cardinality constraints")
         parser.add_argument('args',
                             metavar='<graph_description>',
                             action=scaction,
@@ -340,6 +407,7 @@ class SCCmdHelper(FormulaHelper):
         elif hasattr(args, 'B'):
             B = args.B
         return SubsetCardinalityFormula(B, args.equal,
+                                        encoding=args.encoding,
                                         formula_class=formula_class)
 
 
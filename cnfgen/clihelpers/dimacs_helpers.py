@@ -9,9 +9,11 @@ https://massimolauria.net/cnfgen/
 import argparse
 from cnfgen.formula.cnf import CNF
 from cnfgen.utils.parsedimacs import from_dimacs_file
+from cnfgen.utils.binaryformat import is_binary_file, from_binary_file
 
 from cnfgen.clitools import interactive_msg
 from cnfgen.clitools import msg_prefix
+from cnfgen.clitools.cmdline import CompressedFileType
 
 from cnfgen.clihelpers.formula_helpers import FormulaHelper
 
@@ -42,7 +44,7 @@ class DimacsCmdHelper(FormulaHelper):
         parser.add_argument('input',
                             nargs='?',
                             help=argparse.SUPPRESS,
-                            type=argparse.FileType('r'),
+                            type=CompressedFileType('r'),
                             default='-')
 
     @staticmethod
@@ -53,5 +55,7 @@ class DimacsCmdHelper(FormulaHelper):
         with msg_prefix("INPUT: "):
             interactive_msg(msg)
 
+        if is_binary_file(args.input):
+            return from_binary_file(formula_class, args.input)
         F = from_dimacs_file(formula_class,args.input)
         return F
@@ -19,3 +19,23 @@ class FormulaHelper:
     def build_formula(args, formula_class):
         """Buil the CNF according to the parameters on the command line"""
         raise NotImplementedError("Formula family helper must be subclassed")
+
+    @staticmethod
+    def estimate_size(args):
+        """Size of the CNF described by the command line
+
+        Returns a :py:class:`cnfgen.formula.sizes.FormulaSize` computed
+        without building the formula, or `None` when the family has
+        no closed formula for its size. In the latter case the size can
+        be computed by building the formula as a
+        :py:class:`cnfgen.formula.cnf.CountingCNF`."""
+        return None
+
+    @staticmethod
+    def size_is_upper_bound(args):
+        """Whether the size from :py:meth:`estimate_size` may be larger
+        than the actual size of the formula
+
+        For example when the size depends on random choices made
+        while building the formula."""
+        return False
@@ -7,8 +7,10 @@ https://massimolauria.net/cnfgen/
 """
 import argparse
 
+from cnfgen.formula.linear import CARDINALITY_ENCODINGS
 from cnfgen.families.coloring import GraphColoringFormula
 from cnfgen.families.coloring import EvenColoringFormula
+from cnfgen.families.coloring import GraphColoringFormulaSize
 
 from cnfgen.families.dominatingset import DominatingSet
 from cnfgen.families.dominatingset import Tiling
@@ -65,6 +67,10 @@ optional arguments:
         return GraphColoringFormula(args.G, args.k,
                                     formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return GraphColoringFormulaSize(args.G, args.k)
+
 
 class ECCmdHelper(FormulaHelper):
     name = 'ec'
@@ -72,7 +78,7 @@ class ECCmdHelper(FormulaHelper):
     @staticmethod
     def setup_command_line(parser):
 
-        parser.usage = "usage:\n {0} [-h|--help] G".format(parser.prog)
+        parser.usage = "usage:\n {0} [-h|--help] [--encoding E] G".format(parser.prog)
 
         parser.description = """The formula is defined on a graph G and claims that it is possible
 to split the edges of the graph in two parts, so that each vertex has
@@ -89,13 +95,18 @@ positional arguments:
   G                       a simple undirected graph (see 'cnfgen --help-graph')
 
 optional arguments:
+  --encoding E            encoding of cardinality constraints (default: naive)
+                          {0}
   --help, -h              show this help message and exit
-"""
+""".format(", ".join(CARDINALITY_ENCODINGS))
+        parser.add_argument('--encoding', default='naive',
+                            choices=CARDINALITY_ENCODINGS)
         parser.add_argument('G', action=ObtainSimpleGraph)
 
     @staticmethod
     def build_formula(args, formula_class):
         return EvenColoringFormula(args.G,
+                                   encoding=args.encoding,
                                    formula_class=formula_class)
 
 
@@ -161,7 +172,7 @@ class TilingCmdHelper(FormulaHelper):
         Arguments:
         - `parser`: parser to load with options.
         """
-        parser.usage = """usage:\n {0} [-h|--help] G""".format(parser.prog)
+        parser.usage = """usage:\n {0} [-h|--help] [--encoding E] G""".format(parser.prog)
 
         parser.description = """The formula encodes the fact that the graph G has a tiling.
 This means that it is possible to pick a subset of vertices D so that
@@ -171,8 +182,12 @@ positional arguments:
   G                       a simple undirected graph (see 'cnfgen --help-graph')
 
 optional arguments:
+  --encoding E            encoding of cardinality constraints (default: naive)
+                          {0}
   --help, -h              show this help message and exit
-"""
+""".format(", ".join(CARDINALITY_ENCODINGS))
+        parser.add_argument('--encoding', default='naive',
+                            choices=CARDINALITY_ENCODINGS)
         parser.add_argument('G', action=ObtainSimpleGraph)
 
     @staticmethod
@@ -182,7 +197,8 @@ optional arguments:
         Arguments:
         - `args`: command line options
         """
-        return Tiling(args.G,formula_class=formula_class)
+        return Tiling(args.G, encoding=args.encoding,
+                      formula_class=formula_class)
 
 
 iso_description = """The formula takes one or two graphs as input.
@@ -10,6 +10,9 @@ import argparse
 
 from cnfgen.families.ordering import OrderingPrinciple
 from cnfgen.families.ordering import GraphOrderingPrinciple
+from cnfgen.families.ordering import OrderingPrincipleSize
+from cnfgen.families.ordering import GraphOrderingPrincipleSize
+from cnfgen.families.ordering import _ordering_size
 
 from cnfgen.clitools import ObtainSimpleGraph
 from cnfgen.clitools import CLIParser, compose_two_parsers
@@ -145,3 +148,20 @@ class OPCmdHelper(FormulaHelper):
             return OrderingPrinciple(args.N, args.total, args.smart,
                                      args.plant, args.knuth,
                                      formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        if hasattr(args, 'G'):
+            return GraphOrderingPrincipleSize(args.G, args.total, args.smart,
+                                              args.plant, args.knuth)
+        elif hasattr(args, 'd') and args.d is not None:
+            # the size only depends on the degrees of the graph
+            if args.N * args.d % 2 == 1:
+                raise ValueError(
+                    "There are no {}-regular graphs with {} vertices".format(
+                        args.d, args.N))
+            return _ordering_size([args.d] * args.N, args.total, args.smart,
+                                  args.plant, args.knuth)
+        else:
+            return OrderingPrincipleSize(args.N, args.total, args.smart,
+                                         args.plant, args.knuth)
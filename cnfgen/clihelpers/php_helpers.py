@@ -10,12 +10,18 @@ from cnfgen.families.cliquecoloring import CliqueColoring
 from cnfgen.families.ramsey import RamseyNumber
 from cnfgen.families.ramsey import PythagoreanTriples
 from cnfgen.families.ramsey import VanDerWaerden
+from cnfgen.families.ramsey import RamseyNumberSize
+from cnfgen.families.ramsey import VanDerWaerdenSize
 
 from cnfgen.families.pigeonhole import PigeonholePrinciple
 from cnfgen.families.pigeonhole import GraphPigeonholePrinciple
 from cnfgen.families.pigeonhole import BinaryPigeonholePrinciple
 
 from cnfgen.families.pigeonhole import RelativizedPigeonholePrinciple
+from cnfgen.families.pigeonhole import PigeonholePrincipleSize
+from cnfgen.families.pigeonhole import GraphPigeonholePrincipleSize
+from cnfgen.families.pigeonhole import BinaryPigeonholePrincipleSize
+from cnfgen.families.pigeonhole import RelativizedPigeonholePrincipleSize
 
 from cnfgen.graphs import bipartite_random_left_regular
 
@@ -170,6 +176,20 @@ class PHPCmdHelper(FormulaHelper):
                                             onto=args.onto,
                                             formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        """Size of the PHP formula (not on random graphs)"""
+        if hasattr(args, 'B') and args.B is not None:
+            return GraphPigeonholePrincipleSize(args.B,
+                                                functional=args.functional,
+                                                onto=args.onto)
+        elif args.holes == args.degree:
+            return PigeonholePrincipleSize(args.pigeons,
+                                           args.holes,
+                                           functional=args.functional,
+                                           onto=args.onto)
+        return None
+
 
 class BPHPCmdHelper(FormulaHelper):
     """Command line helper for the Pigeonhole principle CNF"""
@@ -219,6 +239,10 @@ optional arguments:
         return BinaryPigeonholePrinciple(args.M, args.N,
                                          formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return BinaryPigeonholePrincipleSize(args.M, args.N)
+
 
 class CliqueColoringCmdHelper(FormulaHelper):
     """Command line helper for the Clique-coclique CNF"""
@@ -320,6 +344,10 @@ optional arguments:
         return RamseyNumber(args.s, args.k, args.N,
                             formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return RamseyNumberSize(args.s, args.k, args.N)
+
 
 vdw_help_usage = """usage:
  {0} N k1 k2             --- claims vdw(k1,k2) > N
@@ -378,6 +406,10 @@ class VDWCmdHelper(FormulaHelper):
         return VanDerWaerden(args.N, args.k1, args.k2, *args.ks,
                              formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return VanDerWaerdenSize(args.N, args.k1, args.k2, *args.ks)
+
 
 class PTNCmdHelper(FormulaHelper):
     """Command line helper for PTN formulas
@@ -481,3 +513,9 @@ optional arguments:
                                               args.resting_places,
                                               args.holes,
                                               formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        return RelativizedPigeonholePrincipleSize(args.pigeons,
+                                                  args.resting_places,
+                                                  args.holes)
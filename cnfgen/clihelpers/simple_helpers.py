@@ -7,9 +7,9 @@ https://massimolauria.net/cnfgen/
 """
 
 from cnfgen.formula.cnf import CNF
-from cnfgen.families.randomformulas import RandomKCNF
-from cnfgen.families.randomkxor import RandomKXOR
-from cnfgen.clitools import nonnegative_int, positive_int
+from cnfgen.families.randomformulas import RandomKCNF, RandomKCNFSize
+from cnfgen.families.randomkxor import RandomKXOR, RandomKXORSize
+from cnfgen.clitools import nonnegative_int, positive_int, parity_width
 from .formula_helpers import FormulaHelper
 
 import random
@@ -213,6 +213,10 @@ optional arguments:
             return RandomKCNF(args.k, args.n, args.m,
                               formula_class=formula_class)
 
+    @staticmethod
+    def estimate_size(args):
+        return RandomKCNFSize(args.k, args.n, args.m)
+
 class RandXorHelper(FormulaHelper):
     """Command line helper for random formulas
     """
@@ -226,7 +230,7 @@ class RandXorHelper(FormulaHelper):
         Arguments:
         - `parser`: parser to load with options.
         """
-        parser.usage = "usage:\n {0} [-h|--help] [-p|--plant] <k> <n> <m>".format(parser.prog)
+        parser.usage = "usage:\n {0} [-h|--help] [-p|--plant] [--xor-width W] <k> <n> <m>".format(parser.prog)
         parser.description = """ Sample <m> parity constraints over <n> variables, each of width <k>,
 uniformly at random. The sampling is done without repetition, meaning
 that whenever a xor is already in the formula, it is never
@@ -239,6 +243,8 @@ positional arguments:
 
 optional arguments:
   --plant, -p          plant a random satisfying assignment (default: no)
+  --xor-width W        split parities wider than W (at least 3) into
+                       chains of parities, with auxiliary variables
   --help, -h           show this help message and exit
 """
         parser.add_argument('k', type=positive_int)
@@ -248,6 +254,10 @@ optional arguments:
                             '-p',
                             action='store_true',
                             default=False)
+        parser.add_argument('--xor-width',
+                            metavar='W',
+                            type=parity_width,
+                            default=None)
 
     @staticmethod
     def build_formula(args, formula_class):
@@ -263,7 +273,14 @@ optional arguments:
                               args.n,
                               args.m,
                               planted_assignments=[planted],
+                              maxwidth=args.xor_width,
                               formula_class=formula_class)
         else:
             return RandomKXOR(args.k, args.n, args.m,
+                              maxwidth=args.xor_width,
                               formula_class=formula_class)
+
+    @staticmethod
+    def estimate_size(args):
+        return RandomKXORSize(args.k, args.n, args.m,
+                              maxwidth=args.xor_width)
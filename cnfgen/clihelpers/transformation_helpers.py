@@ -9,6 +9,7 @@ https://massimolauria.net/cnfgen/
 import argparse
 
 # Formula transformation implemented
+from cnfgen.formula.cnf import CNF
 from cnfgen.transformations.shuffle import Shuffle
 from cnfgen.transformations.substitutions import AllEqualSubstitution
 from cnfgen.transformations.substitutions import ExactlyOneSubstitution
@@ -27,11 +28,20 @@ from cnfgen.transformations.substitutions import XorSubstitution
 
 from cnfgen.clitools import ObtainBipartiteGraph, make_graph_doc, make_graph_from_spec
 from cnfgen.clitools import CLIParser, positive_int, compose_two_parsers
+from cnfgen.clitools import parity_width
 
 
 class TransformationHelper:
-    """Command line helper for a formula family"""
+    """Command line helper for a formula family
+
+    If ``streaming`` is true, the transformation can produce its
+    clauses lazily from the ones of the original formula, when it is
+    asked for a formula of class
+    :py:class:`cnfgen.formula.cnf.PipelineCNF`. Transformations that
+    need the whole formula at once set it to false.
+    """
     name = ""
+    streaming = True
 
     @staticmethod
     def setup_command_line(parser):
@@ -40,7 +50,7 @@ class TransformationHelper:
             "Transformation family helper must be subclassed")
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
         """Build the new CNF by applying the transformation"""
         raise NotImplementedError(
             "Transformation family helper must be subclassed")
@@ -50,6 +60,8 @@ class ShuffleCmd(TransformationHelper):
     """Shuffle
     """
     name = 'shuffle'
+    # the permutation of clauses needs all of them
+    streaming = False
 
     @staticmethod
     def setup_command_line(parser):
@@ -87,7 +99,7 @@ optional arguments:
                             dest='no_clauses_permutation')
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
         return Shuffle(
             F,
             polarity_flips='fixed' if args.no_polarity_flips else 'shuffle',
@@ -119,7 +131,7 @@ optional arguments:
         pass
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
         return F
 
 
@@ -144,8 +156,8 @@ optional arguments:
         parser.add_argument('N', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return OrSubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return OrSubstitution(F, args.N, formula_class=formula_class)
 
 
 class XorSubstitutionCmd(TransformationHelper):
@@ -153,7 +165,7 @@ class XorSubstitutionCmd(TransformationHelper):
 
     @staticmethod
     def setup_command_line(parser):
-        parser.usage = "usage:\n {0} N".format(parser.prog)
+        parser.usage = "usage:\n {0} [--xor-width W] N".format(parser.prog)
 
         parser.description =\
 """The value of each original variable X substituted with the
@@ -164,13 +176,21 @@ positional arguments:
   N                   the arity of the sum
 
 optional arguments:
+  --xor-width W       keep X as an auxiliary variable equal to the
+                      sum, encoded as a chain of parities of width
+                      at most W (at least 3)
   --help, -h          show this help message and exit
 """
         parser.add_argument('N', type=positive_int)
+        parser.add_argument('--xor-width',
+                            metavar='W',
+                            type=parity_width,
+                            default=None)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return XorSubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return XorSubstitution(F, args.N, maxwidth=args.xor_width,
+                               formula_class=formula_class)
 
 
 class AllEqualsSubstitutionCmd(TransformationHelper):
@@ -194,8 +214,8 @@ optional arguments:
         parser.add_argument('N', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return AllEqualSubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return AllEqualSubstitution(F, args.N, formula_class=formula_class)
 
 
 class NeqSubstitutionCmd(TransformationHelper):
@@ -219,8 +239,8 @@ optional arguments:
         parser.add_argument('N', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return NotAllEqualSubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return NotAllEqualSubstitution(F, args.N, formula_class=formula_class)
 
 
 class MajSubstitution(TransformationHelper):
@@ -244,8 +264,8 @@ optional arguments:
         parser.add_argument('N', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return MajoritySubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return MajoritySubstitution(F, args.N, formula_class=formula_class)
 
 
 class IfThenElseSubstitutionCmd(TransformationHelper):
@@ -264,8 +284,8 @@ optional arguments:
 """
 
     @staticmethod
-    def transform_cnf(F, args):
-        return IfThenElseSubstitution(F)
+    def transform_cnf(F, args, formula_class=CNF):
+        return IfThenElseSubstitution(F, formula_class=formula_class)
 
 
 class ExactlyOneSubstitutionCmd(TransformationHelper):
@@ -288,8 +308,8 @@ optional arguments:
         parser.add_argument('N', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return ExactlyOneSubstitution(F, args.N)
+    def transform_cnf(F, args, formula_class=CNF):
+        return ExactlyOneSubstitution(F, args.N, formula_class=formula_class)
 
 
 class AtLeastKSubstitutionCmd(TransformationHelper):
@@ -314,8 +334,9 @@ optional arguments:
         parser.add_argument('K', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return AtLeastKSubstitution(F, args.N, args.K)
+    def transform_cnf(F, args, formula_class=CNF):
+        return AtLeastKSubstitution(F, args.N, args.K,
+                                    formula_class=formula_class)
 
 
 class AtMostKSubstitutionCmd(TransformationHelper):
@@ -340,8 +361,9 @@ optional arguments:
         parser.add_argument('K', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return AtMostKSubstitution(F, args.N, args.K)
+    def transform_cnf(F, args, formula_class=CNF):
+        return AtMostKSubstitution(F, args.N, args.K,
+                                   formula_class=formula_class)
 
 
 class ExactlyKSubstitutionCmd(TransformationHelper):
@@ -366,8 +388,9 @@ optional arguments:
         parser.add_argument('K', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return ExactlyKSubstitution(F, args.N, args.K)
+    def transform_cnf(F, args, formula_class=CNF):
+        return ExactlyKSubstitution(F, args.N, args.K,
+                                    formula_class=formula_class)
 
 
 class AnythingButKSubstitutionCmd(TransformationHelper):
@@ -392,8 +415,9 @@ optional arguments:
         parser.add_argument('K', type=positive_int)
 
     @staticmethod
-    def transform_cnf(F, args):
-        return AnythingButKSubstitution(F, args.N, args.K)
+    def transform_cnf(F, args, formula_class=CNF):
+        return AnythingButKSubstitution(F, args.N, args.K,
+                                        formula_class=formula_class)
 
 
 # Technically lifting is not a substitution, therefore it should be in
@@ -425,8 +449,8 @@ optional arguments:
         parser.add_argument('k', type=positive_int, action='store')
 
     @staticmethod
-    def transform_cnf(F, args):
-        return FormulaLifting(F, args.k)
+    def transform_cnf(F, args, formula_class=CNF):
+        return FormulaLifting(F, args.k, formula_class=formula_class)
 
 
 class FlipCmd(TransformationHelper):
@@ -438,9 +462,9 @@ class FlipCmd(TransformationHelper):
         parser.description ="Inverts the polarity of all literals in the formula."
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
 
-        return FlipPolarity(F)
+        return FlipPolarity(F, formula_class=formula_class)
 
 
 class XorCompressionCmd(TransformationHelper):
@@ -493,7 +517,7 @@ optional arguments:
                             help=argparse.SUPPRESS)
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
         if hasattr(args, 'N'):
             N = args.N
             d = args.d
@@ -502,7 +526,8 @@ optional arguments:
         elif hasattr(args, 'B'):
             B = args.B
 
-        return VariableCompression(F, B, function='xor')
+        return VariableCompression(F, B, function='xor',
+                                   formula_class=formula_class)
 
 
 class MajCompressionCmd(TransformationHelper):
@@ -555,7 +580,7 @@ optional arguments:
                             help=argparse.SUPPRESS)
 
     @staticmethod
-    def transform_cnf(F, args):
+    def transform_cnf(F, args, formula_class=CNF):
         if hasattr(args, 'N'):
             N = args.N
             d = args.d
@@ -564,4 +589,5 @@ optional arguments:
         elif hasattr(args, 'B'):
             B = args.B
 
-        return VariableCompression(F, B, function='maj')
+        return VariableCompression(F, B, function='maj',
+                                   formula_class=formula_class)
@@ -2,6 +2,7 @@
 
 from cnfgen.clitools.cnfgen import cli as cnfgen
 from cnfgen.clitools.cnfshuffle import cli as cnfshuffle
+from cnfgen.clitools.cnfmerge import cli as cnfmerge
 from cnfgen.clitools.kthlist2pebbling import cli as kthlist2pebbling
 
 from cnfgen.clitools.cmdline import CLIError
@@ -25,3 +26,5 @@ from cnfgen.clitools.cmdline import redirect_stdin
 from cnfgen.clitools.cmdline import positive_int
 from cnfgen.clitools.cmdline import positive_even_int
 from cnfgen.clitools.cmdline import nonnegative_int
+from cnfgen.clitools.cmdline import parity_width
+from cnfgen.clitools.cmdline import shard_spec
@@ -18,12 +18,14 @@ import argparse
 import subprocess
 import tempfile
 import signal
+import random
 import importlib
 
 from contextlib import redirect_stdout
 from contextlib import contextmanager
 
 from cnfgen.clitools.graph_args import ObtainGraphAction
+from cnfgen.utils.compression import open_file, compression_from_name
 
 
 @contextmanager
@@ -254,6 +256,28 @@ def positive_even_int(value):
     return ivalue
 
 
+def parity_width(value):
+    errmsg = "{} was supposed to be an integer larger than 2".format(value)
+    try:
+        ivalue = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(errmsg)
+    if ivalue < 3:
+        raise argparse.ArgumentTypeError(errmsg)
+    return ivalue
+
+
+def shard_spec(value):
+    errmsg = "{} was supposed to be a shard i/k with 1 <= i <= k".format(value)
+    try:
+        i, k = (int(x) for x in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(errmsg)
+    if not 1 <= i <= k:
+        raise argparse.ArgumentTypeError(errmsg)
+    return (i, k)
+
+
 def probability(value):
     errmsg = "{} was supposed to be a real number in [0,1]".format(value)
     try:
@@ -265,6 +289,33 @@ def probability(value):
     return p
 
 
+class SeedAction(argparse.Action):
+    """Seed the random generator as soon as the option is parsed
+
+    Graphs in the arguments of the formulas are built while the
+    command line is parsed, so random graphs depend on the seed only
+    if it is set before them."""
+    def __call__(self, parser, args, values, option_string=None):
+        setattr(args, self.dest, values)
+        random.seed(values)
+
+
+class CompressedFileType(argparse.FileType):
+    """Argument type for files which may be compressed
+
+    Same as :py:class:`argparse.FileType`, but if the file name has
+    a compression extension (e.g. '.gz', '.xz') the file is compressed
+    or decompressed on the fly. Only for text files."""
+    def __call__(self, string):
+        if string == '-' or compression_from_name(string) is None:
+            return argparse.FileType.__call__(self, string)
+        try:
+            return open_file(string, self._mode, encoding=self._encoding or 'utf-8')
+        except (OSError, ImportError) as e:
+            msg = "can't open '{}': {}".format(string, e)
+            raise argparse.ArgumentTypeError(msg)
+
+
 def compose_two_parsers(parser1, parser2, test=None):
     """Merge to parsers  create the corresponding action
 
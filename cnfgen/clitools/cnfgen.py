@@ -33,6 +33,7 @@ import sys
 import random
 import io
 import argparse
+from itertools import islice
 
 from cnfgen.info import info
 from cnfgen.formula.cnfio import guess_output_format
@@ -40,6 +41,9 @@ from cnfgen.formula.cnfio import guess_output_format
 from cnfgen.clitools.cmdline import paginate_or_redirect_stdout
 from cnfgen.clitools.cmdline import setup_SIGINT
 from cnfgen.clitools.cmdline import CLIParser, CLIError, CLIHelpFormatter
+from cnfgen.clitools.cmdline import CompressedFileType
+from cnfgen.clitools.cmdline import nonnegative_int, positive_int
+from cnfgen.clitools.cmdline import shard_spec, SeedAction
 
 from cnfgen.clitools.cmdline import get_formula_helpers
 from cnfgen.clitools.cmdline import get_transformation_helpers
@@ -49,6 +53,14 @@ from cnfgen.clitools.msg import msg_prefix
 from cnfgen.clitools.msg import InternalBug
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.cnf import StreamingCNF
+from cnfgen.formula.cnf import CountingCNF
+from cnfgen.formula.cnf import ShardCNF
+from cnfgen.formula.cnf import PipelineCNF
+
+from cnfgen.utils.parsedimacs import shard_range
+from cnfgen.utils.compression import compression_from_name
+from cnfgen.utils.parsedimacs import write_dimacs_fragment, write_manifest
 
 from cnfgen.clitools.graph_docs import make_graph_doc
 
@@ -83,11 +95,16 @@ optional arguments:
                         Save the formula to <output>.
                         Setting '<output>' to '-' sends the
                         formula to standard output. (default: -)
-  --output-format {latex,dimacs,opb}, -of {latex,dimacs,opb}
+                        Output is compressed if <output> ends with
+                        '.gz', '.bz2', '.xz' or '.zst'.
+  --output-format {latex,dimacs,opb,binary}, -of {latex,dimacs,opb,binary}
                         Output format of the formulas. 'latex' is
                         convenient to insert formulas into papers, and
                         'dimacs' is the format used by sat solvers.
                         The 'opb' format is suitable for pseudo boolean solvers.
+                        The 'binary' format is fast to load from
+                        python, and cannot be compressed. Output files
+                        ending with '.cnfb' are binary by default.
                         (default: dimacs)
   --latex, -l           Outputs formula in 'latex' format
   --seed <seed>, -S <seed>
@@ -97,6 +114,33 @@ optional arguments:
   --verbose, -v         Output formula header and comments.
   --quiet, -q           Output just the formula with no header.
   --varnames            Output map from variable indices to names.
+  --streaming           Spool clauses to disk while the formula is
+                        generated, and copy them to the DIMACS output
+                        at the end. Memory usage does not depend on
+                        the number of clauses.
+  --dry-run, --size-only
+                        Print the number of variables, clauses and
+                        literals of the formula instead of the
+                        formula. For most families the size is
+                        computed without generating the formula,
+                        otherwise a notice is printed on stderr.
+  --jobs <N>, -j <N>    Generate the clauses with <N> processes, for
+                        the formula families that support it (e.g.
+                        ram, vdw, op, iso, subgraph). The output does
+                        not depend on <N>. (default: 1)
+  --shard <i>/<k>       Output only the <i>-th of <k> consecutive
+                        slices of the clauses, as a DIMACS fragment
+                        with no header and no 'p cnf' line. A
+                        manifest with the number of variables and
+                        clauses and the random seed is saved in
+                        '<output>.manifest'. Needs '--seed'.
+                        Use 'cnfmerge' to join the fragments.
+                        Without transformations only the slice is
+                        kept in memory.
+  --max-literals <L>    Stop with an error if the formula has more
+                        than <L> literals. When the size can be
+                        computed in advance, the formula is not
+                        generated at all.
 
 Choices for <formula>:
     and                 a single conjunction
@@ -298,13 +342,13 @@ def setup_command_line_parsers(progname, fhelpers, thelpers):
     parser.add_argument(
         '--output',
         '-o',
-        type=argparse.FileType('w', encoding='utf-8'),
+        type=CompressedFileType('w', encoding='utf-8'),
         metavar="<output>",
         default='-')
     ofgroup = parser.add_mutually_exclusive_group()
     ofgroup.add_argument('--output-format',
                          '-of',
-                         choices=['latex', 'dimacs','opb'],
+                         choices=['latex', 'dimacs', 'opb', 'binary'],
                          default=None)
     ofgroup.add_argument('--latex',
                          '-l',
@@ -316,7 +360,7 @@ def setup_command_line_parsers(progname, fhelpers, thelpers):
                         metavar="<seed>",
                         default=None,
                         type=int,
-                        action='store')
+                        action=SeedAction)
     g = parser.add_mutually_exclusive_group()
     g.add_argument('--verbose',
                    '-v',
@@ -330,6 +374,27 @@ def setup_command_line_parsers(progname, fhelpers, thelpers):
     parser.add_argument('--varnames',
                         action='store_true',
                         default=False)
+    parser.add_argument('--streaming',
+                        action='store_true',
+                        default=False)
+    parser.add_argument('--dry-run',
+                        '--size-only',
+                        dest='size_only',
+                        action='store_true',
+                        default=False)
+    parser.add_argument('--max-literals',
+                        metavar="<L>",
+                        default=None,
+                        type=nonnegative_int)
+    parser.add_argument('--jobs',
+                        '-j',
+                        metavar="<N>",
+                        default=1,
+                        type=positive_int)
+    parser.add_argument('--shard',
+                        metavar="<i>/<k>",
+                        default=None,
+                        type=shard_spec)
 
     # setup each formula command parser
     subparsers = parser.add_subparsers(prog=progname,
@@ -385,6 +450,46 @@ def parse_command_line(argv, fparser, tparser):
     return fargs, targs
 
 
+def formula_size(args):
+    """Size of the formula described by the command line
+
+    The size is computed by the formula helper when possible,
+    otherwise the formula is built with a clause storage that only
+    counts the clauses. In the latter case the construction stops as
+    soon as the formula exceeds the literal budget, if any.
+
+    Parameters
+    ----------
+    args:
+        parsed arguments for the formula
+
+    Return
+    ------
+    (cnfgen.formula.sizes.FormulaSize, str)
+        the size, and a notice when it is not computed in closed
+        form or when it is only an upper bound (otherwise `None`)
+    """
+    size = args.generator.estimate_size(args)
+    if size is not None:
+        if args.generator.size_is_upper_bound(args):
+            return size, "upper bound, the actual size depends on random choices"
+        return size, None
+
+    class BudgetCNF(CountingCNF):
+        literal_budget = args.max_literals
+
+    size = args.generator.build_formula(args, formula_class=BudgetCNF).size()
+    return size, "no closed form, computed by building the formula"
+
+
+def check_literal_budget(parser, literals, budget):
+    """Stop with an error if there are too many literals"""
+    if budget is not None and literals > budget:
+        parser.error(
+            "the formula has {} literals, more than the limit of {}.\n".format(
+                literals, budget))
+
+
 def build_latex_cmdline_description(argv, args, t_args):
     """Build the latex documentation of the components of the formula.
 
@@ -484,7 +589,7 @@ def cli(argv=None, mode='output'):
 
     # Correctly infer the comment character, useful to shield
     # the output.
-    comment_char = {'dimacs': 'c ', 'latex': '% ', 'opb': '* '}
+    comment_char = {'dimacs': 'c ', 'latex': '% ', 'opb': '* ', 'binary': 'c '}
     try:
         cprefix = comment_char[output_format]
     except KeyError as e:
@@ -504,31 +609,119 @@ def cli(argv=None, mode='output'):
                 )
 
         # Generate the formula and apply transformations
-        if hasattr(args, 'seed') and args.seed:
+        if getattr(args, 'seed', None) is not None:
             random.seed(args.seed)
 
+        def report_size(size, notice=None):
+            text = "variables {}\nclauses {}\nliterals {}\n".format(*size)
+            if mode == 'formula':
+                return size
+            if notice is not None:
+                with msg_prefix("SIZE: "):
+                    error_msg(notice)
+            if mode == 'string':
+                return text
+            args.output.write(text)
+            if args.output is not sys.stdout:
+                args.output.close()
+            return None
+
+        if output_format == 'binary' and \
+           compression_from_name(getattr(args.output, 'name', '')):
+            parser.error("The binary format cannot be compressed.\n")
+
+        if args.shard is not None and not args.size_only:
+            if output_format != 'dimacs':
+                parser.error("Only DIMACS output can be split in shards.\n")
+            if mode == 'output' and args.output is sys.stdout:
+                parser.error("Option '--shard' needs an output file.\n")
+            if args.seed is None:
+                parser.error("Option '--shard' needs a random seed, so that all\n"
+                             "the shards come from the same formula.\n")
+
+        # Size of the formula, when it can be computed in advance
+        shard_window = None
+        if len(t_args) == 0 and \
+           (args.size_only or args.max_literals is not None or
+            args.shard is not None):
+            try:
+                size, notice = formula_size(args)
+            except (CLIError, ValueError) as e:
+                args.generator.subparser.error(e)
+            except RuntimeError as e:
+                raise InternalBug(e) from e
+            check_literal_budget(parser, size.literals, args.max_literals)
+            if args.size_only:
+                return report_size(size, notice)
+            if args.shard is not None:
+                shard_window = shard_range(size.clauses, *args.shard)
+            # same random choices as in the counting pass
+            if getattr(args, 'seed', None) is not None:
+                random.seed(args.seed)
+
+        formula_class = StreamingCNF if args.streaming else CNF
+        if shard_window is not None:
+            class WindowCNF(ShardCNF):
+                clause_window = shard_window
+            formula_class = WindowCNF
+        if args.jobs > 1:
+            class ParallelCNF(formula_class):
+                jobs = args.jobs
+            formula_class = ParallelCNF
         try:
-            cnf = args.generator.build_formula(args, formula_class=CNF)
+            cnf = args.generator.build_formula(args, formula_class=formula_class)
         except (CLIError, ValueError) as e:
             args.generator.subparser.error(e)
         except RuntimeError as e:
             raise InternalBug(e) from e
+        if args.max_literals is not None:
+            check_literal_budget(parser, cnf.number_of_literals(),
+                                 args.max_literals)
 
+        # Transformations compute their clauses lazily when the
+        # formula is written, unless they need the whole formula.
         for argdict in t_args:
+            transformation = argdict.transformation
+            t_class = PipelineCNF if transformation.streaming else CNF
             try:
-                cnf = argdict.transformation.transform_cnf(cnf, argdict)
+                cnf = transformation.transform_cnf(cnf, argdict,
+                                                   formula_class=t_class)
             except (CLIError, ValueError) as e:
                 argdict.transformation.subparser.error(e)
             except RuntimeError as e:
                 raise InternalBug(e) from e
+            if args.max_literals is not None:
+                check_literal_budget(parser, cnf.number_of_literals(),
+                                     args.max_literals)
 
-        if hasattr(args, 'seed') and args.seed:
+        if args.size_only:
+            return report_size(cnf.size(),
+                               "transformed formula, computed by building it")
+
+        if getattr(args, 'seed', None) is not None:
             cnf.header['random seed'] = args.seed
         cnf.header['command line'] = "cnfgen " + " ".join(argv[1:])
 
         if mode == 'formula':
             return cnf
 
+        if args.shard is not None:
+            if shard_window is None:
+                start, stop = shard_range(cnf.number_of_clauses(), *args.shard)
+                clauses = islice(cnf, start, stop)
+            else:
+                clauses = iter(cnf)
+            if mode == 'string':
+                fragment = io.StringIO()
+                write_dimacs_fragment(clauses, fragment)
+                return fragment.getvalue()
+            m = write_dimacs_fragment(clauses, args.output)
+            write_manifest(args.output.name, *args.shard,
+                           cnf.number_of_variables(), m, args.seed)
+            if args.output is not sys.stdout:
+                args.output.close()
+            return None
+
         if mode == 'string':
             if output_format == 'latex':
                 return cnf.to_latex()
@@ -539,6 +732,11 @@ def cli(argv=None, mode='output'):
             if output_format == 'dimacs':
                 return cnf.to_dimacs()
 
+            if output_format == 'binary':
+                output = io.BytesIO()
+                cnf.to_file(output, fileformat='binary')
+                return output.getvalue()
+
             raise InternalBug("Unknown output format")
 
         extra_text = build_latex_cmdline_description(argv, args, t_args)
@@ -547,6 +745,8 @@ def cli(argv=None, mode='output'):
                     export_header=args.verbose,
                     export_varnames=args.varnames,
                     extra_text=extra_text)
+        if args.output is not sys.stdout:
+            args.output.close()
 
     return None
 
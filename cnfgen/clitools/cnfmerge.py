@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Merge the shards of a CNF formula."""
+
+import os
+import sys
+import errno
+from io import StringIO
+
+from cnfgen.utils.parsedimacs import merge_dimacs_fragments
+
+from cnfgen.clitools.cmdline import setup_SIGINT
+from cnfgen.clitools.cmdline import CLIParser, CLIError
+from cnfgen.clitools.cmdline import CompressedFileType
+
+from cnfgen.clitools.msg import error_msg
+from cnfgen.clitools.msg import InternalBug
+
+
+def cli(argv=sys.argv, mode='output'):
+    """CNFgen fragment merger
+
+    This function provide the main interface to cnfmerge.
+
+    Parameters
+    ----------
+    argv: list, optional
+        The list of token with the command line arguments/options.
+
+    mode: str
+        One among 'string', 'output' (latter is the default)
+        - 'string' return the string with the merged formula
+        - 'output' output the formula to the user
+    """
+
+    # Parse the command line arguments
+    progname = os.path.basename(argv[0])
+    parser = CLIParser(prog=progname,
+                       description="""
+    Merge the DIMACS fragments produced by 'cnfgen --shard i/k'
+    into a single DIMACS file. Each fragment must have its manifest
+    file next to it. The fragments are copied without being parsed.
+    """,
+                       epilog="""
+    For more information type '%s [--help | -h ]'
+    """ % (progname))
+
+    parser.add_argument('--output',
+                        '-o',
+                        type=CompressedFileType('w'),
+                        metavar="<output>",
+                        default='-',
+                        help="""Output file. The formula is saved
+                        on file instead of being sent to standard
+                        output. Setting '<output>' to '-' is another
+                        way to send the formula to standard output.
+                        The output is compressed if the file name
+                        ends with '.gz', '.bz2', '.xz' or '.zst'.
+                        (default: -)
+                        """)
+    parser.add_argument('fragments',
+                        metavar="<fragment>",
+                        nargs='+',
+                        help="""The fragments of the formula, in
+                        any order.""")
+
+    # Be lenient on non string arguments
+    argv = [str(x) for x in argv]
+
+    # Process the options
+    args = parser.parse_args(argv[1:])
+
+    output = StringIO() if mode == 'string' else args.output
+    try:
+        merge_dimacs_fragments(args.fragments, output)
+    except (OSError, ValueError) as e:
+        parser.error(e)
+
+    if mode == 'string':
+        return output.getvalue()
+    if args.output is not sys.stdout:
+        args.output.close()
+
+
+# Launcher
+def main():
+    setup_SIGINT()
+
+    try:
+
+        cli(sys.argv)
+
+    except CLIError as e:
+        error_msg(str(e))
+        sys.exit(-1)
+
+    except InternalBug as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(-1)
+
+    except OSError as e:
+        # avoid errors when stdout is closed before the end of the
+        # program (i.e. piping into a command line which does
+        # not work.)
+        if e.errno != errno.EPIPE:
+            error_msg("I/O ERROR: " + str(e))
+            sys.exit(-1)
+
+    # avoid signaling BrokenPipeError as whatnot
+    sys.stderr.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,18 @@
 
 import os
 import sys
+import errno
 import random
-import argparse
+from io import StringIO
 
 from cnfgen.formula.cnf import CNF
-from cnfgen.transformations.shuffle import Shuffle
+from cnfgen.transformations.shuffle import Shuffle, shuffle_dimacs
+from cnfgen.transformations.shuffle import BUCKET_SIZE
 
 from cnfgen.clitools.cmdline import setup_SIGINT
 from cnfgen.clitools.cmdline import CLIParser, CLIError
+from cnfgen.clitools.cmdline import CompressedFileType
+from cnfgen.clitools.cmdline import positive_int
 
 from cnfgen.clitools.msg import interactive_msg
 from cnfgen.clitools.msg import error_msg
@@ -51,13 +55,15 @@ def cli(argv=sys.argv, mode='output'):
 
     parser.add_argument('--output',
                         '-o',
-                        type=argparse.FileType('w'),
+                        type=CompressedFileType('w'),
                         metavar="<output>",
                         default='-',
                         help="""Output file. The formula is saved
                         on file instead of being sent to standard
                         output. Setting '<output>' to '-' is another
                         way to send the formula to standard output.
+                        The output is compressed if the file name
+                        ends with '.gz', '.bz2', '.xz' or '.zst'.
                         (default: -)
                         """)
     parser.add_argument('--seed',
@@ -73,12 +79,14 @@ def cli(argv=sys.argv, mode='output'):
     parser.add_argument(
         '--input',
         '-i',
-        type=argparse.FileType('r'),
+        type=CompressedFileType('r'),
         metavar="<input>",
         default='-',
         help=
         """Input file. A formula in dimacs format. Setting '<input>' to '-' is
                         another way to read from standard input.
+                        Compressed files ('.gz', '.bz2', '.xz', '.zst')
+                        are decompressed on the fly.
                         (default: -)
                         """)
     parser.add_argument('--no-polarity-flips',
@@ -96,6 +104,24 @@ def cli(argv=sys.argv, mode='output'):
                         action='store_true',
                         dest='no_clauses_permutation',
                         help="No permutation of clauses")
+    parser.add_argument('--out-of-core',
+                        '-x',
+                        action='store_true',
+                        dest='out_of_core',
+                        help="""Do not load the formula in memory.
+                        The clauses are scattered at random in
+                        temporary files, which are then shuffled one
+                        at a time. The variables are renamed as
+                        without this option, but the clauses end up
+                        in a different order.""")
+    parser.add_argument('--bucket-size',
+                        metavar="<N>",
+                        type=positive_int,
+                        default=BUCKET_SIZE,
+                        help="""Average number of clauses in each
+                        temporary file with '--out-of-core'. Larger
+                        values use more memory and fewer files.
+                        (default: %(default)s)""")
     parser.add_argument('--quiet',
                         '-q',
                         action='store_false',
@@ -120,13 +146,29 @@ def cli(argv=sys.argv, mode='output'):
     if args.input == sys.stdin:
         with msg_prefix("c INPUT: "):
             interactive_msg(msg, filltext=70)
-    F = CNF.from_file(args.input)
 
     # Default permutation
     polarity_flips='fixed' if args.no_polarity_flips else 'shuffle'
     variables_permutation='fixed' if args.no_variables_permutation else 'shuffle'
     clauses_permutation='fixed' if args.no_clauses_permutation else 'shuffle'
 
+    if args.out_of_core:
+        if mode == 'formula':
+            raise InternalBug("option '--out-of-core' does not produce a formula")
+        output = StringIO() if mode == 'string' else args.output
+        shuffle_dimacs(args.input, output,
+                       polarity_flips, variables_permutation,
+                       clauses_permutation,
+                       bucket_size=args.bucket_size,
+                       export_header=(mode != 'string'))
+        if mode == 'string':
+            return output.getvalue()
+        if args.output is not sys.stdout:
+            args.output.close()
+        return None
+
+    F = CNF.from_file(args.input)
+
     G = Shuffle(F, polarity_flips, variables_permutation, clauses_permutation)
 
     if mode == 'formula':
@@ -135,6 +177,8 @@ def cli(argv=sys.argv, mode='output'):
         return G.to_dimacs()
     else:
         G.to_file(args.output, fileformat='dimacs')
+        if args.output is not sys.stdout:
+            args.output.close()
 
 
 # Launcher
@@ -157,11 +201,13 @@ def main():
         print(str(e), file=sys.stderr)
         sys.exit(-1)
 
-    except (BrokenPipeError, IOError):
+    except OSError as e:
         # avoid errors when stdout is closed before the end of the
         # program (i.e. piping into a command line which does
         # not work.)
-        pass
+        if e.errno != errno.EPIPE:
+            error_msg("I/O ERROR: " + str(e))
+            sys.exit(-1)
 
     # avoid signaling BrokenPipeError as whatnot
     sys.stderr.close()
@@ -184,8 +184,7 @@ def modify_simple_graph_plantclique(parsed, G):
 
     clique = random.sample(G.vertices(), cliquesize)
 
-    for v, w in combinations(clique, 2):
-        G.add_edge(v, w)
+    G.add_edges_from(combinations(clique, 2))
     G.name += " + planted {}-clique".format(cliquesize)
     return G
 
@@ -385,8 +384,7 @@ def modify_bipartite_graph_plantbiclique(parsed, G):
     left = random.sample(left, cliqueleft)
     right = random.sample(right, cliqueright)
 
-    for v, w in product(left, right):
-        G.add_edge(v, w)
+    G.add_edges_from(product(left, right))
     G.name += " + planted ({},{})-biclique".format(cliqueleft, cliqueright)
     return G
 
@@ -15,6 +15,7 @@ from fileinput import FileInput
 
 from cnfgen.graphs import supported_graph_formats
 from cnfgen.graphs import readGraph
+from cnfgen.utils.compression import open_file, strip_compression_extension
 
 from cnfgen.clitools.msg import interactive_msg, msg_prefix
 
@@ -24,7 +25,7 @@ def open_input(filename):
     if filename == '-':
         fh = sys.stdin
     else:
-        fh = open(filename, 'r')
+        fh = open_file(filename, 'r')
     try:
         yield fh
     finally:
@@ -46,8 +47,8 @@ def read_graph_from_input(graphtype, filename, fileformat):
     """
     # is file source stdin?
     try:
-        fext = os.path.splitext(filename)[-1][1:]
-    except AttributeError:
+        fext = os.path.splitext(strip_compression_extension(filename))[-1][1:]
+    except (AttributeError, TypeError):
         fext = ''
     allowed = supported_graph_formats()[graphtype]
 
@@ -38,6 +38,7 @@ from cnfgen.formula.cnfio import guess_output_format
 from cnfgen.clitools.cmdline import paginate_or_redirect_stdout
 from cnfgen.clitools.cmdline import setup_SIGINT
 from cnfgen.clitools.cmdline import CLIParser, CLIError, CLIHelpFormatter
+from cnfgen.clitools.cmdline import CompressedFileType
 
 from cnfgen.clitools.cmdline import get_formula_helpers
 from cnfgen.clitools.cmdline import get_transformation_helpers
@@ -79,6 +80,8 @@ optional arguments:
                         Save the formula to <output>.
                         Setting '<output>' to '-' sends the
                         formula to standard output. (default: -)
+                        Output is compressed if <output> ends with
+                        '.gz', '.bz2', '.xz' or '.zst'.
   --output-format {latex,opb}, -of {latex,opb}
                         Output format of the formulas. 'latex' is
                         convenient to insert formulas into papers, and
@@ -236,7 +239,7 @@ def setup_command_line_parsers(progname, fhelpers):
     parser.add_argument(
         '--output',
         '-o',
-        type=argparse.FileType('w', encoding='utf-8'),
+        type=CompressedFileType('w', encoding='utf-8'),
         metavar="<output>",
         default='-')
     ofgroup = parser.add_mutually_exclusive_group()
@@ -453,6 +456,8 @@ def cli(argv=None, mode='output'):
                     export_header=args.verbose,
                     export_varnames=args.varnames,
                     extra_text=extra_text)
+        if args.output is not sys.stdout:
+            args.output.close()
 
     return None
 
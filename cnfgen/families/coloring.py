@@ -4,6 +4,7 @@
 """
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, cardinality_size
 from cnfgen.graphs import Graph
 from cnfgen.localtypes import non_negative_int
 
@@ -45,14 +46,33 @@ def GraphColoringFormula(G, colors, functional=True, formula_class=CNF):
 
 
     # This is a legal coloring
-    for (v1, v2) in G.edges():
-        for c in range(1,colors+1):
-            F.add_clause([-col(v1, c), -col(v2, c)])
+    F.add_clauses_from(([-col(v1, c), -col(v2, c)]
+                        for (v1, v2) in G.edges()
+                        for c in range(1, colors+1)),
+                       check=False)
 
     return F
 
 
-def EvenColoringFormula(G, formula_class=CNF):
+def GraphColoringFormulaSize(G, colors, functional=True):
+    """Size of the colorability formula
+
+    Number of variables, clauses and literals of
+    :py:func:`GraphColoringFormula`, computed without building it.
+    """
+    non_negative_int(colors, 'colors')
+    G = Graph.normalize(G, 'G')
+    n = G.order()
+    clauses = n + colors * G.number_of_edges()
+    literals = n * colors + 2 * colors * G.number_of_edges()
+    if functional:
+        c, l = cardinality_size(colors, '<=', 1)
+        clauses += n * c
+        literals += n * l
+    return FormulaSize(n * colors, clauses, literals)
+
+
+def EvenColoringFormula(G, encoding='naive', formula_class=CNF):
     """Even coloring formula
 
     The formula is defined on a graph :math:`G` and claims that it is
@@ -67,6 +87,9 @@ def EvenColoringFormula(G, formula_class=CNF):
     ---------
     G : cnfgen.Graph
        a simple undirected graph where all vertices have even degree
+    encoding : str
+       encoding of the cardinality constraints, see
+       :py:data:`cnfgen.formula.linear.CARDINALITY_ENCODINGS`
 
     Raises
     ------
@@ -100,5 +123,5 @@ def EvenColoringFormula(G, formula_class=CNF):
 
         edge_vars = [e(u, v) for u,v in e.indices(v,None)]
 
-        F.cardinality_eq(edge_vars, len(edge_vars) // 2)
+        F.cardinality_eq(edge_vars, len(edge_vars) // 2, encoding=encoding)
     return F
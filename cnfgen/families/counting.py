@@ -4,6 +4,7 @@
 """
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, binomial, cardinality_size
 from cnfgen.graphs import Graph, BipartiteGraph
 from cnfgen.localtypes import positive_int, non_negative_int
 
@@ -46,6 +47,38 @@ def CountingPrinciple(M, p, formula_class=CNF):
     return F
 
 
+def CountingPrincipleSize(M, p):
+    """Size of the counting principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`CountingPrinciple`, computed without building it.
+
+    Examples
+    --------
+    >>> CountingPrincipleSize(5, 2)
+    FormulaSize(variables=10, clauses=35, literals=80)
+    """
+    non_negative_int(M, "M")
+    positive_int(p, "p")
+    c, l = cardinality_size(binomial(M - 1, p - 1), '==', 1)
+    return FormulaSize(binomial(M, p), M * c, M * l)
+
+
+def PerfectMatchingPrincipleSize(G):
+    """Size of the perfect matching principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`PerfectMatchingPrinciple`, computed without building it.
+    """
+    G = Graph.normalize(G, 'G')
+    clauses, literals = 0, 0
+    for u in G.vertices():
+        c, l = cardinality_size(G.degree(u), '==', 1)
+        clauses += c
+        literals += l
+    return FormulaSize(G.number_of_edges(), clauses, literals)
+
+
 def PerfectMatchingPrinciple(G, formula_class=CNF):
     """Generates the clauses for the graph perfect matching principle.
 
@@ -99,6 +132,7 @@ def MutilatedChessboard(W, H, formula_class=CNF):
     def v(r, c):
         return r * W + c   # vertices id start from 1
 
+    edges = []
     for r in range(H):
         for c in range(W):
             if r == 0 and c == 0:  # top left corner
@@ -108,9 +142,10 @@ def MutilatedChessboard(W, H, formula_class=CNF):
             if r >= H - 2 and c == W - 1:  # bottom right corner or its top  neighbors
                 continue
             if c < W - 1:
-                G.add_edge(v(r, c), v(r, c + 1))  # edges toward right
+                edges.append((v(r, c), v(r, c + 1)))  # edges toward right
             if r < H - 1:
-                G.add_edge(v(r, c), v(r + 1, c))  # edges toward bottom
+                edges.append((v(r, c), v(r + 1, c)))  # edges toward bottom
+    G.add_edges_from(edges)
 
     description = f"Mutilated Chessboard {W}x{H}"
     F = formula_class(description=description)
@@ -6,7 +6,7 @@
 from itertools import combinations
 
 from cnfgen.formula.cnf import CNF
-from cnfgen.graphs import Graph
+from cnfgen.graphs import Graph, DenseGraph, prefer_dense
 from cnfgen.localtypes import positive_int
 
 def unique_neighborhoods(G):
@@ -18,8 +18,14 @@ they are enumerated in a sorted fashion."""
     n = G.number_of_vertices()
     if n == 0:
         return []
+    vertices = range(1, n+1)
+    D = prefer_dense(G)
+    if isinstance(D, DenseGraph):
+        # a single vertex for each distinct neighborhood
+        vertices = {D.neighborhood_mask(v) | (1 << v): v
+                    for v in vertices}.values()
     neighborhoods = []
-    for v in range(1, n+1):
+    for v in vertices:
         neighborhoods.append(sorted([v] + list(G.neighbors(v))))
     neighborhoods.sort()
     unique = [neighborhoods[0]]
@@ -98,7 +104,7 @@ def DominatingSet(G, d, alternative=False, formula_class=CNF):
         F.add_clause([D(v) for v in N])
     return F
 
-def Tiling(G, formula_class=CNF):
+def Tiling(G, encoding='naive', formula_class=CNF):
     r"""Generates the clauses for a tiling of G
 
     The formula encodes the fact that the graph :math:`G` has a
@@ -110,6 +116,9 @@ def Tiling(G, formula_class=CNF):
     ----------
     G : cnfgen.Graph or networkx.Graph
         a simple undirected graph
+    encoding : str
+        encoding of the cardinality constraints, see
+        :py:data:`cnfgen.formula.linear.CARDINALITY_ENCODINGS`
 
     Returns
     -------
@@ -125,6 +134,6 @@ def Tiling(G, formula_class=CNF):
     x = F.new_block(G.number_of_vertices() , label='x_{{{0}}}')
     # Every neighborhood must have exactly one variable
     for N in unique_neighborhoods(G):
-        F.cardinality_eq([x(v) for v in N],1)
+        F.cardinality_eq([x(v) for v in N], 1, encoding=encoding)
 
     return F
@@ -2,9 +2,10 @@
 # -*- coding:utf-8 -*-
 """Graph isomorphimsm/automorphism formulas
 """
-from itertools import combinations
 from cnfgen.formula.cnf import CNF
-from cnfgen.graphs import Graph
+from cnfgen.formula.sizes import binomial
+from cnfgen.formula.variables import words_range
+from cnfgen.graphs import Graph, prefer_dense
 
 def GraphIsomorphism(G1, G2, nontrivial=False, formula_class=CNF):
     """Graph Isomorphism formula
@@ -27,8 +28,8 @@ def GraphIsomorphism(G1, G2, nontrivial=False, formula_class=CNF):
     are isomorphic.
 
     """
-    G1 = Graph.normalize(G1)
-    G2 = Graph.normalize(G2)
+    G1 = prefer_dense(Graph.normalize(G1))
+    G2 = prefer_dense(Graph.normalize(G2))
 
     description = "Graph isomorphism between (1) '{}' and (2) '{}'"
     description = description.format(G1.name, G2.name)
@@ -44,16 +45,27 @@ def GraphIsomorphism(G1, G2, nontrivial=False, formula_class=CNF):
     F.force_injective_mapping(f)
 
     # Edge consistency
-    for u1, u2 in combinations(f.domain(), 2):
-        for v1, v2 in combinations(f.range(), 2):
-            if G1.has_edge(u1, u2) != G2.has_edge(v1, v2):
-                F.add_clause([-f(u1, v1), -f(u2,v2)])
-                F.add_clause([-f(u1, v2), -f(u2,v1)])
+    F.add_clauses_by_chunks(_edge_consistency_clauses,
+                            binomial(G1.order(), 2),
+                            G1, G2, f.to_dict())
 
     F._mapping = f
     return F
 
 
+def _edge_consistency_clauses(start, stop, G1, G2, f):
+    '''Edge consistency for the pairs of G1 of rank between start and stop'''
+    for u1, u2 in words_range('combinations', G1.order(), 2, start, stop):
+        # the pairs of G2 that do not agree with (u1,u2)
+        if G1.has_edge(u1, u2):
+            pairs = G2.non_edges()
+        else:
+            pairs = G2.edges()
+        for v1, v2 in pairs:
+            yield [-f[u1, v1], -f[u2, v2]]
+            yield [-f[u1, v2], -f[u2, v1]]
+
+
 def GraphAutomorphism(G, formula_class=CNF):
     """Graph Automorphism formula
 
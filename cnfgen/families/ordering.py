@@ -3,8 +3,10 @@
 """Implementation of the ordering principle formulas
 """
 
-from itertools import combinations, permutations
+from itertools import combinations
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, binomial, falling_factorial
+from cnfgen.formula.variables import words_range
 from cnfgen.graphs import Graph
 from cnfgen.localtypes import non_negative_int
 
@@ -38,6 +40,55 @@ def OrderingPrinciple(size, total=False, smart=False, plant=False, knuth=0, form
     return F
 
 
+def OrderingPrincipleSize(size, total=False, smart=False, plant=False, knuth=0):
+    """Size of the ordering principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`OrderingPrinciple`, computed without building it.
+
+    Examples
+    --------
+    >>> OrderingPrincipleSize(5)
+    FormulaSize(variables=20, clauses=75, literals=220)
+    """
+    non_negative_int(size, 'size')
+    return _ordering_size([size - 1] * size, total, smart, plant, knuth)
+
+
+def GraphOrderingPrincipleSize(graph, total=False, smart=False, plant=False, knuth=0):
+    """Size of the graph ordering principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`GraphOrderingPrinciple`, computed without building it.
+    """
+    graph = Graph.normalize(graph, 'graph')
+    degrees = [graph.degree(v) for v in graph.vertices()]
+    return _ordering_size(degrees, total, smart, plant, knuth)
+
+
+def _ordering_size(degrees, total, smart, plant, knuth):
+    """Size of the ordering principle on a graph with these degrees"""
+    n = len(degrees)
+    if plant and n > 0:
+        clauses, literals = n - 1, sum(degrees[:-1])
+    else:
+        clauses, literals = n, sum(degrees)
+    if smart:
+        clauses += 2 * binomial(n, 3)
+        literals += 6 * binomial(n, 3)
+        return FormulaSize(binomial(n, 2), clauses, literals)
+    if knuth in [2, 3]:
+        transitivity = 2 * binomial(n, 3)
+    else:
+        transitivity = 6 * binomial(n, 3)
+    clauses += transitivity + binomial(n, 2)
+    literals += 3 * transitivity + 2 * binomial(n, 2)
+    if total:
+        clauses += binomial(n, 2)
+        literals += 2 * binomial(n, 2)
+    return FormulaSize(n * (n - 1), clauses, literals)
+
+
 def GraphOrderingPrinciple(graph,
                            total=False,
                            smart=False,
@@ -107,33 +158,46 @@ def GraphOrderingPrinciple(graph,
     #
     # Smart version just needs 1/3 of transitivity axioms
     #
+    X = X.to_dict()
     if smart:
-        for (v1, v2, v3) in combinations(V, 3):
-            gop.add_clause([ X(v1, v2),  X(v2, v3), -X(v1, v3)])
-            gop.add_clause([-X(v1, v2), -X(v2, v3),  X(v1, v3)])
+        gop.add_clauses_by_chunks(_smart_transitivity_clauses,
+                                  binomial(n, 3), n, X)
         return gop
 
     #
     # Transitivity axiom for the other versions
     #
-    for (v1, v2, v3) in permutations(V, 3):
-
-        # knuth variants will reduce the number of
-        # transitivity axioms
-        if knuth == 2 and ((v2 < v1) or (v2 < v3)):
-            continue
-        if knuth == 3 and ((v3 < v1) or (v3 < v2)):
-            continue
-
-        gop.add_clause([-X(v1, v2), -X(v2, v3),  X(v1, v3)])
+    gop.add_clauses_by_chunks(_transitivity_clauses,
+                              falling_factorial(n, 3), n, knuth, X)
 
     # Antisymmetry axioms (useless for 'smart' representation)
     for (v1, v2) in combinations(V, 2):
-        gop.add_clause([-X(v1, v2), -X(v2, v1)])
+        gop.add_clause([-X[v1, v2], -X[v2, v1]])
 
     # Totality axioms (useless for 'smart' representation)
     if total:
         for (v1, v2) in combinations(V, 2):
-            gop.add_clause([X(v1, v2), X(v2, v1)])
+            gop.add_clause([X[v1, v2], X[v2, v1]])
 
     return gop
+
+
+def _smart_transitivity_clauses(start, stop, n, X):
+    '''Transitivity axioms for the triples of rank between start and stop'''
+    for (v1, v2, v3) in words_range('combinations', n, 3, start, stop):
+        yield [ X[v1, v2],  X[v2, v3], -X[v1, v3]]
+        yield [-X[v1, v2], -X[v2, v3],  X[v1, v3]]
+
+
+def _transitivity_clauses(start, stop, n, knuth, X):
+    '''Transitivity axioms for the triples of rank between start and stop'''
+    for (v1, v2, v3) in words_range('permutations', n, 3, start, stop):
+
+        # knuth variants will reduce the number of
+        # transitivity axioms
+        if knuth == 2 and ((v2 < v1) or (v2 < v3)):
+            continue
+        if knuth == 3 and ((v3 < v1) or (v3 < v2)):
+            continue
+
+        yield [-X[v1, v2], -X[v2, v3],  X[v1, v3]]
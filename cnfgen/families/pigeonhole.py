@@ -20,8 +20,10 @@ for resolution [H85]_.
 """
 
 from itertools import combinations, product
+from math import ceil, log
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, binomial, cardinality_size
 from cnfgen.graphs import BaseBipartiteGraph, BipartiteGraph
 from cnfgen.localtypes import non_negative_int
 
@@ -128,6 +130,36 @@ def PigeonholePrinciple(pigeons, holes, functional=False, onto=False,
     return F
 
 
+def PigeonholePrincipleSize(pigeons, holes, functional=False, onto=False):
+    """Size of the pigeonhole principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`PigeonholePrinciple`, computed without building it.
+
+    Examples
+    --------
+    >>> PigeonholePrincipleSize(4, 3)
+    FormulaSize(variables=12, clauses=22, literals=48)
+    >>> PigeonholePrinciple(4, 3).size()
+    FormulaSize(variables=12, clauses=22, literals=48)
+    """
+    non_negative_int(pigeons, 'pigeon')
+    non_negative_int(holes, 'holes')
+    m, n = pigeons, holes
+    clauses, literals = m, m * n
+    if onto:
+        clauses += n
+        literals += m * n
+    c, l = cardinality_size(m, '<=', 1)
+    clauses += n * c
+    literals += n * l
+    if functional:
+        c, l = cardinality_size(n, '<=', 1)
+        clauses += m * c
+        literals += m * l
+    return FormulaSize(m * n, clauses, literals)
+
+
 def GraphPigeonholePrinciple(G, functional=False, onto=False,
                              formula_class=CNF):
     """Graph Pigeonhole Principle CNF formula
@@ -205,6 +237,31 @@ def GraphPigeonholePrinciple(G, functional=False, onto=False,
     return F
 
 
+def GraphPigeonholePrincipleSize(G, functional=False, onto=False):
+    """Size of the graph pigeonhole principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`GraphPigeonholePrinciple`, computed without building it.
+    """
+    G = BipartiteGraph.normalize(G)
+    pigeons = [G.right_degree(u) for u in range(1, G.left_order() + 1)]
+    holes = [G.left_degree(v) for v in range(1, G.right_order() + 1)]
+    clauses, literals = len(pigeons), sum(pigeons)
+    if onto:
+        clauses += len(holes)
+        literals += sum(holes)
+    for d in holes:
+        c, l = cardinality_size(d, '<=', 1)
+        clauses += c
+        literals += l
+    if functional:
+        for d in pigeons:
+            c, l = cardinality_size(d, '<=', 1)
+            clauses += c
+            literals += l
+    return FormulaSize(G.number_of_edges(), clauses, literals)
+
+
 def BinaryPigeonholePrinciple(pigeons, holes, formula_class=CNF):
     """Binary Pigeonhole Principle CNF formula
 
@@ -251,6 +308,28 @@ def BinaryPigeonholePrinciple(pigeons, holes, formula_class=CNF):
     return F
 
 
+def BinaryPigeonholePrincipleSize(pigeons, holes):
+    """Size of the binary pigeonhole principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`BinaryPigeonholePrinciple`, computed without building it.
+
+    Examples
+    --------
+    >>> BinaryPigeonholePrincipleSize(5, 3)
+    FormulaSize(variables=10, clauses=35, literals=130)
+    """
+    non_negative_int(pigeons, 'pigeon')
+    non_negative_int(holes, 'holes')
+    if pigeons == 0 or holes == 0:
+        raise ValueError("pigeons and holes must be positive")
+    bits = int(ceil(log(holes, 2)))
+    clauses = pigeons * (2**bits - holes) + holes * binomial(pigeons, 2)
+    literals = pigeons * (2**bits - holes) * bits + \
+        holes * binomial(pigeons, 2) * 2 * bits
+    return FormulaSize(pigeons * bits, clauses, literals)
+
+
 def RelativizedPigeonholePrinciple(pigeons, resting_places, holes, formula_class=CNF):
     """Relativized Pigeonhole Principle CNF formula
 
@@ -344,3 +423,25 @@ def RelativizedPigeonholePrinciple(pigeons, resting_places, holes, formula_class
         rphp.add_clause([-r(v1), -r(v2), -q(v1, w), -q(v2, w)])
 
     return rphp
+
+
+def RelativizedPigeonholePrincipleSize(pigeons, resting_places, holes):
+    """Size of the relativized pigeonhole principle formula
+
+    Number of variables, clauses and literals of
+    :py:func:`RelativizedPigeonholePrinciple`, computed without
+    building it.
+
+    Examples
+    --------
+    >>> RelativizedPigeonholePrincipleSize(4, 3, 2)
+    FormulaSize(variables=21, clauses=43, literals=105)
+    """
+    non_negative_int(pigeons, 'pigeon')
+    non_negative_int(resting_places, 'resting_places')
+    non_negative_int(holes, 'holes')
+    U, V, W = pigeons, resting_places, holes
+    c, l = cardinality_size(U, '<=', 1)
+    clauses = U + V * c + V * U + V + W * binomial(V, 2)
+    literals = U * V + V * l + 2 * V * U + V * (W + 1) + 4 * W * binomial(V, 2)
+    return FormulaSize(U * V + V * W + V, clauses, literals)
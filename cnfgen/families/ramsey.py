@@ -8,6 +8,8 @@ from itertools import combinations
 from math import sqrt
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.variables import words_range
+from cnfgen.formula.sizes import FormulaSize, binomial, cardinality_size
 from cnfgen.localtypes import positive_int, positive_int_seq
 from cnfgen.localtypes import non_negative_int
 
@@ -102,31 +104,82 @@ def RamseyNumber(s, k, N, formula_class=CNF):
 
     # One variable per edge (indices are ordered)
     e = ram.new_combinations(N, 2, label='e_{{{}}}')
+    e = e.to_dict()
 
     # No independent set of size s
-    for vertex_set in combinations(range(1, N + 1), s):
-        clause = [e(u, v) for u, v in combinations(vertex_set, 2)]
-        ram.add_clause(clause)
+    ram.add_clauses_by_chunks(_ramsey_clauses, binomial(N, s), N, s, 1, e)
 
     # No clique of size k
-    for vertex_set in combinations(range(1, N + 1), k):
-        clause = [-e(u, v) for u, v in combinations(vertex_set, 2)]
-        ram.add_clause(clause)
+    ram.add_clauses_by_chunks(_ramsey_clauses, binomial(N, k), N, k, -1, e)
 
     return ram
 
 
-def _vdw_ap_generator(N, k):
-    '''Generates arithmetic progressions of length k in 1...N'''
+def _ramsey_clauses(start, stop, N, size, sign, e):
+    '''Clauses for the vertex sets of rank between start and stop'''
+    for vertex_set in words_range('combinations', N, size, start, stop):
+        yield [sign * e[u, v] for u, v in combinations(vertex_set, 2)]
+
+
+def RamseyNumberSize(s, k, N):
+    """Size of the formula claiming that r(s,k) > N
+
+    Number of variables, clauses and literals of
+    :py:func:`RamseyNumber`, computed without building it.
+
+    Examples
+    --------
+    >>> RamseyNumberSize(3, 3, 5)
+    FormulaSize(variables=10, clauses=20, literals=60)
+    >>> RamseyNumberSize(5, 5, 43)
+    FormulaSize(variables=903, clauses=1925196, literals=19251960)
+    """
+    non_negative_int(N, 'N')
+    positive_int(s, 's')
+    positive_int(k, 'k')
+    return FormulaSize(binomial(N, 2),
+                       binomial(N, s) + binomial(N, k),
+                       binomial(N, s) * binomial(s, 2) +
+                       binomial(N, k) * binomial(k, 2))
+
+
+def _vdw_ap_count(N, k):
+    '''Number of arithmetic progressions of length k in 1...N'''
+    max_d = (N - 1) // (k - 1)
+    return max_d * N - (k - 1) * max_d * (max_d + 1) // 2
+
+
+def _vdw_ap_generator(N, k, start=0, stop=None):
+    '''Generates arithmetic progressions of length k in 1...N
+
+    Only the progressions in positions between `start` and `stop`
+    (excluded) are generated.'''
 
     # the largest gap d must be such that
     # 1+ d*(k-1) <= N
     # so d <= (N-1)/(k-1)
     max_d = (N - 1) // (k - 1)
+    if stop is None:
+        stop = _vdw_ap_count(N, k)
+    pos = 0
     for d in range(1, max_d + 1):
         max_i = N - d * k + d
-        for i in range(1, max_i + 1):
+        if pos + max_i <= start:
+            pos += max_i
+            continue
+        for i in range(max(1, start - pos + 1), max_i + 1):
+            if pos + i > stop:
+                return
             yield [i + d * t for t in range(k)]
+        pos += max_i
+
+
+def _vdw_clauses(start, stop, N, k, X):
+    '''Clauses forbidding the progressions between start and stop
+
+    The literal for number i is X[i].'''
+    for ap in _vdw_ap_generator(N, k, start, stop):
+        yield [X[i] for i in ap]
 
 
 def VanDerWaerden(N, k1, k2, *ks, formula_class=CNF):
@@ -203,12 +256,13 @@ def VanDerWaerden(N, k1, k2, *ks, formula_class=CNF):
     # Only one row of variable needed for 2 colors.
     if len(K) == 2:
         X = vdw.new_block(N, label='x_{{{}}}')
+        pos = [None] + [X(i) for i in range(1, N + 1)]
+        neg = [None] + [-X(i) for i in range(1, N + 1)]
 
-        for ap in _vdw_ap_generator(N, K[0]):
-            vdw.add_clause([X(i) for i in ap])
-
-        for ap in _vdw_ap_generator(N, K[1]):
-            vdw.add_clause([-X(i) for i in ap])
+        vdw.add_clauses_by_chunks(_vdw_clauses, _vdw_ap_count(N, K[0]),
+                                  N, K[0], pos)
+        vdw.add_clauses_by_chunks(_vdw_clauses, _vdw_ap_count(N, K[1]),
+                                  N, K[1], neg)
 
     else:
         X = vdw.new_block(N, len(K), label='x_{{{0},{1}}}')
@@ -217,6 +271,31 @@ def VanDerWaerden(N, k1, k2, *ks, formula_class=CNF):
 
         # Forbid arithmetic progressions
         for c in range(1,len(K)+1):
-            for ap in _vdw_ap_generator(N, K[c - 1]):
-                vdw.add_clause([-X(i, c) for i in ap])
+            Xc = [None] + [-X(i, c) for i in range(1, N + 1)]
+            vdw.add_clauses_by_chunks(_vdw_clauses, _vdw_ap_count(N, K[c - 1]),
+                                      N, K[c - 1], Xc)
     return vdw
+
+
+def VanDerWaerdenSize(N, k1, k2, *ks):
+    """Size of the formula claiming that vdw(k1,k2,k3,k4,...) > N
+
+    Number of variables, clauses and literals of
+    :py:func:`VanDerWaerden`, computed without building it.
+
+    Examples
+    --------
+    >>> VanDerWaerdenSize(8, 3, 3)
+    FormulaSize(variables=8, clauses=24, literals=72)
+    """
+    non_negative_int(N,'N')
+    positive_int(k1,'k1')
+    positive_int(k2,'k2')
+    positive_int_seq(ks, '*ks')
+    K = [k1, k2] + list(ks)
+    clauses = sum(_vdw_ap_count(N, k) for k in K)
+    literals = sum(k * _vdw_ap_count(N, k) for k in K)
+    if len(K) == 2:
+        return FormulaSize(N, clauses, literals)
+    c, l = cardinality_size(len(K), '==', 1)
+    return FormulaSize(N * len(K), clauses + N * c, literals + N * l)
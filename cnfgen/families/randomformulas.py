@@ -7,6 +7,7 @@ import itertools
 import random
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, binomial
 from cnfgen.localtypes import non_negative_int
 
 def clause_satisfied(cls, assignments):
@@ -142,3 +143,25 @@ def RandomKCNF(k, n, m, seed=None, planted_assignments=None, formula_class=CNF):
             "The number of clauses available is less than m")
 
     return F
+
+
+def RandomKCNFSize(k, n, m):
+    """Size of a random k-CNF
+
+    Number of variables, clauses and literals of
+    :py:func:`RandomKCNF`, computed without building it.
+
+    Examples
+    --------
+    >>> RandomKCNFSize(3, 10, 40)
+    FormulaSize(variables=10, clauses=40, literals=120)
+    """
+    non_negative_int(n, 'n')
+    non_negative_int(m, 'm')
+    non_negative_int(k, 'k')
+    if k > n:
+        raise ValueError("clauses width is {}, and we only have {} variables".format(k,n))
+    if m > binomial(n, k) * 2**k:
+        raise ValueError(
+            "The number of clauses available is less than m")
+    return FormulaSize(n, m, k * m)
@@ -7,6 +7,7 @@ import itertools
 import random
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, binomial, parity_size
 from cnfgen.localtypes import non_negative_int
 
 def parity_satisfied(X, b, assignments):
@@ -85,7 +86,8 @@ def all_good_parities(k, n, planted_assignments):
 
 
 
-def RandomKXOR(k, n, m, seed=None, planted_assignments=None, formula_class=CNF):
+def RandomKXOR(k, n, m, seed=None, planted_assignments=None, maxwidth=None,
+               formula_class=CNF):
     """Build a random k-XOR
 
     Sample :math:`m` parity constraints over :math:`n` variables, each of width
@@ -113,6 +115,10 @@ def RandomKXOR(k, n, m, seed=None, planted_assignments=None, formula_class=CNF):
        will be satisfied by all of them. Each partial assignment is a sequence of literals.
        Undefined behaviour if some assignment contains opposite literals.
 
+    maxwidth : int, optional
+       parities wider than `maxwidth` are split into chains of
+       shorter parities, using auxiliary variables
+
     Returns
     -------
     a CNF object
@@ -142,9 +148,36 @@ def RandomKXOR(k, n, m, seed=None, planted_assignments=None, formula_class=CNF):
     F.update_variable_number(n)
     try:
         for X,b in sample_parities(k, n, m, planted_assignments):
-            F.add_parity(X,b, check=False)
+            F.add_parity(X,b, check=False, maxwidth=maxwidth)
     except ValueError:
         raise ValueError(
             "The number of XORs available is less than m")
 
     return F
+
+
+def RandomKXORSize(k, n, m, maxwidth=None):
+    """Size of a random k-XOR
+
+    Number of variables, clauses and literals of
+    :py:func:`RandomKXOR`, computed without building it. The size
+    is exact for :math:`k>0`. For :math:`k=0` the number of clauses
+    is an upper bound, since it depends on the sampled constants.
+
+    Examples
+    --------
+    >>> RandomKXORSize(3, 10, 5)
+    FormulaSize(variables=10, clauses=20, literals=60)
+    >>> RandomKXORSize(6, 10, 5, maxwidth=4)
+    FormulaSize(variables=15, clauses=80, literals=320)
+    """
+    non_negative_int(n, 'n')
+    non_negative_int(m, 'm')
+    non_negative_int(k, 'k')
+    if k > n:
+        raise ValueError("clauses width is {}, and we only have {} variables".format(k,n))
+    if m > binomial(n, k) * 2:
+        raise ValueError(
+            "The number of XORs available is less than m")
+    aux, clauses, literals = parity_size(k, 1, maxwidth)
+    return FormulaSize(n + m * aux, m * clauses, m * literals)
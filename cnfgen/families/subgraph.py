@@ -7,19 +7,12 @@ from itertools import combinations
 from itertools import product
 
 from cnfgen.formula.cnf import CNF
-from cnfgen.graphs import Graph
+from cnfgen.formula.sizes import binomial
+from cnfgen.formula.variables import words_range
+from cnfgen.graphs import Graph, prefer_dense
 from cnfgen.localtypes import non_negative_int
 
 
-def non_edges(G):
-    N = G.order()
-    for u in range(1, N):
-        for v in range(u+1, N+1):
-            if not G.has_edge(u, v):
-                yield (u, v)
-
-
-
 def SubgraphFormula(G, H, induced=False, symbreak=False, formula_class=CNF):
     """Test whether a graph has a k-clique.
 
@@ -43,8 +36,8 @@ def SubgraphFormula(G, H, induced=False, symbreak=False, formula_class=CNF):
     a CNF object
 
     """
-    G = Graph.normalize(G, 'G')
-    H = Graph.normalize(H, 'H')
+    G = prefer_dense(Graph.normalize(G, 'G'))
+    H = prefer_dense(Graph.normalize(H, 'H'))
 
     F = formula_class()
     if induced:
@@ -63,23 +56,40 @@ def SubgraphFormula(G, H, induced=False, symbreak=False, formula_class=CNF):
         F.force_nondecreasing_mapping(s)
 
     # Local consistency
-    localmaps = product(combinations(list(range(1, k+1)), 2),
-                        combinations(list(range(1, N+1)), 2))
-
     s = s.to_dict()
-    for (i1, i2), (j1, j2) in localmaps:
+    F.add_clauses_by_chunks(_local_consistency_clauses,
+                            binomial(k, 2) * binomial(N, 2),
+                            G, H, induced, symbreak, s)
+    return F
 
-        # check if this mapping is compatible
-        gedge = G.has_edge(j1, j2)
+
+def _local_consistency_clauses(start, stop, G, H, induced, symbreak, s):
+    '''Local consistency for the pairs of rank between start and stop
+
+    The ranks enumerate the pairs of vertices in H times the pairs
+    of vertices in G.'''
+    N = G.order()
+    k = H.order()
+    M = binomial(N, 2)
+    if M == 0:
+        return
+    first, rest = divmod(start, M)
+    for r, (i1, i2) in enumerate(words_range('combinations', k, 2, first),
+                                 start=first):
+        if r * M >= stop:
+            return
+        lo = rest if r == first else 0
         tedge = H.has_edge(i1, i2)
+        for j1, j2 in words_range('combinations', N, 2, lo, stop - r * M):
 
-        consistent = (gedge == tedge) or (gedge and not induced)
-        if not consistent:
-            F.add_clause([-s[i1, j1], -s[i2, j2]], check=False)
-            if not symbreak:
-                F.add_clause([-s[i1, j2], -s[i2, j1]], check=False)
+            # check if this mapping is compatible
+            gedge = G.has_edge(j1, j2)
 
-    return F
+            consistent = (gedge == tedge) or (gedge and not induced)
+            if not consistent:
+                yield [-s[i1, j1], -s[i2, j2]]
+                if not symbreak:
+                    yield [-s[i1, j2], -s[i2, j1]]
 
 
 def CliqueFormula(G, k, symbreak=True, formula_class=CNF):
@@ -103,7 +113,7 @@ def CliqueFormula(G, k, symbreak=True, formula_class=CNF):
 
     """
     non_negative_int(k, 'k')
-    G = Graph.normalize(G, 'G')
+    G = prefer_dense(Graph.normalize(G, 'G'))
 
     F = formula_class()
     description = "{} does not contain any {}-clique.".format(G.name, k)
@@ -120,7 +130,7 @@ def CliqueFormula(G, k, symbreak=True, formula_class=CNF):
     # Local consistency
     s = s.to_dict()
     nonconsistents = product(combinations(list(range(1, k+1)), 2),
-                             non_edges(G))
+                             G.non_edges())
 
     for (i1, i2), (j1, j2) in nonconsistents:
         # check if this mapping is compatible
@@ -154,7 +164,7 @@ def BinaryCliqueFormula(G, k, symbreak=True, formula_class=CNF):
 
     """
     non_negative_int(k, 'k')
-    G = Graph.normalize(G, 'G')
+    G = prefer_dense(Graph.normalize(G, 'G'))
 
     F = formula_class()
     description = "{} does not contain any {}-clique (Binary encoding).".format(G.name, k)
@@ -172,7 +182,7 @@ def BinaryCliqueFormula(G, k, symbreak=True, formula_class=CNF):
     # NOTE: vertices in binary are numbered from 0. Issue #115 was due
     # to an off-by-one error because of this
 
-    non_edges_zero_indexed = ((u-1,v-1) for (u,v) in non_edges(G))
+    non_edges_zero_indexed = ((u-1,v-1) for (u,v) in G.non_edges())
     nonconsistents = product(combinations(list(range(1, k+1)), 2),
                              non_edges_zero_indexed)
 
@@ -210,7 +220,7 @@ def RamseyWitnessFormula(G, k, s, symbreak=True, formula_class=CNF):
     """
     non_negative_int(k, 'k')
     non_negative_int(s, 's')
-    G = Graph.normalize(G, 'G')
+    G = prefer_dense(Graph.normalize(G, 'G'))
 
     F = formula_class()
     description = "{} does not contain {}-cliques nor {}-independent sets.".format(
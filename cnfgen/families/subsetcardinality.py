@@ -8,7 +8,8 @@ from cnfgen.formula.cnf import CNF
 from cnfgen.graphs import BipartiteGraph
 
 
-def SubsetCardinalityFormula(B, equalities=False, formula_class=CNF):
+def SubsetCardinalityFormula(B, equalities=False, encoding='naive',
+                             formula_class=CNF):
     r"""SubsetCardinalityFormula
 
     Consider a bipartite graph :math:`B`. The CNF claims that at least half
@@ -58,6 +59,10 @@ def SubsetCardinalityFormula(B, equalities=False, formula_class=CNF):
         use equations instead of inequalities to express the
         cardinality constraints.  (default: False)
 
+    encoding : str
+        encoding of the cardinality constraints, see
+        :py:data:`cnfgen.formula.linear.CARDINALITY_ENCODINGS`
+
     Returns
     -------
     A CNF object
@@ -88,16 +93,16 @@ def SubsetCardinalityFormula(B, equalities=False, formula_class=CNF):
 
         hceil = (B.right_degree(u)+1) // 2
         if equalities:
-            F.cardinality_eq(e(u, None),  hceil)
+            F.cardinality_eq(e(u, None),  hceil, encoding=encoding)
         else:
-            F.add_loose_majority(e(u, None))
+            F.add_loose_majority(e(u, None), encoding=encoding)
 
     for v in Right:
 
         hfloor = B.left_degree(v) // 2
         if equalities:
-            F.cardinality_eq(e(None, v),  hfloor)
+            F.cardinality_eq(e(None, v),  hfloor, encoding=encoding)
         else:
-            F.add_loose_minority(e(None, v))
+            F.add_loose_minority(e(None, v), encoding=encoding)
 
     return F
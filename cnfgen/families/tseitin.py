@@ -4,10 +4,11 @@
 """
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.formula.sizes import FormulaSize, parity_size
 from cnfgen.graphs import Graph
 
 
-def TseitinFormula(G, charges=None, formula_class=CNF):
+def TseitinFormula(G, charges=None, maxwidth=None, formula_class=CNF):
     """Build a Tseitin formula based on the input graph.
 
     By default, an odd charge is put on the first vertex, unless
@@ -23,6 +24,10 @@ def TseitinFormula(G, charges=None, formula_class=CNF):
     G : cnfgen.Graph or networkx.Graph
 
     charges: a sequence of boolean
+
+    maxwidth: int, optional
+        parity constraints on more than `maxwidth` edges are split
+        into chains of shorter parities, using auxiliary variables
     """
     G = Graph.normalize(G,'G')
 
@@ -47,6 +52,35 @@ def TseitinFormula(G, charges=None, formula_class=CNF):
 
     # add constraints
     for v, c in zip(G.vertices(), charges):
-        tse.add_parity([e(u, v) for u in G.neighbors(v)], c)
+        tse.add_parity([e(u, v) for u in G.neighbors(v)], c,
+                      maxwidth=maxwidth)
 
     return tse
+
+
+def TseitinFormulaSize(G, charges=None, maxwidth=None):
+    """Size of the Tseitin formula
+
+    Number of variables, clauses and literals of
+    :py:func:`TseitinFormula`, computed without building it.
+
+    Examples
+    --------
+    >>> from cnfgen.graphs import Graph
+    >>> TseitinFormulaSize(Graph.complete_graph(5))
+    FormulaSize(variables=10, clauses=40, literals=160)
+    """
+    G = Graph.normalize(G,'G')
+    n = G.order()
+    if charges is None:
+        charges = [True] + [False] * (n - 1)
+    charges = [bool(c) for c in charges]
+    if len(charges) < n:
+        charges = charges + [False] * (n - len(charges))
+    variables, clauses, literals = G.number_of_edges(), 0, 0
+    for v, c in zip(G.vertices(), charges):
+        size = parity_size(G.degree(v), c, maxwidth)
+        variables += size.variables
+        clauses += size.clauses
+        literals += size.literals
+    return FormulaSize(variables, clauses, literals)
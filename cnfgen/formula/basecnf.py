@@ -3,11 +3,182 @@
 """The implementaton of the basic CNF object
 """
 
+from array import array
 from collections import OrderedDict
+from itertools import islice, chain
+from tempfile import TemporaryFile
 from cnfgen.info import info
+from cnfgen.formula.sizes import FormulaSize
 
 from cnfgen.localtypes import non_negative_int
 
+# Number of clauses validated at once by `BaseCNF.add_clauses_from`
+CLAUSE_BLOCK_SIZE = 1 << 14
+
+
+class CompactClauses:
+    """Compact storage for a sequence of clauses
+
+    The literals of all clauses are stored contiguously in a flat
+    array of 32 bits signed integers, and a second array keeps the
+    offset where each clause starts. The memory footprint is roughly
+    4 bytes per literal plus 8 bytes per clause, instead of a full
+    python list per clause.
+
+    The object behaves as a list of clauses that only supports
+    appending: clauses are returned as fresh python lists.
+
+    Examples
+    --------
+    >>> C = CompactClauses([[1, 2, -3], [-2, 4]])
+    >>> len(C)
+    2
+    >>> list(C)
+    [[1, 2, -3], [-2, 4]]
+    >>> C.append([])
+    >>> C.append((5, -1))
+    >>> C[-1]
+    [5, -1]
+    >>> C[1:3]
+    [[-2, 4], []]
+    >>> C == [[1, 2, -3], [-2, 4], [], [5, -1]]
+    True
+    >>> C.literals
+    array('i', [1, 2, -3, -2, 4, 5, -1])
+    >>> C.offsets
+    array('q', [0, 3, 5, 5, 7])
+    """
+    def __init__(self, clauses=None):
+        self.literals = array('i')
+        self.offsets = array('q', [0])
+        for c in clauses or []:
+            self.append(c)
+
+    def append(self, clause):
+        """Add a clause at the end of the sequence"""
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def extend(self, clauses):
+        """Add a sequence of clauses at the end of the sequence"""
+        literals = self.literals
+        offsets = self.offsets
+        for c in clauses:
+            literals.extend(c)
+            offsets.append(len(literals))
+
+    def extend_from_buffer(self, literals, offsets):
+        """Add the clauses stored in a flat buffer of literals
+
+        The literals of the i-th clause are
+        ``literals[offsets[i]:offsets[i+1]]``, as in the arrays of
+        this class.
+
+        >>> C = CompactClauses([[1, 2]])
+        >>> C.extend_from_buffer(array('i', [7, -3, 4, 5]), [1, 3, 3, 4])
+        >>> list(C)
+        [[1, 2], [-3, 4], [], [5]]
+        """
+        if len(offsets) < 2:
+            return
+        first = offsets[0]
+        shift = len(self.literals) - first
+        self.literals.extend(literals[first:offsets[-1]])
+        self.offsets.extend(o + shift for o in islice(offsets, 1, None))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def number_of_literals(self):
+        """Total number of literals in the clauses"""
+        return len(self.literals)
+
+    def __iter__(self):
+        lits = self.literals
+        offs = self.offsets
+        for i in range(len(offs) - 1):
+            yield lits[offs[i]:offs[i+1]].tolist()
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        m = len(self)
+        if idx < 0:
+            idx += m
+        if not 0 <= idx < m:
+            raise IndexError("clause index out of range")
+        return self.literals[self.offsets[idx]:self.offsets[idx+1]].tolist()
+
+    def __eq__(self, other):
+        if isinstance(other, CompactClauses):
+            return (self.literals == other.literals and
+                    self.offsets == other.offsets)
+        try:
+            return len(self) == len(other) and \
+                all(a == list(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return 'CompactClauses({})'.format(list(self))
+
+class MappedClauses(CompactClauses):
+    """Compact clause storage on top of read-only buffers
+
+    Same as :py:class:`CompactClauses`, but the arrays of literals
+    and offsets are memory views on some external buffer (e.g. a
+    memory mapped file), so no data is copied when a formula is
+    loaded. The first time a clause is appended the arrays are copied
+    in memory.
+
+    Examples
+    --------
+    >>> C = CompactClauses([[1, 2, -3], [-2, 4]])
+    >>> M = MappedClauses(memoryview(C.literals), memoryview(C.offsets))
+    >>> list(M)
+    [[1, 2, -3], [-2, 4]]
+    >>> M.append([5])
+    >>> M[-1], C == [[1, 2, -3], [-2, 4]]
+    ([5], True)
+    """
+    def __init__(self, literals, offsets, buffer=None):
+        self.literals = literals
+        self.offsets = offsets
+        # keep the underlying buffer alive
+        self._buffer = buffer
+
+    def _copy_in_memory(self):
+        if isinstance(self.literals, memoryview):
+            literals, offsets = array('i'), array('q')
+            literals.frombytes(self.literals.tobytes())
+            offsets.frombytes(self.offsets.tobytes())
+            self.literals, self.offsets = literals, offsets
+            self._buffer = None
+
+    def __reduce__(self):
+        # memory views and memory maps cannot be copied or pickled
+        return (MappedClauses,
+                (array('i', self.literals), array('q', self.offsets)))
+
+    def append(self, clause):
+        """Add a clause at the end of the sequence"""
+        self._copy_in_memory()
+        CompactClauses.append(self, clause)
+
+    def extend(self, clauses):
+        """Add a sequence of clauses at the end of the sequence"""
+        self._copy_in_memory()
+        CompactClauses.extend(self, clauses)
+
+    def extend_from_buffer(self, literals, offsets):
+        """Add the clauses stored in a flat buffer of literals"""
+        self._copy_in_memory()
+        CompactClauses.extend_from_buffer(self, literals, offsets)
+
+
 class ClausesView:
     """Object that represents a lit of clauses
 
@@ -53,6 +224,325 @@ a formula"""
         return 'ClausesView({})'.format(self.data)
 
 
+class ClauseSpool:
+    """Clause storage that spools clauses to disk in DIMACS format
+
+    Each clause is immediately rendered as a DIMACS line and written
+    to an anonymous temporary file, so that the memory used does not
+    depend on the size of the formula. Writing the formula to a DIMACS
+    file copies the spooled text as it is (see :py:meth:`copy_to`).
+
+    Reading the clauses back is possible but it requires to parse the
+    spooled file, hence it is slow and random access is linear time.
+
+    Examples
+    --------
+    >>> C = ClauseSpool()
+    >>> C.append([1, 2, -3])
+    >>> C.append([])
+    >>> C.append([-2, 4])
+    >>> len(C)
+    3
+    >>> list(C)
+    [[1, 2, -3], [], [-2, 4]]
+    >>> C[2]
+    [-2, 4]
+    >>> from io import StringIO
+    >>> out = StringIO()
+    >>> C.copy_to(out)
+    >>> print(out.getvalue(), end='')
+    1 2 -3 0
+    0
+    -2 4 0
+    """
+    chunk_size = 1 << 20
+
+    def __init__(self, clauses=None):
+        self._file = TemporaryFile(mode='w+b')
+        self._length = 0
+        self._literals = 0
+        for c in clauses or []:
+            self.append(c)
+
+    def append(self, clause):
+        """Write a clause at the end of the spool"""
+        text = "".join([str(lit)+" " for lit in clause]) + "0\n"
+        self._file.write(text.encode('ascii'))
+        self._length += 1
+        self._literals += len(clause)
+
+    def extend(self, clauses):
+        """Write a sequence of clauses at the end of the spool"""
+        for c in clauses:
+            self.append(c)
+
+    def copy_to(self, output):
+        """Copy the DIMACS text of the clauses to a text file object"""
+        f = self._file
+        f.flush()
+        end = f.tell()
+        pos = 0
+        while pos < end:
+            f.seek(pos)
+            chunk = f.read(min(self.chunk_size, end - pos))
+            pos += len(chunk)
+            output.write(chunk.decode('ascii'))
+        f.seek(0, 2)
+
+    def __len__(self):
+        return self._length
+
+    def number_of_literals(self):
+        """Total number of literals in the clauses"""
+        return self._literals
+
+    def __iter__(self):
+        f = self._file
+        f.flush()
+        end = f.tell()
+        pos = 0
+        rest = b''
+        while pos < end:
+            f.seek(pos)
+            chunk = f.read(min(self.chunk_size, end - pos))
+            f.seek(0, 2)
+            pos += len(chunk)
+            lines = (rest + chunk).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                yield [int(lit) for lit in line.split()[:-1]]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        m = len(self)
+        if idx < 0:
+            idx += m
+        if not 0 <= idx < m:
+            raise IndexError("clause index out of range")
+        return next(islice(self, idx, None))
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and \
+                all(a == list(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return 'ClauseSpool({})'.format(list(self))
+
+
+class ClauseCounter:
+    """Clause storage that only counts clauses and literals
+
+    The clauses are discarded as soon as they are counted, so that
+    building a formula with this storage tells its size using
+    constant memory. Optionally the storage raises a `ValueError`
+    when the number of literals goes over some `budget`.
+
+    Examples
+    --------
+    >>> C = ClauseCounter([[1, 2, -3], [-2, 4]])
+    >>> C.append([])
+    >>> len(C), C.number_of_literals()
+    (3, 5)
+    >>> C = ClauseCounter(budget=4)
+    >>> C.append([1, 2, -3])
+    >>> C.append([-2, 4])
+    Traceback (most recent call last):
+    ...
+    ValueError: the formula has more than 4 literals
+    """
+    def __init__(self, clauses=None, budget=None):
+        self._length = 0
+        self._literals = 0
+        self.budget = budget
+        for c in clauses or []:
+            self.append(c)
+
+    def append(self, clause):
+        """Count a clause"""
+        self._length += 1
+        self._literals += len(clause)
+        if self.budget is not None and self._literals > self.budget:
+            raise ValueError(
+                "the formula has more than {} literals".format(self.budget))
+
+    def extend(self, clauses):
+        """Count a sequence of clauses"""
+        for c in clauses:
+            self.append(c)
+
+    def __len__(self):
+        return self._length
+
+    def number_of_literals(self):
+        """Total number of literals in the clauses"""
+        return self._literals
+
+    def __iter__(self):
+        raise RuntimeError("the clauses have been counted but not stored")
+
+    def __getitem__(self, idx):
+        raise RuntimeError("the clauses have been counted but not stored")
+
+    def __repr__(self):
+        return 'ClauseCounter(clauses={}, literals={})'.format(
+            self._length, self._literals)
+
+
+class ClauseWindow:
+    """Clause storage that keeps only a range of positions
+
+    All clauses are counted, but only the ones in positions from
+    `start` to `stop` (excluded) are stored. The length of the
+    storage is the number of all clauses, while iteration only
+    returns the stored ones. This is enough to produce a slice of
+    a formula without keeping the rest in memory.
+
+    Examples
+    --------
+    >>> W = ClauseWindow([[1, 2, -3], [-2, 4], [3], [-1, -4]], start=1, stop=3)
+    >>> len(W), W.number_of_literals()
+    (4, 8)
+    >>> list(W)
+    [[-2, 4], [3]]
+    """
+    def __init__(self, clauses=None, start=0, stop=None):
+        self.start = start
+        self.stop = stop
+        self._stored = []
+        self._length = 0
+        self._literals = 0
+        for c in clauses or []:
+            self.append(c)
+
+    def append(self, clause):
+        """Count a clause, and store it if it is in the window"""
+        if self.start <= self._length and \
+           (self.stop is None or self._length < self.stop):
+            self._stored.append(list(clause))
+        self._length += 1
+        self._literals += len(clause)
+
+    def extend(self, clauses):
+        """Count a sequence of clauses"""
+        for c in clauses:
+            self.append(c)
+
+    def __len__(self):
+        return self._length
+
+    def number_of_literals(self):
+        """Total number of literals in all the clauses"""
+        return self._literals
+
+    def __iter__(self):
+        return iter(self._stored)
+
+    def __getitem__(self, idx):
+        raise RuntimeError("only a window of the clauses is stored")
+
+    def __repr__(self):
+        return 'ClauseWindow(start={}, stop={}, clauses={})'.format(
+            self.start, self.stop, self._length)
+
+
+class ClausePipeline:
+    """Clause storage made of stored clauses and of lazy streams
+
+    The clauses are a sequence of segments. Clauses added with
+    ``append`` are stored in a list, while a *clause stream* added
+    with :py:meth:`extend_lazily` is kept as it is, and its clauses
+    are only computed when the storage is iterated. A clause stream
+    is an object that can be iterated many times, with ``__len__``
+    and ``number_of_literals`` (e.g.
+    :py:class:`cnfgen.transformations.substitutions.SubstitutedClauses`).
+
+    Random access is linear time.
+
+    Examples
+    --------
+    >>> C = ClausePipeline([[1, 2]])
+    >>> C.extend_lazily([[-1], [3, 4, 5]])
+    >>> C.append([-2])
+    >>> len(C), C.number_of_literals()
+    (4, 7)
+    >>> list(C)
+    [[1, 2], [-1], [3, 4, 5], [-2]]
+    >>> C[2]
+    [3, 4, 5]
+    """
+    def __init__(self, clauses=None):
+        self._segments = []
+        for c in clauses or []:
+            self.append(c)
+
+    def _stored(self):
+        if not self._segments or not isinstance(self._segments[-1], list):
+            self._segments.append([])
+        return self._segments[-1]
+
+    def append(self, clause):
+        """Store a clause at the end of the sequence"""
+        self._stored().append(list(clause))
+
+    def extend(self, clauses):
+        """Store a sequence of clauses at the end of the sequence"""
+        self._stored().extend(list(c) for c in clauses)
+
+    def extend_lazily(self, stream):
+        """Add a clause stream at the end of the sequence"""
+        self._segments.append(stream)
+
+    def __len__(self):
+        return sum(len(seg) for seg in self._segments)
+
+    def number_of_literals(self):
+        """Total number of literals in the clauses"""
+        count = 0
+        for seg in self._segments:
+            if isinstance(seg, list):
+                count += sum(len(c) for c in seg)
+            elif hasattr(seg, 'number_of_literals'):
+                count += seg.number_of_literals()
+            else:
+                count += sum(len(c) for c in seg)
+        return count
+
+    def __iter__(self):
+        for seg in self._segments:
+            for c in seg:
+                yield list(c)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        m = len(self)
+        if idx < 0:
+            idx += m
+        if not 0 <= idx < m:
+            raise IndexError("clause index out of range")
+        return next(islice(self, idx, None))
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and \
+                all(a == list(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return 'ClausePipeline({})'.format(list(self))
+
+
 class BaseCNF:
     """Basic propositional formulas in conjunctive normal form.
 
@@ -70,6 +560,17 @@ class BaseCNF:
     only be added, and not deleted. Furthermore order matters in
     the representation.
 
+    Clauses are stored in a list of lists, unless the class attribute
+    ``clause_store`` is set to some other container type (e.g.
+    :py:class:`CompactClauses`, :py:class:`ClauseSpool`,
+    :py:class:`ClauseCounter`, :py:class:`ClauseWindow` or
+    :py:class:`ClausePipeline`) which supports ``append`` and
+    ``extend``.
+
+    Families which generate clauses with
+    :py:meth:`add_clauses_by_chunks` use ``jobs`` worker processes,
+    according to the class attribute of the same name.
+
     Examples
     --------
     >>> c=BaseCNF([[1, 2, -3], [-2, 4]])
@@ -82,6 +583,9 @@ class BaseCNF:
     [-2, 4]
     """
 
+    clause_store = list
+    jobs = 1
+
     def __init__(self, clauses=None, description=None):
         """Propositional formulas in conjunctive normal form.
 
@@ -112,9 +616,9 @@ class BaseCNF:
 
         # Initial empty formula
         self._numvar = 0
-        self._clauses = []
-        for c in clauses or []:
-            self.add_clause(c, check=True)
+        self._clauses = self.clause_store()
+        if clauses:
+            self.add_clauses_from(clauses, check=True)
 
     def __str__(self):
         """String representation of the formula
@@ -144,6 +648,31 @@ class BaseCNF:
     def number_of_variables(self):
         return self._numvar
 
+    def number_of_literals(self):
+        """Total number of literals in the clauses of the formula
+
+        Examples
+        --------
+        >>> BaseCNF([[1, 2, -3], [-2, 4], []]).number_of_literals()
+        5
+        """
+        count = getattr(self._clauses, 'number_of_literals', None)
+        if count is not None:
+            return count()
+        return sum(len(c) for c in self._clauses)
+
+    def size(self):
+        """Number of variables, clauses and literals of the formula
+
+        Examples
+        --------
+        >>> BaseCNF([[1, 2, -3], [-2, 4], []]).size()
+        FormulaSize(variables=4, clauses=3, literals=5)
+        """
+        return FormulaSize(self.number_of_variables(),
+                           self.number_of_clauses(),
+                           self.number_of_literals())
+
     def number_of_clauses(self):
         return len(self)
 
@@ -288,6 +817,12 @@ not have any effect."""
     def add_clauses_from(self, clauses, check=True):
         """Add a sequence of clauses to the CNF
 
+        The clauses are added in blocks: the literals of a whole block
+        are validated at once, then the block is added to the clause
+        storage. This is much faster than calling
+        :py:meth:`add_clause` for each clause. If some literal is not
+        valid, the clauses of its block are not added.
+
         Parameters
         ----------
         clause: list of clauses
@@ -295,10 +830,125 @@ not have any effect."""
 
         check : bool
             check that all literals as integer and update the number of variables, based
-            on the literal present in the clause. (default: False)
+            on the literal present in the clause. (default: True)
+
+        Examples
+        --------
+        >>> c = BaseCNF()
+        >>> c.add_clauses_from(([-i, i+1] for i in range(1, 4)))
+        >>> list(c), c.number_of_variables()
+        ([[-1, 2], [-2, 3], [-3, 4]], 4)
         """
-        for c in clauses:
-            self.add_clause(c, check=check)
+        if not check:
+            self._clauses.extend(map(list, clauses))
+            return
+        clauses = iter(clauses)
+        while True:
+            block = list(map(list, islice(clauses, CLAUSE_BLOCK_SIZE)))
+            if not block:
+                return
+            self._check_and_update(list(chain.from_iterable(block)))
+            self._clauses.extend(block)
+
+    def add_clauses_from_buffer(self, literals, offsets, check=True):
+        """Add the clauses stored in a flat buffer of literals
+
+        The literals of the i-th clause are
+        ``literals[offsets[i]:offsets[i+1]]``, which is the layout of
+        :py:class:`CompactClauses`. When the clauses of the formula
+        are stored in compact form, the buffer is copied as a whole.
+
+        Parameters
+        ----------
+        literals: sequence of int
+            the literals of all clauses, one after the other
+        offsets: sequence of int
+            the positions where the clauses start, followed by the
+            position where the last one ends
+        check : bool
+            check that all literals as integer and update the number of variables, based
+            on the literal present in the clauses. (default: True)
+
+        Examples
+        --------
+        >>> c = BaseCNF()
+        >>> c.add_clauses_from_buffer([1, -2, 3, -1, 4], [0, 2, 2, 5])
+        >>> list(c), c.number_of_variables()
+        ([[1, -2], [], [3, -1, 4]], 4)
+        """
+        if len(offsets) < 2:
+            return
+        if check:
+            self._check_and_update(literals[offsets[0]:offsets[-1]])
+        store = self._clauses
+        if isinstance(store, CompactClauses):
+            store.extend_from_buffer(literals, offsets)
+        else:
+            store.extend(list(literals[offsets[i]:offsets[i+1]])
+                         for i in range(len(offsets) - 1))
+
+    def add_clause_stream(self, stream):
+        """Add clauses that are computed only when they are needed
+
+        If the clauses of the formula are stored in
+        a :py:class:`ClausePipeline`, the clause `stream` is kept as
+        it is, and its clauses are computed every time the formula is
+        read. Otherwise the clauses are immediately added.
+
+        The variables in the clauses are not checked, hence they must
+        already be in the formula.
+
+        Parameters
+        ----------
+        stream:
+            an object that can be iterated many times, and that has
+            ``__len__`` and ``number_of_literals``
+        """
+        if isinstance(self._clauses, ClausePipeline):
+            self._clauses.extend_lazily(stream)
+        else:
+            self.add_clauses_from(stream, check=False)
+
+    def add_clauses_by_chunks(self, chunk_function, total, *args):
+        """Add the clauses generated over the ranges of an enumeration
+
+        The function ``chunk_function(start, stop, *args)`` generates
+        the clauses for the positions from `start` to `stop`
+        (excluded) of some enumeration of length `total`. If the class
+        attribute ``jobs`` is larger than one, the enumeration is split
+        into ranges which are generated in parallel by that many
+        worker processes (see :py:mod:`cnfgen.formula.parallel`), hence
+        `chunk_function` and `args` must be picklable.
+
+        In any case the clauses are added in the same order, so the
+        formula does not depend on the number of jobs.
+
+        Parameters
+        ----------
+        chunk_function: function
+            generates the clauses for a range of positions
+        total: int
+            number of positions in the enumeration
+        *args:
+            additional arguments for `chunk_function`
+
+        Examples
+        --------
+        >>> from itertools import combinations
+        >>> def pairs(start, stop):
+        ...     return list(combinations(range(1, 5), 2))[start:stop]
+        >>> F = BaseCNF()
+        >>> F.add_clauses_by_chunks(pairs, 6)
+        >>> list(F)
+        [[1, 2], [1, 3], [1, 4], [2, 3], [2, 4], [3, 4]]
+        """
+        if self.jobs <= 1:
+            self.add_clauses_from(chunk_function(0, total, *args))
+            return
+        from cnfgen.formula.parallel import parallel_chunks
+        for chunk in parallel_chunks(chunk_function, total, args,
+                                     jobs=self.jobs):
+            self.add_clauses_from_buffer(chunk.literals, chunk.offsets)
 
     def variables(self):
         """Return the list of variables"""
@@ -12,6 +12,7 @@ from collections import OrderedDict
 from cnfgen.info import info
 
 from cnfgen.localtypes import non_negative_int
+from cnfgen.formula.linear import _parity_chain
 
 class ConstraintsView:
     """Object that represents a list of constraints
@@ -455,7 +456,10 @@ not have any effect."""
         """Return the objective"""
         return self._objective
 
-    def cardinality_geq(self, lits, value,check=True):
+    # Cardinality constraints are native in OPB: the `encoding`
+    # argument is only for compatibility with CNF formulas, and it is
+    # ignored.
+    def cardinality_geq(self, lits, value, check=True, encoding=None):
         """Encoding of \"at least\" constraint
 
         >>> c = BaseOPB()
@@ -466,7 +470,7 @@ not have any effect."""
         lits = [(1,l) for l in lits]
         self.add_constraint(lits + ['>=', value], check=check)
 
-    def cardinality_leq(self, lits, value,check=True):
+    def cardinality_leq(self, lits, value, check=True, encoding=None):
         """Encoding of \"at most\" constraint
 
         >>> c = BaseOPB()
@@ -477,7 +481,7 @@ not have any effect."""
         lits = [(1,l) for l in lits]
         self.add_constraint(lits + ['<=', value], check=check)
 
-    def cardinality_eq(self, lits, value,check=True):
+    def cardinality_eq(self, lits, value, check=True, encoding=None):
         """Encoding of \"equal to\" constraint
 
         >>> c = BaseOPB()
@@ -488,7 +492,7 @@ not have any effect."""
         lits = [(1,l) for l in lits]
         self.add_constraint(lits + ['==', value], check=check)
 
-    def cardinality_neq(self, lits, value,check=True):
+    def cardinality_neq(self, lits, value, check=True, encoding=None):
         """Encoding of \"not equal\" constraint
 
         This is not a linear constraint, thus it has to be blasted
@@ -515,7 +519,7 @@ not have any effect."""
             for i in flips:
                 lits[i] *= -1
 
-    def add_loose_majority(self, lits, check=True):
+    def add_loose_majority(self, lits, check=True, encoding=None):
         """Encoding of \"at least half\" constraint
 
         >>> c = BaseOPB()
@@ -527,7 +531,7 @@ not have any effect."""
         threshold = ((len(lits) + 1) // 2)
         self.add_constraint(lits + ['>=', threshold], check=check)
 
-    def add_loose_minority(self, lits, check=True):
+    def add_loose_minority(self, lits, check=True, encoding=None):
         """Encoding of \"at most half\" constraint
 
         >>> c = BaseOPB()
@@ -539,7 +543,7 @@ not have any effect."""
         threshold = len(lits)//2
         self.add_constraint(lits + ['<=', threshold], check=check)
 
-    def add_strict_majority(self, lits, check=True):
+    def add_strict_majority(self, lits, check=True, encoding=None):
         """Encoding of "strict majority" constraint
 
         >>> c = BaseOPB()
@@ -551,7 +555,7 @@ not have any effect."""
         threshold = len(lits)//2
         self.add_constraint(lits + ['>', threshold], check=check)
 
-    def add_strict_minority(self, lits, check=True):
+    def add_strict_minority(self, lits, check=True, encoding=None):
         """Encoding \"at most half\" constraint
 
         >>> c = BaseOPB()
@@ -563,7 +567,7 @@ not have any effect."""
         threshold = ((len(lits) + 1) // 2)
         self.add_constraint(lits + ['<', threshold], check=check)
 
-    def add_parity(self, lits, constant, check=True):
+    def add_parity(self, lits, constant, check=True, maxwidth=None):
         """Adds the CNF encoding of a parity constraint
 
         E.g. X1 + X2 + X3 = 1 (mod 2) is encoded as
@@ -581,6 +585,9 @@ not have any effect."""
             the constant of the linear equation
         check : bool
             check that the literals are valid and update the variable count
+        maxwidth : int, optional
+            split long parities into chains of parities on at most
+            `maxwidth` literals (see :py:meth:`CNFLinear.add_parity`)
 
         Returns
         -------
@@ -603,6 +610,12 @@ not have any effect."""
             # dummy constraint, just to check the literals once
             self._check_and_update_literals([(1,l) for l in lits], True)
 
+        if maxwidth is not None and len(lits) > maxwidth:
+            for sublits, subconstant in _parity_chain(self, list(lits),
+                                                      constant, maxwidth):
+                self.add_parity(sublits, subconstant, check=False)
+            return
+
         desired_sign = 1 if constant == 1 else -1
         for signs in product([1, -1], repeat=len(lits)):
             # Save only the clauses with the right polarity
@@ -13,6 +13,11 @@ Copyright (C) 2012-2022  Massimo Lauria <lauria.massimo@gmail.com>
 https://github.com/MassimoLauria/cnfgen.git
 
 """
+from cnfgen.formula.basecnf import CompactClauses
+from cnfgen.formula.basecnf import ClauseSpool
+from cnfgen.formula.basecnf import ClauseCounter
+from cnfgen.formula.basecnf import ClauseWindow
+from cnfgen.formula.basecnf import ClausePipeline
 from cnfgen.formula.cnfio import CNFio
 from cnfgen.formula.linear import CNFLinear
 from cnfgen.formula.variables import VariablesManager
@@ -72,3 +77,138 @@ class CNF(VariablesManager, CNFio, CNFLinear):
                            clauses=clauses,
                            description=description)
         VariablesManager.__init__(self,self)
+
+
+class CompactCNF(CNF):
+    """CNF formula with a compact clause storage
+
+    Same as :py:class:`CNF` but clauses are stored in flat arrays of
+    integers (see :py:class:`cnfgen.formula.basecnf.CompactClauses`),
+    which take roughly 4 bytes per literal. Useful for very large
+    formulas: any formula family can build it by passing
+    ``formula_class=CompactCNF``.
+
+    Examples
+    --------
+    >>> c=CompactCNF([[1, 2, -3], [-2, 4]])
+    >>> c.add_clause([-3, 4, -5])
+    >>> print( c.to_dimacs(),end='')
+    p cnf 5 3
+    1 2 -3 0
+    -2 4 0
+    -3 4 -5 0
+    >>> print(c[1])
+    [-2, 4]
+    >>> c.clauses() == CNF([[1, 2, -3], [-2, 4], [-3, 4, -5]]).clauses()
+    True
+    """
+    clause_store = CompactClauses
+
+
+class StreamingCNF(CNF):
+    """CNF formula which spools its clauses to disk
+
+    Same as :py:class:`CNF` but each clause is written in DIMACS
+    format to a temporary file as soon as it is added (see
+    :py:class:`cnfgen.formula.basecnf.ClauseSpool`). The memory used
+    does not depend on the number of clauses, and the DIMACS output
+    copies the spooled text directly after the ``p cnf`` line, which
+    is computed at the end. Reading the clauses back is slow.
+
+    Examples
+    --------
+    >>> c=StreamingCNF([[1, 2, -3], [-2, 4]])
+    >>> c.add_clause([-3, 4, -5])
+    >>> print( c.to_dimacs(),end='')
+    p cnf 5 3
+    1 2 -3 0
+    -2 4 0
+    -3 4 -5 0
+    >>> print(c[1])
+    [-2, 4]
+    """
+    clause_store = ClauseSpool
+
+
+class CountingCNF(CNF):
+    """CNF formula which only counts its clauses
+
+    Same as :py:class:`CNF` but the clauses are discarded as soon as
+    they are added, and only their number and total length are kept
+    (see :py:class:`cnfgen.formula.basecnf.ClauseCounter`). Building
+    a formula family with ``formula_class=CountingCNF`` gives its
+    size in constant memory. If the class attribute
+    ``literal_budget`` is set, building the formula raises
+    a `ValueError` as soon as the number of literals exceeds it.
+
+    Examples
+    --------
+    >>> from cnfgen import PigeonholePrinciple
+    >>> PigeonholePrinciple(5, 4, formula_class=CountingCNF).size()
+    FormulaSize(variables=20, clauses=45, literals=100)
+    >>> class SmallCNF(CountingCNF):
+    ...     literal_budget = 50
+    >>> PigeonholePrinciple(5, 4, formula_class=SmallCNF)
+    Traceback (most recent call last):
+    ...
+    ValueError: the formula has more than 50 literals
+    """
+    literal_budget = None
+
+    def clause_store(self):
+        return ClauseCounter(budget=self.literal_budget)
+
+
+class ShardCNF(CNF):
+    """CNF formula which keeps only a slice of its clauses
+
+    Same as :py:class:`CNF` but only the clauses in the positions
+    given by the class attribute ``clause_window`` are stored (see
+    :py:class:`cnfgen.formula.basecnf.ClauseWindow`). The number of
+    variables and clauses refers to the whole formula, while
+    iterating over the formula gives just the slice. Useful to
+    generate pieces of a very large formula on different machines.
+
+    Examples
+    --------
+    >>> from cnfgen import PigeonholePrinciple
+    >>> class FirstClauses(ShardCNF):
+    ...     clause_window = (0, 3)
+    >>> F = PigeonholePrinciple(5, 4, formula_class=FirstClauses)
+    >>> F.number_of_clauses()
+    45
+    >>> list(F)
+    [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]]
+    """
+    clause_window = (0, None)
+
+    def clause_store(self):
+        start, stop = self.clause_window
+        return ClauseWindow(start=start, stop=stop)
+
+
+class PipelineCNF(CNF):
+    """CNF formula which can compute its clauses lazily
+
+    Same as :py:class:`CNF` but the clauses added with
+    :py:meth:`add_clause_stream` are computed only when the formula is
+    read (see :py:class:`cnfgen.formula.basecnf.ClausePipeline`).
+    Formula transformations which produce a formula of this class keep
+    a reference to the original formula, so that a chain of
+    transformations does not store the intermediate formulas.
+
+    Examples
+    --------
+    >>> from cnfgen import XorSubstitution
+    >>> F = CNF([[1, -2]])
+    >>> G = XorSubstitution(F, 2, formula_class=PipelineCNF)
+    >>> G.number_of_clauses()
+    4
+    >>> print(G.to_dimacs(), end='')
+    p cnf 4 4
+    1 2 3 -4 0
+    1 2 -3 4 0
+    -1 -2 3 -4 0
+    -1 -2 -3 4 0
+    """
+    clause_store = ClausePipeline
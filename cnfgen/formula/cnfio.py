@@ -11,18 +11,33 @@ from cnfgen.utils.parsedimacs import to_dimacs_file, from_dimacs_file
 from cnfgen.utils.latexoutput import to_latex_string, to_latex_document
 from cnfgen.utils.solver import sat_solve, some_solver_installed
 from cnfgen.utils.opb    import to_opb_file
+from cnfgen.utils.binaryformat import to_binary_file, from_binary_file
+from cnfgen.utils.binaryformat import is_binary_file
+from cnfgen.utils.arrays import to_arrays, from_arrays
+from cnfgen.utils.compression import strip_compression_extension
 
 
 def guess_output_format(fileorname, fileformat_request):
     """Try to guess the appropriate file format
 
-    If `fileformat` is either `dimacs`, 'opb' or `tex` then the output is
-    saved in the corresponding format.
+    If `fileformat` is either `dimacs`, 'opb', `tex` or 'binary' then
+    the output is saved in the corresponding format.
 
     If `fileformat` is `None`, then DIMACS format is the default
-    output format unless the file name ends with '.tex' or '.opb'
+    output format unless the file name ends with '.tex', '.opb' or
+    '.cnfb' (binary format). A compression extension (e.g. '.gz', '.xz') is ignored, so that
+    'formula.opb.gz' is recognized as an OPB file.
+
+    Examples
+    --------
+    >>> guess_output_format('formula.opb.gz', None)
+    'opb'
+    >>> guess_output_format('formula.cnf.xz', None)
+    'dimacs'
+    >>> guess_output_format('formula.cnfb', None)
+    'binary'
     """
-    if fileformat_request in ['latex', 'dimacs','opb']:
+    if fileformat_request in ['latex', 'dimacs', 'opb', 'binary']:
         return fileformat_request
 
     if fileformat_request is None:
@@ -33,18 +48,21 @@ def guess_output_format(fileorname, fileformat_request):
                 name = fileorname
             else:
                 name = fileorname.name
+            name = strip_compression_extension(name)
             ext = os.path.splitext(name)[-1][1:]
-        except (AttributeError, ValueError, IndexError):
+        except (AttributeError, ValueError, IndexError, TypeError):
             pass
 
         if ext == 'tex':
             return 'latex'
         elif ext =='opb':
             return 'opb'
+        elif ext == 'cnfb':
+            return 'binary'
         else:
             return 'dimacs'
 
-    raise ValueError("fileformat_request can be either None, 'latex', 'opb' or 'dimacs'")
+    raise ValueError("fileformat_request can be either None, 'latex', 'opb', 'binary' or 'dimacs'")
 
 
 class CNFio(BaseCNF):
@@ -187,20 +205,26 @@ class CNFio(BaseCNF):
         """Save the formula to a file
 
         The formula is saved on file, in either as a DIMACS file, OPB
-        file, or as a LaTeX document.
+        file, as a LaTeX document, or in CNFgen binary format (see
+        :py:mod:`cnfgen.utils.binaryformat`).
 
-        If `fileformat` is either `dimacs`, 'opb' or `tex` then the output is
-        saved in the corresponding format.
+        If `fileformat` is either `dimacs`, 'opb', `tex` or 'binary'
+        then the output is saved in the corresponding format.
 
         If `fileformat` is `None`, then DIMACS format is the default
-        output format unless the file name ends with '.tex' or '.opb'
+        output format unless the file name ends with '.tex', '.opb' or
+        '.cnfb'
+
+        If the file name ends with a compression extension (e.g.
+        '.gz', '.bz2', '.xz', '.zst') the output is compressed on the
+        fly.
 
         Parameters
         ----------
         fileorname: file name or file object
             where to print the file (default: <stdout>)
 
-        fileformat: 'tex', 'opb', 'dimacs' or None
+        fileformat: 'tex', 'opb', 'dimacs', 'binary' or None
             format of the output file
 
         export_header: bool
@@ -225,6 +249,8 @@ class CNFio(BaseCNF):
                         fileorname,
                         export_header=export_header,
                         export_varnames=export_varnames)
+        elif fileformat == 'binary':
+            to_binary_file(self, fileorname)
         else:
             to_dimacs_file(self,
                            fileorname,
@@ -234,14 +260,63 @@ class CNFio(BaseCNF):
     def from_file(cls, fileorname=None):
         """Reads a DIMACS file into a CNF object
 
+        If the file name ends with a compression extension (e.g.
+        '.gz', '.bz2', '.xz', '.zst') the input is decompressed on
+        the fly. Files in CNFgen binary format are recognized and
+        memory mapped (see :py:mod:`cnfgen.utils.binaryformat`).
+
         Parameters
         ----------
         cnfclass: subclass of cnfgen.basecnf.BaseCNF
             the type of CNF object to produce
         fileorname: file object or string (or stdin if None)
             destination file given either as object or as filename"""
+        if fileorname is not None and is_binary_file(fileorname):
+            return from_binary_file(cls, fileorname)
         return from_dimacs_file(cls, fileorname)
 
+    def to_arrays(self, incidence=False):
+        """Literals and clause offsets of the formula as NumPy arrays
+
+        The literals of the i-th clause are
+        ``literals[offsets[i]:offsets[i+1]]``. Optionally the
+        clause-variable incidence matrix is returned as well, as
+        a ``scipy.sparse.csr_matrix``.
+        See :py:func:`cnfgen.utils.arrays.to_arrays`.
+
+        Parameters
+        ----------
+        incidence: bool
+            also return the incidence matrix (default: False)
+
+        Returns
+        -------
+        (literals, offsets) or (literals, offsets, matrix)
+        """
+        return to_arrays(self, incidence=incidence)
+
+    @classmethod
+    def from_arrays(cls, literals, offsets, nvars=None, header=None):
+        """Build a formula from NumPy arrays of literals and clause offsets
+
+        This is the inverse of :py:meth:`to_arrays`.
+        See :py:func:`cnfgen.utils.arrays.from_arrays`.
+
+        Parameters
+        ----------
+        literals: array of integers
+            the literals of all clauses, one after the other
+        offsets: array of integers
+            the positions where the clauses start, followed by the
+            number of literals
+        nvars: int, optional
+            the number of variables (default: the largest variable
+            occurring in the clauses)
+        header: dict, optional
+            the header of the formula
+        """
+        return from_arrays(cls, literals, offsets, nvars=nvars, header=header)
+
     def solve(self, cmd=None, sameas=None, verbose=0):
         """Solve the formula with a SAT solver
 
@@ -7,6 +7,16 @@ This CNF formula type supports
 - integer  linear inequalities on literals (no coefficients)
   for example 'atmost k'
 
+Linear inequalities can be encoded directly on the literals
+(`naive` encoding, exponential in general) or with auxiliary
+variables, using one of the encodings in `CARDINALITY_ENCODINGS`:
+
+- `sequential`: the sequential counter by Sinz
+- `totalizer`: the totalizer by Bailleux and Boufkhad
+- `sortnetwork`: an odd-even merge sorting network (Batcher)
+- `cardnetwork`: the cardinality networks by Asín, Nieuwenhuis,
+  Oliveras and Rodríguez-Carbonell
+
 
 Copyright (C) 2021, 2022, 2023 Massimo Lauria <lauria.massimo@gmail.com>
 https://github.com/MassimoLauria/cnfgen.git
@@ -21,6 +31,10 @@ from inspect import isgenerator
 from cnfgen.formula.basecnf import BaseCNF
 
 
+CARDINALITY_ENCODINGS = ['naive', 'sequential', 'totalizer',
+                         'sortnetwork', 'cardnetwork']
+
+
 class CNFLinear(BaseCNF):
     """CNF with linear constraints"""
     def __init__(self, clauses=None, description=None):
@@ -29,7 +43,7 @@ class CNFLinear(BaseCNF):
     ###
     # Various utility function for CNFs
     ###
-    def add_parity(self, lits, constant, check=True):
+    def add_parity(self, lits, constant, check=True, maxwidth=None):
         """Adds the CNF encoding of a parity constraint
 
         E.g. X1 + X2 + X3 = 1 (mod 2) is encoded as
@@ -47,6 +61,11 @@ class CNFLinear(BaseCNF):
             the constant of the linear equation
         check : bool
             check that the literals are valid and update the variable count
+        maxwidth : int, optional
+            if the parity is on more than `maxwidth` literals, it is
+            split into a chain of parities on at most `maxwidth`
+            literals, linked by new auxiliary variables. Then the
+            encoding has linear size instead of exponential.
 
         Returns
         -------
@@ -70,12 +89,22 @@ class CNFLinear(BaseCNF):
         >>> C.add_parity([1,2,3],0)
         >>> list(C)
         [[1, 2, -3], [1, -2, 3], [-1, 2, 3], [-1, -2, -3]]
+        >>> C=CNFLinear()
+        >>> C.add_parity([1,2,3,4],1,maxwidth=3)
+        >>> list(C)
+        [[1, 2, -5], [1, -2, 5], [-1, 2, 5], [-1, -2, -5], [5, 3, 4], [5, -3, -4], [-5, 3, -4], [-5, -3, 4]]
         """
         if isgenerator(lits):
             lits = list(lits)
         if check:
             self._check_and_update(lits)
 
+        if maxwidth is not None and len(lits) > maxwidth:
+            for sublits, subconstant in _parity_chain(self, list(lits),
+                                                      constant, maxwidth):
+                self.add_parity(sublits, subconstant, check=False)
+            return
+
         desired_sign = 1 if constant == 1 else -1
         for signs in product([1, -1], repeat=len(lits)):
             # Save only the clauses with the right polarity
@@ -84,12 +113,20 @@ class CNFLinear(BaseCNF):
                 self.add_clause([lit*sign for lit, sign in zip(lits, signs)],
                                 check=False)
 
-    def add_linear(self, lits, op, constant, check=True):
+    def add_linear(self, lits, op, constant, check=True, encoding='naive'):
         """Add a linear constraint to the formula
 
         Encodes an equality or an inequality constraint on literals (no
         coeffcients) as clauses.
 
+        The `naive` encoding uses no auxiliary variables, but may
+        produce exponentially many clauses. The other encodings (see
+        `CARDINALITY_ENCODINGS`) add new auxiliary variables, so that
+        the formula is equivalent to the constraint, up to
+        projection on the original variables. When the formula has
+        a variable manager the auxiliary variables are registered
+        there, with a label referring to the encoding.
+
         Parameters
         ----------
         lits : array-like
@@ -100,6 +137,8 @@ class CNFLinear(BaseCNF):
             the constant of the linear equation
         check : bool
             check that the literals are valid and update the variable count
+        encoding : str
+            one among `CARDINALITY_ENCODINGS`
         Returns
         -------
         None
@@ -126,11 +165,20 @@ class CNFLinear(BaseCNF):
         >>> c.add_linear([1,2,3],'<=',10)
         >>> list(c)
         []
+        >>> c = CNFLinear()
+        >>> c.add_linear([1,2,3,4],'<=',1,encoding='sequential')
+        >>> c.number_of_variables()
+        10
+        >>> list(c)[-3:]
+        [[-8, 10], [-4, -7, 10], [-10]]
         """
         operators = ['<=', ">=", '<', '>', '==', '!=']
         if op not in operators:
             raise ValueError('Invalid operator, only {} allowed'.
                              format(", ".join(operators)))
+        if encoding not in CARDINALITY_ENCODINGS:
+            raise ValueError('Invalid encoding, only {} allowed'.
+                             format(", ".join(CARDINALITY_ENCODINGS)))
 
         if isgenerator(lits):
             lits = list(lits)
@@ -138,6 +186,10 @@ class CNFLinear(BaseCNF):
         if check:
             self._check_and_update(lits)
 
+        if encoding != 'naive':
+            self._add_linear_with_counter(list(lits), op, constant, encoding)
+            return
+
         # We fist manage the case of !=
         if op == "!=":
             n = len(lits)
@@ -179,26 +231,29 @@ class CNFLinear(BaseCNF):
             return
 
         k = len(lits) - constant + 1
-        for clause in combinations(lits, k):
-            self.add_clause(clause, check=False)
+        self.add_clauses_from(combinations(lits, k), check=False)
 
-    def cardinality_geq(self, lits, value,check=True):
+    def cardinality_geq(self, lits, value, check=True, encoding='naive'):
         """Clauses encoding a \"at least " constraint """
-        return self.add_linear(lits, '>=', value, check=check)
+        return self.add_linear(lits, '>=', value, check=check,
+                               encoding=encoding)
 
-    def cardinality_leq(self, lits, value,check=True):
+    def cardinality_leq(self, lits, value, check=True, encoding='naive'):
         """Clauses encoding a \"at most " constraint """
-        return self.add_linear(lits, '<=', value, check=check)
+        return self.add_linear(lits, '<=', value, check=check,
+                               encoding=encoding)
 
-    def cardinality_eq(self, lits, value,check=True):
+    def cardinality_eq(self, lits, value, check=True, encoding='naive'):
         """Clauses encoding a 'exactly equal to' constraint """
-        return self.add_linear(lits, '==', value, check=check)
+        return self.add_linear(lits, '==', value, check=check,
+                               encoding=encoding)
 
-    def cardinality_neq(self, lits, value,check=True):
+    def cardinality_neq(self, lits, value, check=True, encoding='naive'):
         """Clauses encoding a 'different from' constraint """
-        return self.add_linear(lits, '!=', value, check=check)
+        return self.add_linear(lits, '!=', value, check=check,
+                               encoding=encoding)
 
-    def add_loose_majority(self, lits, check=True):
+    def add_loose_majority(self, lits, check=True, encoding='naive'):
         """Clauses encoding a \"at least half\" constraint
 
         Parameters
@@ -207,13 +262,16 @@ class CNFLinear(BaseCNF):
            literals in the constraint
         check : bool
             check that the literals are valid and update the variable count
+        encoding : str
+            one among `CARDINALITY_ENCODINGS` (see :py:meth:`add_linear`)
         """
         if isgenerator(lits):
             lits = list(lits)
         threshold = ((len(lits) + 1) // 2)
-        return self.add_linear(lits, '>=', threshold, check=check)
+        return self.add_linear(lits, '>=', threshold, check=check,
+                               encoding=encoding)
 
-    def add_loose_minority(self, lits, check=True):
+    def add_loose_minority(self, lits, check=True, encoding='naive'):
         """Clauses encoding a \"at most half\" constraint
 
         Parameters
@@ -222,13 +280,16 @@ class CNFLinear(BaseCNF):
            literals in the constraint
         check : bool
             check that the literals are valid and update the variable count
+        encoding : str
+            one among `CARDINALITY_ENCODINGS` (see :py:meth:`add_linear`)
         """
         if isgenerator(lits):
             lits = list(lits)
         threshold = len(lits) // 2
-        return self.add_linear(lits, '<=', threshold, check=check)
+        return self.add_linear(lits, '<=', threshold, check=check,
+                               encoding=encoding)
 
-    def add_strict_majority(self, lits, check=True):
+    def add_strict_majority(self, lits, check=True, encoding='naive'):
         """Clauses encoding a "strict majority" constraint
 
         Parameters
@@ -237,13 +298,16 @@ class CNFLinear(BaseCNF):
            literals in the constraint
         check : bool
             check that the literals are valid and update the variable count
+        encoding : str
+            one among `CARDINALITY_ENCODINGS` (see :py:meth:`add_linear`)
         """
         if isgenerator(lits):
             lits = list(lits)
         threshold = len(lits)//2 + 1
-        return self.add_linear(lits, '>=', threshold, check=check)
+        return self.add_linear(lits, '>=', threshold, check=check,
+                               encoding=encoding)
 
-    def add_strict_minority(self, lits, check=True):
+    def add_strict_minority(self, lits, check=True, encoding='naive'):
         """Clauses encoding a \"at most half\" constraint
 
         Parameters
@@ -252,8 +316,330 @@ class CNFLinear(BaseCNF):
            literals in the constraint
         check : bool
             check that the literals are valid and update the variable count
+        encoding : str
+            one among `CARDINALITY_ENCODINGS` (see :py:meth:`add_linear`)
         """
         if isgenerator(lits):
             lits = list(lits)
         threshold = (len(lits) - 1) // 2
-        return self.add_linear(lits, '<=', threshold, check=check)
+        return self.add_linear(lits, '<=', threshold, check=check,
+                               encoding=encoding)
+
+    ###
+    # Encodings of linear constraints with auxiliary variables
+    ###
+    def _add_linear_with_counter(self, lits, op, constant, encoding):
+        """Encode a linear constraint using a unary counter
+
+        The counter has output variables `o_1`, `o_2`, ..., `o_m`
+        where `o_j` represents the fact that at least `j` literals are
+        true. Clauses in the `up` direction force `o_j` to be true when
+        at least `j` literals are, clauses in the `down` direction
+        force `o_j` to be false otherwise. Depending on the constraint
+        one or both directions are needed.
+        """
+        n = len(lits)
+        if op == '<':
+            op, constant = '<=', constant - 1
+        elif op == '>':
+            op, constant = '>=', constant + 1
+
+        # Tautologies and invalid constraints
+        if op == '>=' and constant <= 0:
+            return
+        if op == '<=' and constant >= n:
+            return
+        if op == '!=' and (constant < 0 or constant > n):
+            return
+        if (op == '>=' and constant > n) or \
+           (op == '<=' and constant < 0) or \
+           (op == '==' and (constant < 0 or constant > n)):
+            self.add_clause([], check=False)
+            return
+
+        # Counting the false literals may need a shorter counter
+        def counter_length(op, k):
+            return {'>=': k, '<=': k + 1}.get(op, min(n, k + 1))
+
+        flipped = {'>=': '<=', '<=': '>=', '==': '==', '!=': '!='}[op]
+        if counter_length(flipped, n - constant) < counter_length(op, constant):
+            lits = [-lit for lit in lits]
+            op, constant = flipped, n - constant
+
+        m = counter_length(op, constant)
+        up = op != '>='
+        down = op != '<='
+        if encoding == 'sequential':
+            out = self._sequential_counter(lits, m, up, down)
+        elif encoding == 'totalizer':
+            out = self._totalizer(lits, m, up, down)
+        elif encoding == 'sortnetwork':
+            comparators, outputs = _oddeven_sort(list(range(n)))
+            out = self._comparator_network(lits, comparators, outputs[:m],
+                                           up, down, 'sortnet')
+        else:
+            comparators, outputs = _oddeven_sort(list(range(n)), m)
+            out = self._comparator_network(lits, comparators, outputs,
+                                           up, down, 'cardnet')
+
+        k = constant
+        if op == '>=':
+            self.add_clause([out[k-1]], check=False)
+        elif op == '<=':
+            self.add_clause([-out[k]], check=False)
+        elif op == '==':
+            if k > 0:
+                self.add_clause([out[k-1]], check=False)
+            if k < n:
+                self.add_clause([-out[k]], check=False)
+        else:
+            clause = []
+            if k > 0:
+                clause.append(-out[k-1])
+            if k < n:
+                clause.append(out[k])
+            self.add_clause(clause, check=False)
+
+    def _sequential_counter(self, lits, m, up, down):
+        """Sequential counter on `lits`, counting up to `m`
+
+        The register `s[j]` after the `i`-th literal represents the
+        fact that at least `j` among the first `i` literals are true.
+        The first literal is its own register."""
+        n = len(lits)
+        if n == 0 or m == 0:
+            return []
+        count = sum(min(i, m) for i in range(2, n + 1))
+        aux = iter(_auxiliary_variables(self, count, 'seqcounter'))
+        add_clause = self.add_clause
+        prev = [lits[0]]
+        for x in lits[1:]:
+            cur = [next(aux) for _ in range(min(len(prev) + 1, m))]
+            for j, s in enumerate(cur):
+                if up:
+                    if j < len(prev):
+                        add_clause([-prev[j], s], check=False)
+                    if j == 0:
+                        add_clause([-x, s], check=False)
+                    else:
+                        add_clause([-x, -prev[j-1], s], check=False)
+                if down:
+                    if j < len(prev):
+                        add_clause([-s, prev[j], x], check=False)
+                    else:
+                        add_clause([-s, x], check=False)
+                    if j > 0:
+                        add_clause([-s, prev[j-1]], check=False)
+            prev = cur
+        return prev
+
+    def _totalizer(self, lits, m, up, down):
+        """Totalizer on `lits`, counting up to `m`
+
+        The literals are split in two halves, recursively counted,
+        and the two unary counts are summed."""
+        if len(lits) == 0 or m == 0:
+            return []
+
+        def size(n):
+            if n <= 1:
+                return 0
+            return size(n // 2) + size(n - n // 2) + min(n, m)
+
+        aux = iter(_auxiliary_variables(self, size(len(lits)), 'totalizer'))
+        add_clause = self.add_clause
+
+        def build(lits):
+            if len(lits) == 1:
+                return lits
+            h = len(lits) // 2
+            a = build(lits[:h])
+            b = build(lits[h:])
+            r = [next(aux) for _ in range(min(len(lits), m))]
+            p, q = len(a), len(b)
+            for i in range(p + 1):
+                for j in range(q + 1):
+                    if up and 1 <= i + j <= len(r):
+                        clause = [r[i+j-1]]
+                        if i > 0:
+                            clause.append(-a[i-1])
+                        if j > 0:
+                            clause.append(-b[j-1])
+                        add_clause(clause, check=False)
+                    if down and i + j < len(r):
+                        clause = [-r[i+j]]
+                        if i < p:
+                            clause.append(a[i])
+                        if j < q:
+                            clause.append(b[j])
+                        add_clause(clause, check=False)
+            return r
+
+        return build(list(lits))
+
+    def _comparator_network(self, lits, comparators, outputs, up, down, name):
+        """Encode a network of comparators on `lits`
+
+        A comparator `(i, j)` puts the maximum of wires `i` and `j` on
+        wire `i`, and the minimum on wire `j`. Only the comparators
+        that influence the `outputs` wires are encoded, and only their
+        halves (maximum or minimum) which are actually used."""
+        needed = set(outputs)
+        modes = []
+        for i, j in reversed(comparators):
+            need_max, need_min = i in needed, j in needed
+            modes.append((need_max, need_min))
+            if need_max or need_min:
+                needed.add(i)
+                needed.add(j)
+        modes.reverse()
+
+        count = sum(need_max + need_min for need_max, need_min in modes)
+        aux = iter(_auxiliary_variables(self, count, name))
+        add_clause = self.add_clause
+        wires = list(lits)
+        for (i, j), (need_max, need_min) in zip(comparators, modes):
+            a, b = wires[i], wires[j]
+            if need_max:
+                c = next(aux)
+                if up:
+                    add_clause([-a, c], check=False)
+                    add_clause([-b, c], check=False)
+                if down:
+                    add_clause([-c, a, b], check=False)
+                wires[i] = c
+            if need_min:
+                d = next(aux)
+                if up:
+                    add_clause([-a, -b, d], check=False)
+                if down:
+                    add_clause([-d, a], check=False)
+                    add_clause([-d, b], check=False)
+                wires[j] = d
+        return [wires[o] for o in outputs]
+
+
+def _auxiliary_variables(formula, count, name):
+    """Allocate `count` new variables in `formula` for an encoding
+
+    The variables are registered in the variable manager of the
+    formula, if there is one. Each encoding gets its own variables,
+    named `name` followed by the number of the encoding in the formula
+    and by the index of the variable, e.g. `seqcounter3_1`."""
+    if count == 0:
+        return []
+    new_block = getattr(formula, 'new_block', None)
+    if new_block is not None:
+        formula._encodings = getattr(formula, '_encodings', 0) + 1
+        label = '{}{}_{{}}'.format(name, formula._encodings)
+        return list(new_block(count, label=label))
+    first = formula.number_of_variables() + 1
+    formula.update_variable_number(first + count - 1)
+    return list(range(first, first + count))
+
+
+def _parity_chain(formula, lits, constant, maxwidth):
+    """Split a parity constraint into a chain of shorter ones
+
+    The constraint on `lits` is split into parities on at most
+    `maxwidth` literals, linked by new auxiliary variables of
+    `formula`. Each auxiliary variable is the parity of the literals
+    before it in the chain.
+
+    Returns the list of the pairs (literals, constant) of the
+    parity constraints in the chain.
+
+    Examples
+    --------
+    >>> F = CNFLinear()
+    >>> F.update_variable_number(7)
+    >>> for chain in _parity_chain(F, [1, 2, 3, 4, 5, 6, 7], 1, 3):
+    ...     print(*chain)
+    [1, 2, 8] 0
+    [8, 3, 9] 0
+    [9, 4, 10] 0
+    [10, 5, 11] 0
+    [11, 6, 7] 1
+    >>> _parity_chain(F, [1, 2, 3, 4, 5, 6, 7], 1, 5)
+    [([1, 2, 3, 4, 12], 0), ([12, 5, 6, 7], 1)]
+    """
+    if maxwidth < 3:
+        raise ValueError("parities can only be split into parities of width at least 3")
+    n = len(lits)
+    count = 1
+    pos = maxwidth - 1
+    while n - pos > maxwidth - 1:
+        pos += maxwidth - 2
+        count += 1
+    aux = _auxiliary_variables(formula, count, 'xorchain')
+    chain = [(lits[:maxwidth - 1] + [aux[0]], 0)]
+    pos = maxwidth - 1
+    for y, z in zip(aux, aux[1:]):
+        chain.append(([y] + lits[pos:pos + maxwidth - 2] + [z], 0))
+        pos += maxwidth - 2
+    chain.append(([aux[-1]] + lits[pos:], constant))
+    return chain
+
+
+def _oddeven_merge(A, B):
+    """Odd-even merge network for two sorted sequences of wires
+
+    Returns the list of comparators and the sequence of wires
+    holding the sorted output."""
+    if len(A) == 0:
+        return [], list(B)
+    if len(B) == 0:
+        return [], list(A)
+    if len(A) == 1 and len(B) == 1:
+        return [(A[0], B[0])], [A[0], B[0]]
+    comparators, V = _oddeven_merge(A[0::2], B[0::2])
+    evencomparators, W = _oddeven_merge(A[1::2], B[1::2])
+    comparators.extend(evencomparators)
+    out = [V[0]]
+    V = V[1:]
+    for i in range(max(len(V), len(W))):
+        if i < len(V) and i < len(W):
+            comparators.append((W[i], V[i]))
+            out.append(W[i])
+            out.append(V[i])
+        elif i < len(W):
+            out.append(W[i])
+        else:
+            out.append(V[i])
+    return comparators, out
+
+
+def _oddeven_sort(wires, m=None):
+    """Odd-even merge sorting network on a sequence of wires
+
+    If `m` is given, each partial result is truncated to its `m`
+    largest values, which gives a cardinality network.
+
+    Returns the list of comparators and the sequence of wires
+    holding the sorted output.
+
+    Examples
+    --------
+    >>> import itertools
+    >>> def run(values, comparators):
+    ...     values = list(values)
+    ...     for i, j in comparators:
+    ...         values[i], values[j] = max(values[i], values[j]), min(values[i], values[j])
+    ...     return values
+    >>> for n in range(1, 8):
+    ...     C, out = _oddeven_sort(list(range(n)))
+    ...     for x in itertools.product([0, 1], repeat=n):
+    ...         y = run(x, C)
+    ...         assert [y[o] for o in out] == sorted(x, reverse=True)
+    """
+    if len(wires) <= 1:
+        return [], list(wires)
+    h = len(wires) // 2
+    comparators, A = _oddeven_sort(wires[:h], m)
+    rightcomparators, B = _oddeven_sort(wires[h:], m)
+    comparators.extend(rightcomparators)
+    mergecomparators, out = _oddeven_merge(A, B)
+    comparators.extend(mergecomparators)
+    if m is not None:
+        out = out[:m]
+    return comparators, out
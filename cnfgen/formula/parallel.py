@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Parallel generation of clauses
+
+Several formula families produce their clauses by running over
+a large and regular enumeration (e.g. all sets of :math:`k` vertices)
+and each clause depends only on its position in the enumeration. The
+enumeration is split into ranges of positions, and the clauses of each
+range are generated by a pool of worker processes.
+
+The chunks of clauses are merged in the order of the ranges, hence the
+formula is exactly the same as the one produced sequentially. See
+:py:meth:`cnfgen.formula.basecnf.BaseCNF.add_clauses_by_chunks`.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cnfgen.formula.basecnf import CompactClauses
+
+
+def split_range(total, chunksize):
+    """Split the positions from 0 to `total` in consecutive ranges
+
+    >>> list(split_range(10, 4))
+    [(0, 4), (4, 8), (8, 10)]
+    >>> list(split_range(0, 4))
+    []
+    """
+    for start in range(0, total, chunksize):
+        yield (start, min(start + chunksize, total))
+
+
+def _clause_chunk(chunk_function, start, stop, args):
+    """Clauses of a range of positions, in compact form"""
+    return CompactClauses(chunk_function(start, stop, *args))
+
+
+def parallel_chunks(chunk_function, total, args=(), jobs=None, chunksize=None):
+    """Generate the clauses of the ranges of an enumeration in parallel
+
+    The positions from 0 to `total` are split in ranges, and each
+    range is passed to ``chunk_function(start, stop, *args)`` in one of
+    the worker processes. The function and its arguments must be
+    picklable (e.g. a module level function).
+
+    At most ``2*jobs`` chunks are pending at any time, so that the
+    memory usage does not grow with `total`.
+
+    Parameters
+    ----------
+    chunk_function: function
+        generates the clauses for a range of positions
+    total: int
+        number of positions in the enumeration
+    args: tuple
+        additional arguments for `chunk_function`
+    jobs: int, optional
+        number of worker processes (default: number of CPUs)
+    chunksize: int, optional
+        number of positions in each range
+
+    Returns
+    -------
+    iterator of :py:class:`cnfgen.formula.basecnf.CompactClauses`,
+    one for each range, in order.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(-(-total // (4 * jobs)), 1 << 16))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for start, stop in split_range(total, chunksize):
+            pending.append(executor.submit(_clause_chunk, chunk_function,
+                                           start, stop, args))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
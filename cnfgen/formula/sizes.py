@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Size of formulas, computed without building them
+
+The size of a formula is the triple of its number of variables,
+clauses and literals (see :py:class:`FormulaSize`). Formula families
+with a closed form for their size expose it with a function next to
+the family (e.g. :py:func:`cnfgen.families.pigeonhole.PigeonholePrincipleSize`).
+This module contains the building blocks for these functions.
+"""
+
+from collections import namedtuple
+
+
+FormulaSize = namedtuple('FormulaSize', ['variables', 'clauses', 'literals'])
+FormulaSize.__doc__ = """Number of variables, clauses and literals of a formula"""
+
+
+def binomial(n, k):
+    """Binomial coefficient, zero when `k` is out of range
+
+    >>> [binomial(4, k) for k in range(-1, 6)]
+    [0, 1, 4, 6, 4, 1, 0]
+    """
+    if k < 0 or n < k:
+        return 0
+    k = min(k, n - k)
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def falling_factorial(n, k):
+    """Number of sequences of `k` distinct elements from `n`
+
+    >>> falling_factorial(5, 2), falling_factorial(5, 0), falling_factorial(2, 3)
+    (20, 1, 0)
+    """
+    if k < 0 or n < k:
+        return 0
+    result = 1
+    for i in range(k):
+        result *= n - i
+    return result
+
+
+def cardinality_size(n, op, constant):
+    """Size of the naive encoding of a cardinality constraint
+
+    The number of clauses and of literals added by
+    :py:meth:`cnfgen.formula.linear.CNFLinear.add_linear` for
+    a constraint on `n` literals with the `naive` encoding.
+
+    Returns
+    -------
+    (int, int)
+        number of clauses and number of literals
+
+    Examples
+    --------
+    >>> cardinality_size(5, '<=', 1)
+    (10, 20)
+    >>> cardinality_size(5, '==', 1)
+    (11, 25)
+    >>> cardinality_size(3, '>', 3)
+    (1, 0)
+    """
+    if op == '!=':
+        if constant < 0 or constant > n:
+            return (0, 0)
+        m = binomial(n, constant)
+        return (m, m * n)
+    if op == '==':
+        a = cardinality_size(n, '<=', constant)
+        b = cardinality_size(n, '>=', constant)
+        return (a[0] + b[0], a[1] + b[1])
+    if op == '<':
+        return cardinality_size(n, '<=', constant - 1)
+    if op == '>':
+        return cardinality_size(n, '>=', constant + 1)
+    if op == '<=':
+        return cardinality_size(n, '>=', n - constant)
+    if op != '>=':
+        raise ValueError('Invalid operator {}'.format(op))
+    if constant <= 0:
+        return (0, 0)
+    if constant > n:
+        return (1, 0)
+    k = n - constant + 1
+    m = binomial(n, k)
+    return (m, m * k)
+
+
+def parity_size(n, constant, maxwidth=None):
+    """Size of the encoding of a parity constraint
+
+    The number of auxiliary variables, clauses and literals added by
+    :py:meth:`cnfgen.formula.linear.CNFLinear.add_parity` for
+    a constraint on `n` literals.
+
+    Examples
+    --------
+    >>> parity_size(3, 1)
+    FormulaSize(variables=0, clauses=4, literals=12)
+    >>> parity_size(0, 1)
+    FormulaSize(variables=0, clauses=1, literals=0)
+    >>> parity_size(7, 1, maxwidth=3)
+    FormulaSize(variables=4, clauses=20, literals=60)
+    """
+    if n == 0:
+        return FormulaSize(0, int(constant == 1), 0)
+    if maxwidth is None or n <= maxwidth:
+        return FormulaSize(0, 2**(n-1), n * 2**(n-1))
+    if maxwidth < 3:
+        raise ValueError("parities can only be split into parities of width at least 3")
+    # same splitting as in `_parity_chain`
+    count = 1
+    pos = maxwidth - 1
+    while n - pos > maxwidth - 1:
+        pos += maxwidth - 2
+        count += 1
+    widths = [maxwidth] * count + [1 + n - pos]
+    return FormulaSize(count,
+                       sum(2**(w-1) for w in widths),
+                       sum(w * 2**(w-1) for w in widths))
@@ -22,8 +22,9 @@ from itertools import product
 from itertools import combinations
 from itertools import combinations_with_replacement
 from itertools import permutations
+from itertools import islice
 
-from bisect import bisect_right
+from bisect import bisect_right, insort
 
 from math import ceil, log
 
@@ -33,6 +34,217 @@ from cnfgen.graphs import CompleteBipartiteGraph
 
 from cnfgen.formula.basecnf import BaseCNF
 from cnfgen.formula.linear import CNFLinear
+from cnfgen.formula.sizes import binomial, falling_factorial
+
+
+def word_count(wordtype, n, k):
+    """Number of words of length `k` on :math:`[n]` of a given type
+
+    The types are the same as in :py:class:`WordOfIndicesVariables`.
+
+    >>> [word_count(t, 4, 2) for t in ['combinations', 'combinations_with_replacement', 'permutations', 'words']]
+    [6, 10, 12, 16]
+    """
+    if wordtype == 'combinations':
+        return binomial(n, k)
+    elif wordtype == 'combinations_with_replacement':
+        return binomial(n + k - 1, k) if n > 0 else int(k == 0)
+    elif wordtype == 'permutations':
+        return falling_factorial(n, k)
+    elif wordtype == 'words':
+        return n ** k
+    raise ValueError("Unknown type of indices '{}'".format(wordtype))
+
+
+def _all_words(wordtype, n, k):
+    """All words of a given type, in lexicographic order"""
+    if wordtype == 'combinations':
+        return combinations(range(1, n+1), k)
+    elif wordtype == 'combinations_with_replacement':
+        return combinations_with_replacement(range(1, n+1), k)
+    elif wordtype == 'permutations':
+        return permutations(range(1, n+1), k)
+    else:
+        return product(range(1, n+1), repeat=k)
+
+
+def _words_from(wordtype, n, first):
+    """The words of a given type that follow `first`, included"""
+    yield first
+    k = len(first)
+    for i in reversed(range(k)):
+        prefix = first[:i]
+        for x in range(first[i] + 1, n + 1):
+            if wordtype == 'combinations':
+                rest = combinations(range(x + 1, n + 1), k - i - 1)
+            elif wordtype == 'combinations_with_replacement':
+                rest = combinations_with_replacement(range(x, n + 1), k - i - 1)
+            elif wordtype == 'permutations':
+                if x in prefix:
+                    continue
+                pool = [y for y in range(1, n + 1)
+                        if y != x and y not in prefix]
+                rest = permutations(pool, k - i - 1)
+            else:
+                rest = product(range(1, n + 1), repeat=k - i - 1)
+            for tail in rest:
+                yield prefix + (x,) + tail
+
+
+def _binomial_down(b, a, r, target):
+    """Binomial coefficient C(`target`, `r`), given `b` = C(`a`, `r`)
+
+    The coefficient is updated one step at a time from `a` down to
+    `target`, unless it is cheaper to compute it from scratch."""
+    if a - target > r:
+        return binomial(target, r)
+    for c in range(a, target, -1):
+        b = b * (c - r) // c
+    return b
+
+
+def rank_word(wordtype, n, k, index):
+    """The position of the word `index` in lexicographic order
+
+    This is the inverse of :py:func:`unrank_word`. The weights of
+    the positions, and the binomial coefficients for combinations,
+    are updated from one position to the next.
+
+    >>> rank_word('combinations', 5, 3, (1, 3, 5))
+    4
+    >>> rank_word('permutations', 4, 2, (3, 2))
+    7
+    """
+    if wordtype == 'words':
+        rank = 0
+        for x in index:
+            rank = rank * n + x - 1
+        return rank
+    if wordtype == 'permutations':
+        rank = 0
+        used = []
+        w = falling_factorial(n - 1, k - 1)
+        for i, x in enumerate(index):
+            rank += (x - 1 - bisect_right(used, x)) * w
+            insort(used, x)
+            if i < k - 1:
+                w //= n - i - 1
+        return rank
+    total = word_count(wordtype, n, k)
+    if wordtype == 'combinations_with_replacement':
+        # multisets of [n] are in bijection with sets of [n+k-1]
+        index = [x + i for i, x in enumerate(index)]
+        n = n + k - 1
+    # the words after `index` are counted by the combinatorial
+    # number system, as the sum of C(n - x_i, k - i)
+    after = 0
+    a, r, b = n, k, binomial(n, k)
+    for x in index:
+        b = _binomial_down(b, a, r, n - x)
+        a = n - x
+        if b == 0:
+            # a < r here, and in all later positions
+            break
+        after += b
+        b = b * r // (a - r + 1)
+        r -= 1
+    return total - 1 - after
+
+
+def unrank_word(wordtype, n, k, rank):
+    """The word in position `rank` in lexicographic order
+
+    >>> unrank_word('combinations', 5, 3, 4)
+    (1, 3, 5)
+    >>> unrank_word('permutations', 4, 2, 7)
+    (3, 2)
+    """
+    if wordtype == 'words':
+        index = []
+        for _ in range(k):
+            rank, x = divmod(rank, n)
+            index.append(x + 1)
+        return tuple(reversed(index))
+    if wordtype == 'permutations':
+        index = []
+        used = []
+        w = falling_factorial(n - 1, k - 1)
+        for i in range(k):
+            q, rank = divmod(rank, w)
+            # the (q+1)-th unused value: skip the used values u
+            # with less than q+1 unused values before them
+            lo, hi = 0, len(used)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if used[mid] - mid - 1 <= q:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            x = q + 1 + lo
+            insort(used, x)
+            index.append(x)
+            if i < k - 1:
+                w //= n - i - 1
+        return tuple(index)
+    shift = wordtype == 'combinations_with_replacement'
+    total = word_count(wordtype, n, k)
+    if shift:
+        n = n + k - 1
+    # write the number of words after this one in the combinatorial
+    # number system: each digit c is the largest with C(c, r) <= after
+    after = total - 1 - rank
+    index = []
+    top = n
+    b = binomial(n - 1, k)  # C(top - 1, r)
+    for i in range(k):
+        r = k - i
+        c = top - 1
+        while b > after:
+            if top - c > r:
+                # long way down: binary search on the rest
+                lo, hi = r - 1, c - 1
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if binomial(mid, r) <= after:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                c, b = lo, binomial(lo, r)
+                break
+            b = b * (c - r) // c
+            c -= 1
+        after -= b
+        top = c
+        index.append(n - c - i if shift else n - c)
+        if r > 1:
+            b = b * r // c
+    return tuple(index)
+
+
+def words_range(wordtype, n, k, start=0, stop=None):
+    """Words of a given type, from position `start` to `stop` (excluded)
+
+    The words of length `k` on :math:`[n]` are enumerated in
+    lexicographic order, and the enumeration starts directly at
+    position `start`. This is useful to split the enumeration in
+    independent ranges.
+
+    >>> list(words_range('combinations', 5, 2, 3, 6))
+    [(1, 5), (2, 3), (2, 4)]
+    >>> list(words_range('permutations', 3, 3, 4))
+    [(3, 1, 2), (3, 2, 1)]
+    """
+    total = word_count(wordtype, n, k)
+    if stop is None or stop > total:
+        stop = total
+    start = max(start, 0)
+    if start >= stop:
+        return iter(())
+    if start == 0:
+        return islice(_all_words(wordtype, n, k), stop)
+    first = unrank_word(wordtype, n, k, start)
+    return islice(_words_from(wordtype, n, first), stop - start)
+
 
 class BaseVariableGroup():
     """Base object for variable groups
@@ -247,6 +459,69 @@ class SingletonVariableGroup(BaseVariableGroup):
         return ()
 
 
+class LabelledVariableGroup(BaseVariableGroup):
+    """A group of variables with explicit labels
+
+    The variables are indexed from 1 to :math:`N`, and their labels
+    are given as a bytes-like object, with one UTF-8 encoded label per
+    line. The labels are decoded only when needed. This is how the
+    variable groups of a formula are restored from a binary file,
+    where the index structure of the original groups is lost.
+
+    Examples
+    --------
+    >>> F = BaseCNF()
+    >>> F.update_variable_number(2)
+    >>> G = LabelledVariableGroup(F, 3, b'x_{1}\\ny_{1}\\nz')
+    >>> print(*G.label())
+    x_{1} y_{1} z
+    >>> G(3), G.label(2), G.to_index(-4)
+    (5, 'y_{1}', (2,))
+    """
+
+    def __init__(self, formula, N, labels):
+        BaseVariableGroup.__init__(self, formula, N, labelfmt='{}')
+        self._raw_labels = labels
+        self._labels = None
+
+    def __getstate__(self):
+        # memory views and memory maps cannot be copied or pickled
+        state = self.__dict__.copy()
+        if state['_raw_labels'] is not None:
+            state['_raw_labels'] = bytes(state['_raw_labels'])
+        return state
+
+    def _decoded_labels(self):
+        if self._labels is None:
+            text = bytes(self._raw_labels).decode('utf-8')
+            self._labels = text.split('\n') if len(self) > 0 else []
+            self._raw_labels = None
+        return self._labels
+
+    def label(self, *pattern):
+        if len(pattern) == 0:
+            return iter(self._decoded_labels())
+        (i,) = self.indices(*pattern)[0]
+        return self._decoded_labels()[i - 1]
+
+    def indices(self, *pattern):
+        """Outputs all the indices matching the given pattern"""
+        if len(pattern) == 0 or pattern == (None,):
+            return [(i,) for i in range(1, len(self) + 1)]
+        if len(pattern) == 1 and pattern[0] in range(1, len(self) + 1):
+            return [tuple(pattern)]
+        raise ValueError("Pattern does not match the indices in this variable group")
+
+    def to_index(self, lit):
+        """Convert a literal of the corresponding variable index"""
+        if abs(lit) not in self:
+            raise ValueError('Index out of range')
+        return (abs(lit) - self.ids[0] + 1,)
+
+    def _unsafe_index_to_lit(self, index):
+        return self.ids[index[0] - 1]
+
+
 class BlockOfVariables(BaseVariableGroup):
     """Group of variables, indexed by a cartesian product.
 
@@ -516,7 +791,9 @@ class WordOfIndicesVariables(BaseVariableGroup):
                  wordtype='combinations'):
         """Creates a variables group object
 
-
+        The indices are not stored: the ID of an index and the index
+        of an ID are computed on demand, by ranking and unranking
+        the indices in lexicographic order.
 
         Parameters
         ----------
@@ -542,28 +819,44 @@ class WordOfIndicesVariables(BaseVariableGroup):
             raise ValueError(
                 'k,n must be integer with 0<= k <= n')
 
+        if wordtype == 'combinations_with_replacements':
+            wordtype = 'combinations_with_replacement'
         self.n = n
         self.k = k
         self.wordtype = wordtype
         self.offset = formula.number_of_variables()
-        self.vid2seq=[]
-        self.seq2vid={}
-        if wordtype == 'combinations':
-            gen = combinations(range(1, n+1), k)
-        elif wordtype == 'combinations_with_replacements':
-            gen = combinations_with_replacement(range(1,n+1),k)
-        elif wordtype == 'permutations':
-            gen = permutations(range(1, n+1), k)
-        elif wordtype == 'words':
-            gen = product(range(1, n+1), repeat=k)
-
-        vid = self.offset
-        for c in gen:
-            vid += 1
-            self.vid2seq.append(c)
-            self.seq2vid[c] = vid
-
-        BaseVariableGroup.__init__(self, formula, len(self.vid2seq), labelfmt)
+
+        N = word_count(wordtype, n, k)
+        BaseVariableGroup.__init__(self, formula, N, labelfmt)
+
+    def _generate(self):
+        """Generates all the indices in lexicographic order"""
+        return _all_words(self.wordtype, self.n, self.k)
+
+    def _is_index(self, pattern):
+        """Check if `pattern` is an index of the group"""
+        if len(pattern) != self.k:
+            return False
+        try:
+            if not all(1 <= x <= self.n for x in pattern):
+                return False
+        except TypeError:
+            return False
+        if self.wordtype == 'combinations':
+            return all(a < b for a, b in zip(pattern, pattern[1:]))
+        elif self.wordtype == 'combinations_with_replacement':
+            return all(a <= b for a, b in zip(pattern, pattern[1:]))
+        elif self.wordtype == 'permutations':
+            return len(set(pattern)) == self.k
+        return True
+
+    def _rank(self, index):
+        """The position of `index` in lexicographic order"""
+        return rank_word(self.wordtype, self.n, self.k, index)
+
+    def _unrank(self, rank):
+        """The index in position `rank` in lexicographic order"""
+        return unrank_word(self.wordtype, self.n, self.k, rank)
 
     def label(self,*pattern):
 
@@ -571,8 +864,8 @@ class WordOfIndicesVariables(BaseVariableGroup):
             return ",".join(str(x) for x in idx)
 
         if len(pattern)==0:
-            return iter(self.labelfmt.format(text(x)) for x in self.vid2seq)
-        elif pattern in self.seq2vid:
+            return iter(self.labelfmt.format(text(x)) for x in self._generate())
+        elif self._is_index(pattern):
             return self.labelfmt.format(text(pattern))
         else:
             raise ValueError("Pattern does not match the indices in this variable group")
@@ -586,19 +879,17 @@ class WordOfIndicesVariables(BaseVariableGroup):
         all the variable indices
         """
         if len(pattern)==0:
-            return iter(self.vid2seq)
-        elif pattern in self.seq2vid:
+            return self._generate()
+        elif self._is_index(pattern):
             return [pattern]
         else:
             raise ValueError("Pattern does not match the indices in this variable group")
 
     def __call__(self,*pattern):
-        try:
-            return self.seq2vid[pattern]
-        except KeyError:
-            pass
+        if self._is_index(pattern):
+            return self.offset + 1 + self._rank(pattern)
         if len(pattern) == 0:
-            return (self._unsafe_index_to_lit(t) for t in self.indices(*pattern))
+            return iter(self.ids)
         else:
             raise ValueError("Pattern does not match the indices in this variable group")
 
@@ -617,7 +908,7 @@ class WordOfIndicesVariables(BaseVariableGroup):
         Warning: only for internal use. It does not check of the
         correctness of the arguments.
         """
-        return self.seq2vid[index]
+        return self.offset + 1 + self._rank(index)
 
     def to_index(self, lit):
         """Convert a literal to the index sequence corresponding to the variable
@@ -658,7 +949,7 @@ class WordOfIndicesVariables(BaseVariableGroup):
         if var not in self:
             raise ValueError('Index out of range')
 
-        return self.vid2seq[var-self.offset-1]
+        return self._unrank(var-self.offset-1)
 
 
 class BipartiteEdgesVariables(BaseVariableGroup):
@@ -739,18 +1030,28 @@ class BipartiteEdgesVariables(BaseVariableGroup):
             raise ValueError(
                 'label must be a valid format string for two arguments')
 
-        # offsets
+        # offsets, neighborhoods and the position of each neighbor
+        # in the neighborhood (a range is its own position index)
         U, V = G.parts()
         startID = formula.number_of_variables() + 1
         offset = [None, startID]
+        neighbors = [None]
+        position = [None]
         for u in U:
-            d = G.right_degree(u)
-            offset.append(offset[-1] + d)
+            nbrs = G.right_neighbors(u)
+            neighbors.append(nbrs)
+            if isinstance(nbrs, range):
+                position.append(nbrs)
+            else:
+                position.append({v: i for i, v in enumerate(nbrs)})
+            offset.append(offset[-1] + len(nbrs))
         assert offset[-1] == G.number_of_edges() + startID
         offset.pop()
 
         self.G = G
         self.offset = offset
+        self.neighbors = neighbors
+        self.position = position
         BaseVariableGroup.__init__(self, formula, G.number_of_edges(),
                                    labelfmt)
 
@@ -769,8 +1070,11 @@ class BipartiteEdgesVariables(BaseVariableGroup):
         Warning: only for internal use. It does not check of the
         correctness of the arguments.
         """
-        vidx = self.G.right_neighbors(index[0]).index(index[1])
-        return self.offset[index[0]] + vidx
+        u, v = index
+        pos = self.position[u]
+        if type(pos) is range:
+            return self.offset[u] + pos.index(v)
+        return self.offset[u] + pos[v]
 
     def indices(self, *pattern):
         """Print the label of the edge
@@ -862,7 +1166,7 @@ class BipartiteEdgesVariables(BaseVariableGroup):
             raise ValueError('Index out of range')
         u = bisect_right(self.offset, var) - 1
         vidx = var - self.offset[u]
-        v = self.G.right_neighbors(u)[vidx]
+        v = self.neighbors[u][vidx]
         assert self.__call__(u, v) == var
         return u, v
 
@@ -1011,7 +1315,7 @@ class DiGraphEdgesVariables(BaseVariableGroup):
         if self.sortby == 'pred':
             return self.VG._unsafe_index_to_lit(index)
         else:
-            return self.VG._unsafe_index_to_lit(index[::-1])
+            return self.VG._unsafe_index_to_lit((index[1], index[0]))
 
 
 class GraphEdgesVariables(BipartiteEdgesVariables):
@@ -1102,7 +1406,10 @@ class GraphEdgesVariables(BipartiteEdgesVariables):
         Warning: only for internal use. It does not check of the
         correctness of the arguments.
         """
-        return self.BG._unsafe_index_to_lit(sorted(index))
+        u, v = index
+        if u > v:
+            u, v = v, u
+        return self.BG._unsafe_index_to_lit((u, v))
 
     def indices(self, *pattern):
         """Print the label of the edge
@@ -1559,6 +1866,32 @@ class VariablesManager:
         self._add_variable_group(newgroup)
         return newgroup()
 
+    def new_labelled_group(self, n, labels):
+        """Adds `n` variables with explicit labels
+
+        Parameters
+        ----------
+        n : int
+            number of variables
+        labels : bytes-like
+            the UTF-8 encoded labels of the variables, one per line
+
+        Returns
+        -------
+        LabelledVariableGroup, the new variable group
+
+        Examples
+        --------
+        >>> F = BaseCNF()
+        >>> V = VariablesManager(F)
+        >>> _ = V.new_labelled_group(2, b'p\\nq')
+        >>> print(*V.all_variable_labels())
+        p q
+        """
+        newgroup = LabelledVariableGroup(self._formula, n, labels)
+        self._add_variable_group(newgroup)
+        return newgroup
+
     def new_block(self, *ranges, label=None):
         """
         Create a new group of indexed variables
@@ -2109,8 +2442,9 @@ class VariablesManager:
 
         if isinstance(f, BinaryMappingVariables):
             for y in f.range():
-                for x1, x2 in combinations(f.domain(), 2):
-                    F.add_clause(f.forbid(x1, y) + f.forbid(x2, y), check=False)
+                F.add_clauses_from((f.forbid(x1, y) + f.forbid(x2, y)
+                                    for x1, x2 in combinations(f.domain(), 2)),
+                                   check=False)
 
     def force_nondecreasing_mapping(self, f):
         """Enforce the mapping `f` to be non decreasing
@@ -6,17 +6,24 @@ formulas that are graph based.
 
 import os
 import io
+import math
 import random
 from io import StringIO
 import copy
+from array import array
 from bisect import bisect_right, bisect_left
-from itertools import combinations, product
+from itertools import chain, combinations, compress, product
 
 from cnfgen.localtypes import positive_int, non_negative_int
+from cnfgen.utils.compression import open_file, strip_compression_extension
 
 __all__ = [
     "readGraph", "writeGraph",
     "Graph", "DirectedGraph", "BipartiteGraph",
+    "FrozenGraph", "FrozenDirectedGraph", "FrozenBipartiteGraph",
+    "DenseGraph", "prefer_dense",
+    "CompleteGraph", "GridGraph",
+    "PyramidDAG", "CompleteBinaryTreeDAG", "PathDAG",
     "supported_graph_formats",
     "bipartite_random_left_regular", "bipartite_random_regular",
     "bipartite_random_m_edges", "bipartite_random", "bipartite_shift"
@@ -65,9 +72,10 @@ class GraphEdgeList():
         n = self.G.number_of_vertices()
         G = self.G
         for u in range(1, n):
-            pos = bisect_right(G.adjlist[u], u)
-            while pos < len(G.adjlist[u]):
-                v = G.adjlist[u][pos]
+            adj = G.adjlist[u]
+            pos = bisect_right(adj, u)
+            while pos < len(adj):
+                v = adj[pos]
                 yield (u, v)
                 pos += 1
 
@@ -99,6 +107,184 @@ class DirectedEdgeList():
                     yield (src, dest)
 
 
+class CSRAdjacency():
+    """Adjacency lists in compressed sparse row (CSR) format
+
+    The neighbors of all vertices are stored consecutively in a single
+    array `targets`, and the neighbors of vertex `u` are in the
+    positions from ``offsets[u]`` to ``offsets[u+1]``. Vertices are
+    numbered from 1 to `n`, and the neighborhoods are sorted and
+    without repetitions.
+
+    The object works as a read only list of adjacency lists, and
+    ``rows[u]`` is the list of neighbors of `u`.
+
+    Examples
+    --------
+    >>> rows = CSRAdjacency(4, [(1, 3), (1, 2), (3, 4), (1, 3)])
+    >>> rows[1], rows[2], rows[3]
+    ([2, 3], [], [4])
+    >>> len(rows)
+    5
+    >>> rows.offsets.tolist()
+    [0, 0, 2, 2, 3, 3]
+    >>> rows.contains(1, 3), rows.contains(3, 1)
+    (True, False)
+    """
+    def __init__(self, n, pairs):
+        rows = [[] for _ in range(n + 1)]
+        for u, v in pairs:
+            rows[u].append(v)
+        self.offsets = array('q', [0, 0])
+        self.targets = array('i')
+        for u in range(1, n + 1):
+            self.targets.extend(sorted(set(rows[u])))
+            self.offsets.append(len(self.targets))
+            rows[u] = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u):
+        return self.targets[self.offsets[u]:self.offsets[u + 1]].tolist()
+
+    def get(self, u, default=None):
+        if 0 <= u < len(self.offsets) - 1:
+            return self[u]
+        return default
+
+    def degree(self, u):
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def contains(self, u, v):
+        """Test whether `v` is among the neighbors of `u`"""
+        if not 0 <= u < len(self.offsets) - 1:
+            return False
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        pos = bisect_left(self.targets, v, lo, hi)
+        return pos < hi and self.targets[pos] == v
+
+
+class ImplicitAdjacency():
+    """Adjacency lists computed on demand
+
+    The object works as the read only list of adjacency lists of
+    a graph with vertices from 1 to `n`, like
+    :py:class:`CSRAdjacency`, but nothing is stored: the sorted list
+    of neighbors of `u` is computed by ``row(u)`` every time it is
+    needed.
+
+    Examples
+    --------
+    >>> rows = ImplicitAdjacency(4, lambda u: [v for v in (u-1, u+1) if 1 <= v <= 4])
+    >>> rows[1], rows[3], rows[0]
+    ([2], [2, 4], [])
+    >>> len(rows), rows.degree(2), rows.contains(4, 3)
+    (5, 2, True)
+    """
+    def __init__(self, n, row):
+        self.n = n
+        self.row = row
+
+    def __len__(self):
+        return self.n + 1
+
+    def __getitem__(self, u):
+        if 1 <= u <= self.n:
+            return self.row(u)
+        return []
+
+    def degree(self, u):
+        return len(self[u])
+
+    def contains(self, u, v):
+        """Test whether `v` is among the neighbors of `u`"""
+        return v in self[u]
+
+
+# Turns a string of binary digits into a string of 0 and 1 bytes
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class BitsetAdjacency():
+    """Adjacency lists as bitmasks
+
+    The neighbors of vertex `u` are the bits set in the integer
+    ``masks[u]``. An edge test is a shift, and neighborhoods are
+    complemented, intersected and compared a machine word at a time
+    instead of a vertex at a time. Each mask takes up to `n` bits, so
+    this is convenient only for dense graphs.
+
+    The object has the same interface as :py:class:`CSRAdjacency`.
+
+    Examples
+    --------
+    >>> rows = BitsetAdjacency(4, [(1, 3), (1, 2), (3, 4), (1, 3)])
+    >>> rows[1], rows[2], rows[3]
+    ([2, 3], [], [4])
+    >>> rows.masks[1] == 0b1100
+    True
+    >>> rows.contains(1, 3), rows.contains(3, 1), rows.degree(1)
+    (True, False, 2)
+    """
+    def __init__(self, n, pairs):
+        rows = [[] for _ in range(n + 1)]
+        for u, v in pairs:
+            rows[u].append(v)
+        rows[0] = None
+        self.masks = [0]
+        self._add_rows(n, rows[1:])
+
+    @classmethod
+    def from_neighborhoods(cls, n, neighborhoods):
+        """Bitmasks of the neighborhoods of vertices from 1 to `n`"""
+        rows = cls(0, [])
+        rows._add_rows(n, neighborhoods)
+        return rows
+
+    def _add_rows(self, n, neighborhoods):
+        for row in neighborhoods:
+            # the mask is parsed from a string of binary digits
+            # in linear time, instead of setting the bits one by one
+            digits = bytearray(b'0') * (n + 1)
+            for v in row:
+                digits[n - v] = 49  # ord('1')
+            self.masks.append(int(digits, 2))
+
+    @staticmethod
+    def elements(mask):
+        """The sorted positions of the bits set in `mask`
+
+        >>> BitsetAdjacency.elements(0b101100)
+        [2, 3, 5]
+        """
+        digits = bin(mask)[:1:-1].encode('ascii').translate(_BINARY_DIGITS)
+        return list(compress(range(len(digits)), digits))
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __getitem__(self, u):
+        return self.elements(self.masks[u])
+
+    def degree(self, u):
+        return bin(self.masks[u]).count('1')
+
+    def contains(self, u, v):
+        """Test whether `v` is among the neighbors of `u`"""
+        if not 0 <= u < len(self.masks) or v < 0:
+            return False
+        return (self.masks[u] >> v) & 1 == 1
+
+
+def _pairs_from_edge_array(edges):
+    """Pairs of vertices from a flat array of edge endpoints"""
+    if len(edges) % 2 != 0:
+        raise ValueError("the edge array must have an even length")
+    it = iter(edges)
+    return zip(it, it)
+
+
 class BaseGraph():
     """Base class for graphs"""
 
@@ -146,6 +332,10 @@ have that u < v."""
     def edges(self):
         raise NotImplementedError
 
+    def freeze(self):
+        """An immutable copy of the graph, in compact representation"""
+        raise NotImplementedError
+
     def __len__(self):
         return self.number_of_vertices()
 
@@ -189,7 +379,8 @@ have that u < v."""
             a text stream), the graph is read from there.
 
             Input files are assumed to be UTF-8 by default (for some
-            formats it is actually ascii)
+            formats it is actually ascii). Files with a compression
+            extension (e.g. '.gz', '.xz') are decompressed on the fly.
 
         fileformat: string, optional
             The file format that the parser should expect to receive.
@@ -198,7 +389,7 @@ have that u < v."""
 
         # Reduce to the case of filestream
         if isinstance(fileorname, str):
-            with open(fileorname, 'r', encoding='utf-8') as file_handle:
+            with open_file(fileorname, 'r') as file_handle:
                 return cls.from_file(file_handle, fileformat)
 
         # Discover and test file format
@@ -249,6 +440,46 @@ class Graph(BaseGraph):
         self.edgeset.add((u, v))
         self.edgeset.add((v, u))
 
+    def add_edges_from(self, edges):
+        """Add many edges to the graph
+
+        Equivalent to calling :py:meth:`add_edge` on each edge, but
+        the neighborhoods are sorted only once at the end, instead of
+        inserting each neighbor at its place.
+
+        Examples
+        --------
+        >>> G = Graph(4)
+        >>> G.add_edges_from([(4, 1), (1, 2), (2, 4), (1, 4)])
+        >>> list(G.edges())
+        [(1, 2), (1, 4), (2, 4)]
+        >>> G.add_edges_from([(3, 3)])
+        Traceback (most recent call last):
+        ...
+        ValueError: u,v must be distinct, between 1 and the number of nodes
+        """
+        n = self.n
+        adjlist = self.adjlist
+        edgeset = self.edgeset
+        touched = set()
+        try:
+            for u, v in edges:
+                if not (1 <= u <= n and 1 <= v <= n and u != v):
+                    raise ValueError(
+                        "u,v must be distinct, between 1 and the number of nodes")
+                if (u, v) in edgeset:
+                    continue
+                adjlist[u].append(v)
+                adjlist[v].append(u)
+                touched.add(u)
+                touched.add(v)
+                self.m += 1
+                edgeset.add((u, v))
+                edgeset.add((v, u))
+        finally:
+            for u in touched:
+                adjlist[u].sort()
+
     def update_vertex_number(self, new_value):
         """Raises the number of vertices to `new_value`"""
         non_negative_int(new_value, 'new_value')
@@ -275,6 +506,21 @@ class Graph(BaseGraph):
         """Outputs all edges in the graph"""
         return GraphEdgeList(self)
 
+    def non_edges(self):
+        """Outputs all pairs :math:`u<v` of non adjacent vertices
+
+The pairs are listed in lexicographic order."""
+        for u in range(1, self.n):
+            for v in range(u + 1, self.n + 1):
+                if not self.has_edge(u, v):
+                    yield (u, v)
+
+    def freeze(self):
+        """An immutable copy of the graph, in compact representation
+
+        See :py:class:`FrozenGraph`."""
+        return FrozenGraph(self.n, self.edges(), name=self.name)
+
     def number_of_vertices(self):
         return self.n
 
@@ -356,17 +602,16 @@ The sequence of neighbors is guaranteed to be sorted.
 
     @classmethod
     def complete_graph(cls, n):
+        if cls is Graph:
+            return CompleteGraph(n)
         G = cls(n, 'the complete graph of order '+str(n))
-        for u in range(1, n):
-            for v in range(u+1, n+1):
-                G.add_edge(u, v)
+        G.add_edges_from(combinations(range(1, n+1), 2))
         return G
 
     @classmethod
     def star_graph(cls, n):
         G = cls(n+1, 'the star graph with {} arms'.format(n))
-        for u in range(2, n+2):
-            G.add_edge(1, u)
+        G.add_edges_from((1, u) for u in range(2, n+2))
         return G
 
     @classmethod
@@ -401,14 +646,12 @@ The sequence of neighbors is guaranteed to be sorted.
         if isinstance(G, BipartiteGraph):
             l = G.left_order()
             newG = Graph(G.number_of_vertices())
-            for u,v in G.edges():
-                newG.add_edge(u,v+l)
+            newG.add_edges_from((u, v+l) for u, v in G.edges())
             return newG
 
         if isinstance(G, DirectedGraph):
             newG = Graph(G.order())
-            for u,v in G.edges():
-                newG.add_edge(u,v)
+            newG.add_edges_from(G.edges())
             return newG
 
         # is it worth to consider networkx graphs?
@@ -428,6 +671,349 @@ The sequence of neighbors is guaranteed to be sorted.
         raise TypeError("argument must either be Graph, DirectedGraph, BipartiteGraph or networkx.Graph")
 
 
+class FrozenGraph(Graph):
+    """Immutable simple graph in compressed sparse row format
+
+    The adjacency lists are kept in two flat arrays (see
+    :py:class:`CSRAdjacency`) instead of a list of lists and a set
+    of edges, so the memory footprint is a few bytes per edge, and
+    a graph with millions of edges can be built quickly, in a single
+    pass. A frozen graph can be used wherever a :py:class:`Graph` is
+    expected, but it cannot be modified.
+
+    Parameters
+    ----------
+    n : int
+        number of vertices
+    edges : iterable of pairs
+        the edges of the graph (repetitions are ignored)
+    name : str, optional
+        the name of the graph
+
+    Examples
+    --------
+    >>> G = FrozenGraph(4, [(1, 2), (3, 1), (2, 1)])
+    >>> G.number_of_edges()
+    2
+    >>> list(G.neighbors(1)), G.degree(4)
+    ([2, 3], 0)
+    >>> G.has_edge(3, 1), G.has_edge(2, 3)
+    (True, False)
+    >>> list(G.edges())
+    [(1, 2), (1, 3)]
+    >>> G.add_edge(2, 3)
+    Traceback (most recent call last):
+    ...
+    TypeError: frozen graphs cannot be modified
+    """
+    adjacency = CSRAdjacency
+
+    def __init__(self, n, edges=(), name=None):
+        non_negative_int(n, 'n')
+        self.n = n
+        if name is None:
+            self.name = "a simple graph with {} vertices".format(n)
+        else:
+            self.name = name
+
+        def both_orientations():
+            for u, v in edges:
+                if not (1 <= u <= n and 1 <= v <= n and u != v):
+                    raise ValueError(
+                        "u,v must be distinct, between 1 and the number of nodes")
+                yield (u, v)
+                yield (v, u)
+
+        self.adjlist = self.adjacency(n, both_orientations())
+        self.m = sum(self.adjlist.degree(u) for u in range(1, n + 1)) // 2
+
+    @classmethod
+    def from_edge_array(cls, n, edges, name=None):
+        """Build a frozen graph from a flat array of edges
+
+        Parameters
+        ----------
+        n : int
+            number of vertices
+        edges : sequence of int
+            the endpoints of the edges, i.e. ``u1, v1, u2, v2, ...``
+            (e.g. an :py:class:`array.array` or a flattened NumPy array)
+        name : str, optional
+            the name of the graph
+
+        Examples
+        --------
+        >>> from array import array
+        >>> G = FrozenGraph.from_edge_array(3, array('i', [1, 2, 2, 3]))
+        >>> list(G.edges())
+        [(1, 2), (2, 3)]
+        """
+        return cls(n, _pairs_from_edge_array(edges), name=name)
+
+    def add_edge(self, u, v):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def add_edges_from(self, edges):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def remove_edge(self, u, v):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def update_vertex_number(self, new_value):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def has_edge(self, u, v):
+        return self.adjlist.contains(u, v)
+
+    def degree(self, u):
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.adjlist.degree(u)
+
+    @classmethod
+    def from_networkx(cls, G):
+        G = Graph.from_networkx(G)
+        return cls(G.n, G.edges(), name=G.name)
+
+    @classmethod
+    def from_file(cls, fileorname, fileformat=None):
+        G = Graph.from_file(fileorname, fileformat)
+        return cls(G.n, G.edges(), name=G.name)
+
+    def freeze(self):
+        return self
+
+
+class DenseGraph(FrozenGraph):
+    """Immutable simple graph with adjacency bitmasks
+
+    Same as :py:class:`FrozenGraph`, but the neighborhoods are
+    stored as bitmasks (see :py:class:`BitsetAdjacency`). The graph
+    takes about :math:`n^2/8` bytes independently of the number of
+    edges, so this representation is for dense graphs, where edge
+    tests, iteration over the non edges and comparisons between
+    neighborhoods are much faster than with sets of edges.
+
+    Use :py:func:`prefer_dense` to convert a graph only if it is
+    dense enough.
+
+    Examples
+    --------
+    >>> G = DenseGraph(4, [(1, 2), (3, 1), (2, 1)])
+    >>> G.number_of_edges(), list(G.neighbors(1)), G.has_edge(2, 3)
+    (2, [2, 3], False)
+    >>> list(G.non_edges())
+    [(1, 4), (2, 3), (2, 4), (3, 4)]
+    """
+    adjacency = BitsetAdjacency
+
+    @classmethod
+    def from_graph(cls, G):
+        """A copy of the simple graph `G`
+
+        The bitmasks are built directly from the neighborhoods of
+        `G`, which is faster than going through its edges."""
+        n = G.number_of_vertices()
+        D = cls(0, name=G.name)
+        D.n = n
+        D.m = G.number_of_edges()
+        D.adjlist = BitsetAdjacency.from_neighborhoods(
+            n, (G.neighbors(u) for u in range(1, n + 1)))
+        return D
+
+    def has_edge(self, u, v):
+        return 1 <= u <= self.n and v > 0 and \
+            (self.adjlist.masks[u] >> v) & 1 == 1
+
+    def neighborhood_mask(self, u):
+        """The neighbors of `u` as a bitmask
+
+        The bit in position `v` is set if and only if `v` is
+        a neighbor of `u`."""
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.adjlist.masks[u]
+
+    def non_edges(self):
+        masks = self.adjlist.masks
+        full = (1 << (self.n + 1)) - 1
+        for u in range(1, self.n):
+            above = full ^ ((2 << u) - 1)
+            for v in BitsetAdjacency.elements(above & ~masks[u]):
+                yield (u, v)
+
+
+# Simple graphs with at least this fraction of all possible edges are
+# converted to DenseGraph by the formula families that test many
+# pairs of vertices.
+DENSE_GRAPH_DENSITY = 0.1
+
+
+def prefer_dense(G, density=DENSE_GRAPH_DENSITY):
+    """The graph `G` with bitmask adjacency, if it is dense
+
+    Parameters
+    ----------
+    G : Graph
+        a simple graph
+    density : float
+        the minimum fraction of all possible edges that `G` must have
+        to be converted
+
+    Returns
+    -------
+    a :py:class:`DenseGraph` with the same vertices, edges and name of
+    `G`, if `G` is dense enough, otherwise `G` itself.
+
+    Examples
+    --------
+    >>> type(prefer_dense(Graph.complete_graph(5))).__name__
+    'DenseGraph'
+    >>> type(prefer_dense(Graph.star_graph(20))).__name__
+    'Graph'
+    """
+    if isinstance(G, DenseGraph):
+        return G
+    n = G.number_of_vertices()
+    if n < 2 or G.number_of_edges() < density * n * (n - 1) / 2:
+        return G
+    return DenseGraph.from_graph(G)
+
+
+class ImplicitGraph(Graph):
+    """Simple graph with adjacency lists computed on demand
+
+    The edges of graphs with a regular structure (e.g. complete graphs
+    and grids) can be computed arithmetically, so there is no need to
+    store them. Subclasses implement :py:meth:`_row`, which gives the
+    sorted list of neighbors of a vertex, and the graph uses memory
+    independent of its number of edges.
+
+    Implicit graphs can be used wherever a :py:class:`Graph` is
+    expected. They can even be modified: at the first modification
+    the graph is turned into a regular :py:class:`Graph`, with all its
+    edges stored explicitly.
+    """
+    def __init__(self, n, m, name):
+        non_negative_int(n, 'n')
+        self.n = n
+        self.m = m
+        self.name = name
+        self.adjlist = ImplicitAdjacency(n, self._row)
+
+    def _row(self, u):
+        raise NotImplementedError
+
+    def _materialize(self):
+        edges = list(self.edges())
+        self.__class__ = Graph
+        Graph.__init__(self, self.n, self.name)
+        self.add_edges_from(edges)
+
+    def add_edge(self, u, v):
+        self._materialize()
+        self.add_edge(u, v)
+
+    def add_edges_from(self, edges):
+        self._materialize()
+        self.add_edges_from(edges)
+
+    def remove_edge(self, u, v):
+        self._materialize()
+        self.remove_edge(u, v)
+
+    def update_vertex_number(self, new_value):
+        self._materialize()
+        self.update_vertex_number(new_value)
+
+    def has_edge(self, u, v):
+        return self.adjlist.contains(u, v)
+
+    def degree(self, u):
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.adjlist.degree(u)
+
+
+class CompleteGraph(ImplicitGraph):
+    """Complete graph, with implicit edges
+
+    Examples
+    --------
+    >>> K = CompleteGraph(4)
+    >>> K.number_of_edges(), list(K.neighbors(3)), K.has_edge(2, 2)
+    (6, [1, 2, 4], False)
+    >>> K.remove_edge(1, 2)
+    >>> type(K).__name__, K.number_of_edges()
+    ('Graph', 5)
+    """
+    def __init__(self, n):
+        ImplicitGraph.__init__(self, n, n * (n - 1) // 2,
+                               'the complete graph of order ' + str(n))
+
+    def _row(self, u):
+        return list(chain(range(1, u), range(u + 1, self.n + 1)))
+
+    def has_edge(self, u, v):
+        return 1 <= u <= self.n and 1 <= v <= self.n and u != v
+
+    def degree(self, u):
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.n - 1
+
+
+class GridGraph(ImplicitGraph):
+    """Grid or torus graph, with implicit edges
+
+    The vertices are the points of the grid, in lexicographic order
+    of their coordinates. See :py:func:`grid` for the details of the
+    construction.
+
+    Examples
+    --------
+    >>> G = GridGraph([2, 3])
+    >>> G.number_of_edges(), list(G.neighbors(2)), list(G.neighbors(4))
+    (7, [1, 3, 5], [1, 5])
+    >>> T = GridGraph([2, 3], torus=True)
+    >>> T.number_of_edges(), list(T.neighbors(1))
+    (9, [2, 3, 4])
+    """
+    def __init__(self, dimensions, torus=False):
+        self.lengths = [d for d in dimensions if d > 1]
+        self.strides = []
+        n = 1
+        for d in reversed(self.lengths):
+            self.strides.append(n)
+            n *= d
+        self.strides.reverse()
+        self.torus = torus
+        m = sum(n // d * (d if torus and d > 2 else d - 1)
+                for d in self.lengths)
+        if torus:
+            name = "torus graph of dimensions "
+        else:
+            name = "grid graph of dimensions "
+        name += "x".join(str(d) for d in dimensions)
+        ImplicitGraph.__init__(self, n, m, name)
+
+    def _row(self, u):
+        x = u - 1
+        result = []
+        for d, s in zip(self.lengths, self.strides):
+            c = (x // s) % d
+            if c > 0:
+                result.append(u - s)
+            elif self.torus and d > 2:
+                result.append(u + (d - 1) * s)
+            if c < d - 1:
+                result.append(u + s)
+            elif self.torus and d > 2:
+                result.append(u - (d - 1) * s)
+        result.sort()
+        return result
+
+
 class DirectedGraph(BaseGraph):
 
     def is_dag(self):
@@ -473,6 +1059,44 @@ edges can be added and not removed."""
         self.m += 1
         self.edgeset.add((src, dest))
 
+    def add_edges_from(self, edges):
+        """Add many edges to the graph
+
+        Equivalent to calling :py:meth:`add_edge` on each edge, but
+        the neighborhoods are sorted only once at the end, instead of
+        inserting each neighbor at its place.
+
+        Examples
+        --------
+        >>> D = DirectedGraph(3)
+        >>> D.add_edges_from([(1, 3), (2, 3), (1, 2)])
+        >>> list(D.edges()), D.is_dag()
+        ([(1, 2), (1, 3), (2, 3)], True)
+        """
+        n = self.n
+        pred, succ = self.pred, self.succ
+        edgeset = self.edgeset
+        touched = set()
+        try:
+            for src, dest in edges:
+                if not (1 <= src <= n and 1 <= dest <= n):
+                    raise ValueError(
+                        "u,v must be distinct, between 1 and the number of nodes")
+                if (src, dest) in edgeset:
+                    continue
+                if src >= dest:
+                    self.still_a_dag = False
+                pred[dest].append(src)
+                succ[src].append(dest)
+                touched.add(src)
+                touched.add(dest)
+                self.m += 1
+                edgeset.add((src, dest))
+        finally:
+            for u in touched:
+                pred[u].sort()
+                succ[u].sort()
+
     def has_edge(self, src, dest):
         """True if graph contains directed edge (src,dest)"""
         return (src, dest) in self.edgeset
@@ -486,6 +1110,12 @@ edges can be added and not removed."""
     def edges_ordered_by_successors(self):
         return DirectedEdgeList(self, sort_by_predecessors=False)
 
+    def freeze(self):
+        """An immutable copy of the graph, in compact representation
+
+        See :py:class:`FrozenDirectedGraph`."""
+        return FrozenDirectedGraph(self.n, self.edges(), name=self.name)
+
     def number_of_vertices(self):
         return self.n
 
@@ -604,8 +1234,7 @@ The sequence of successors is guaranteed to be sorted."""
         if isinstance(G, BipartiteGraph):
             l = G.left_order()
             newG = DirectedGraph(G.number_of_vertices())
-            for u,v in G.edges():
-                newG.add_edge(u,v+l)
+            newG.add_edges_from((u, v+l) for u, v in G.edges())
             return newG
 
         # is it worth to consider networkx graphs?
@@ -625,6 +1254,229 @@ The sequence of successors is guaranteed to be sorted."""
         raise TypeError("argument must either be DirectedGraph, BipartiteGraph or networkx.DiGraph")
 
 
+class FrozenDirectedGraph(DirectedGraph):
+    """Immutable directed graph in compressed sparse row format
+
+    Same as :py:class:`FrozenGraph`, for directed graphs. Both
+    successors and predecessors are stored in CSR format.
+
+    Examples
+    --------
+    >>> D = FrozenDirectedGraph(3, [(1, 3), (1, 2), (2, 3)])
+    >>> list(D.predecessors(3)), list(D.successors(1))
+    ([1, 2], [2, 3])
+    >>> D.is_dag(), D.has_edge(3, 1), D.number_of_edges()
+    (True, False, 3)
+    >>> FrozenDirectedGraph.from_edge_array(2, [2, 1]).is_dag()
+    False
+    """
+    def __init__(self, n, edges=(), name=None):
+        non_negative_int(n, 'n')
+        self.n = n
+        if name is None:
+            self.name = "a directed graph with {} vertices".format(n)
+        else:
+            self.name = name
+
+        edgelist = array('i')
+        for src, dest in edges:
+            if not (1 <= src <= n and 1 <= dest <= n):
+                raise ValueError(
+                    "u,v must be distinct, between 1 and the number of nodes")
+            edgelist.append(src)
+            edgelist.append(dest)
+
+        self.succ = CSRAdjacency(n, _pairs_from_edge_array(edgelist))
+        self.pred = CSRAdjacency(n, ((dest, src) for src, dest in
+                                     _pairs_from_edge_array(edgelist)))
+        self.m = len(self.succ.targets)
+        self.still_a_dag = all(src < dest for src, dest in self.edges())
+
+    @classmethod
+    def from_edge_array(cls, n, edges, name=None):
+        """Build a frozen directed graph from a flat array of edges
+
+        The sequence ``u1, v1, u2, v2, ...`` represents the directed
+        edges `(u1,v1)`, `(u2,v2)`, ...
+
+        See also :py:meth:`FrozenGraph.from_edge_array`."""
+        return cls(n, _pairs_from_edge_array(edges), name=name)
+
+    def add_edge(self, src, dest):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def add_edges_from(self, edges):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def has_edge(self, src, dest):
+        """True if graph contains directed edge (src,dest)"""
+        return self.succ.contains(src, dest)
+
+    def in_degree(self, u):
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.pred.degree(u)
+
+    def out_degree(self, v):
+        if not(1 <= v <= self.n):
+            raise ValueError("vertex v not in the graph")
+        return self.succ.degree(v)
+
+    @classmethod
+    def from_networkx(cls, G):
+        return DirectedGraph.from_networkx(G).freeze()
+
+    @classmethod
+    def from_file(cls, fileorname, fileformat=None):
+        return DirectedGraph.from_file(fileorname, fileformat).freeze()
+
+    def freeze(self):
+        return self
+
+
+class ImplicitDirectedGraph(DirectedGraph):
+    """Directed acyclic graph with adjacency lists computed on demand
+
+    Same as :py:class:`ImplicitGraph`, for directed acyclic graphs.
+    Subclasses implement :py:meth:`_successors_row` and
+    :py:meth:`_predecessors_row`. At the first modification the graph
+    is turned into a regular :py:class:`DirectedGraph`.
+    """
+    def __init__(self, n, m, name):
+        non_negative_int(n, 'n')
+        self.n = n
+        self.m = m
+        self.name = name
+        self.still_a_dag = True
+        self.succ = ImplicitAdjacency(n, self._successors_row)
+        self.pred = ImplicitAdjacency(n, self._predecessors_row)
+
+    def _successors_row(self, u):
+        raise NotImplementedError
+
+    def _predecessors_row(self, u):
+        raise NotImplementedError
+
+    def _materialize(self):
+        edges = list(self.edges())
+        self.__class__ = DirectedGraph
+        DirectedGraph.__init__(self, self.n, self.name)
+        self.add_edges_from(edges)
+
+    def add_edge(self, src, dest):
+        self._materialize()
+        self.add_edge(src, dest)
+
+    def add_edges_from(self, edges):
+        self._materialize()
+        self.add_edges_from(edges)
+
+    def has_edge(self, src, dest):
+        """True if graph contains directed edge (src,dest)"""
+        return self.succ.contains(src, dest)
+
+    def in_degree(self, u):
+        if not(1 <= u <= self.n):
+            raise ValueError("vertex u not in the graph")
+        return self.pred.degree(u)
+
+    def out_degree(self, v):
+        if not(1 <= v <= self.n):
+            raise ValueError("vertex v not in the graph")
+        return self.succ.degree(v)
+
+
+class PyramidDAG(ImplicitDirectedGraph):
+    """Pyramid DAG, with implicit edges
+
+    See :py:func:`dag_pyramid`.
+
+    Examples
+    --------
+    >>> D = PyramidDAG(2)
+    >>> list(D.edges())
+    [(1, 4), (2, 4), (2, 5), (3, 5), (4, 6), (5, 6)]
+    >>> list(D.successors(2)), list(D.predecessors(5))
+    ([4, 5], [2, 3])
+    """
+    def __init__(self, height):
+        self.height = height
+        self.starts = [1]
+        for layer in range(height + 1):
+            self.starts.append(self.starts[-1] + height + 1 - layer)
+        n = self.starts[-1] - 1
+        ImplicitDirectedGraph.__init__(self, n, height * (height + 1),
+                                       'Pyramid of height {}'.format(height))
+
+    def _successors_row(self, u):
+        layer = bisect_right(self.starts, u) - 1
+        if layer == self.height:
+            return []
+        i = u - self.starts[layer]
+        above = self.starts[layer + 1]
+        result = []
+        if i > 0:
+            result.append(above + i - 1)
+        if i < self.height - layer:
+            result.append(above + i)
+        return result
+
+    def _predecessors_row(self, u):
+        layer = bisect_right(self.starts, u) - 1
+        if layer == 0:
+            return []
+        below = self.starts[layer - 1] + u - self.starts[layer]
+        return [below, below + 1]
+
+
+class CompleteBinaryTreeDAG(ImplicitDirectedGraph):
+    """Complete binary tree DAG, with implicit edges
+
+    See :py:func:`dag_complete_binary_tree`.
+
+    Examples
+    --------
+    >>> list(CompleteBinaryTreeDAG(2).edges())
+    [(1, 5), (2, 5), (3, 6), (4, 6), (5, 7), (6, 7)]
+    """
+    def __init__(self, height):
+        self.half = 2**height
+        n = 2 * self.half - 1
+        ImplicitDirectedGraph.__init__(
+            self, n, n - 1, 'Complete binary tree of height {}'.format(height))
+
+    def _successors_row(self, u):
+        if u == self.n:
+            return []
+        return [self.half + (u + 1) // 2]
+
+    def _predecessors_row(self, u):
+        if u <= self.half:
+            return []
+        return [2 * (u - self.half) - 1, 2 * (u - self.half)]
+
+
+class PathDAG(ImplicitDirectedGraph):
+    """Directed path, with implicit edges
+
+    See :py:func:`dag_path`.
+
+    Examples
+    --------
+    >>> list(PathDAG(3).edges())
+    [(1, 2), (2, 3), (3, 4)]
+    """
+    def __init__(self, length):
+        ImplicitDirectedGraph.__init__(
+            self, length + 1, length, 'Directed path of length {}'.format(length))
+
+    def _successors_row(self, u):
+        return [u + 1] if u < self.n else []
+
+    def _predecessors_row(self, u):
+        return [u - 1] if u > 1 else []
+
+
 class BaseBipartiteGraph(BaseGraph):
     """Base class for bipartite graphs"""
 
@@ -726,9 +1578,52 @@ class BipartiteGraph(BaseBipartiteGraph):
         self.radj[v].insert(pu, u)
         self.edgeset.add((u, v))
 
+    def add_edges_from(self, edges):
+        """Add many edges to the graph
+
+        Equivalent to calling :py:meth:`add_edge` on each edge, but
+        the neighborhoods are sorted only once at the end, instead of
+        inserting each neighbor at its place.
+
+        Examples
+        --------
+        >>> G = BipartiteGraph(2, 3)
+        >>> G.add_edges_from([(2, 3), (1, 2), (2, 1), (2, 3)])
+        >>> G.right_neighbors(2), G.left_neighbors(2)
+        ([1, 3], [1])
+        """
+        L, R = self.lorder, self.rorder
+        ladj, radj = self.ladj, self.radj
+        edgeset = self.edgeset
+        touched_left = set()
+        touched_right = set()
+        try:
+            for u, v in edges:
+                if not (1 <= u <= L and 1 <= v <= R):
+                    raise ValueError("Invalid choice of vertices")
+                if (u, v) in edgeset:
+                    continue
+                ladj.setdefault(u, []).append(v)
+                radj.setdefault(v, []).append(u)
+                touched_left.add(u)
+                touched_right.add(v)
+                edgeset.add((u, v))
+        finally:
+            for u in touched_left:
+                ladj[u].sort()
+            for v in touched_right:
+                radj[v].sort()
+
     def number_of_edges(self):
         return len(self.edgeset)
 
+    def freeze(self):
+        """An immutable copy of the graph, in compact representation
+
+        See :py:class:`FrozenBipartiteGraph`."""
+        return FrozenBipartiteGraph(self.lorder, self.rorder, self.edges(),
+                                    name=self.name)
+
     def right_neighbors(self, u):
         """Outputs the neighbors of a left vertex `u`
 
@@ -868,6 +1763,93 @@ The sequence of neighbors is guaranteed to be sorted."""
         raise TypeError("argument must either be cnfgen.BipartiteGraph or networkx.Graph")
 
 
+class FrozenBipartiteGraph(BipartiteGraph):
+    """Immutable bipartite graph in compressed sparse row format
+
+    Same as :py:class:`FrozenGraph`, for bipartite graphs. The
+    neighborhoods of both sides are stored in CSR format.
+
+    Examples
+    --------
+    >>> B = FrozenBipartiteGraph(2, 3, [(1, 3), (2, 1), (1, 1)])
+    >>> B.right_neighbors(1), B.left_neighbors(1), B.left_neighbors(2)
+    ([1, 3], [1, 2], [])
+    >>> B.has_edge(2, 1), B.has_edge(2, 3), B.number_of_edges()
+    (True, False, 3)
+    """
+    def __init__(self, L, R, edges=(), name=None):
+        non_negative_int(L, 'L')
+        non_negative_int(R, 'R')
+        BaseBipartiteGraph.__init__(self, L, R, name)
+
+        edgelist = array('i')
+        for u, v in edges:
+            if not (1 <= u <= L and 1 <= v <= R):
+                raise ValueError("Invalid choice of vertices")
+            edgelist.append(u)
+            edgelist.append(v)
+
+        self.ladj = CSRAdjacency(L, _pairs_from_edge_array(edgelist))
+        self.radj = CSRAdjacency(R, ((v, u) for u, v in
+                                     _pairs_from_edge_array(edgelist)))
+
+    @classmethod
+    def from_edge_array(cls, L, R, edges, name=None):
+        """Build a frozen bipartite graph from a flat array of edges
+
+        The sequence ``u1, v1, u2, v2, ...`` represents the edges
+        `(u1,v1)`, `(u2,v2)`, ... where the `u` are left vertices and
+        the `v` are right vertices.
+
+        See also :py:meth:`FrozenGraph.from_edge_array`."""
+        return cls(L, R, _pairs_from_edge_array(edges), name=name)
+
+    def add_edge(self, u, v):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def add_edges_from(self, edges):
+        raise TypeError("frozen graphs cannot be modified")
+
+    def has_edge(self, u, v):
+        return self.ladj.contains(u, v)
+
+    def number_of_edges(self):
+        return len(self.ladj.targets)
+
+    def right_degree(self, u):
+        return self.ladj.degree(u)
+
+    def left_degree(self, v):
+        return self.radj.degree(v)
+
+    def right_neighbors(self, u):
+        """Outputs the neighbors of a left vertex `u`
+
+The sequence of neighbors is guaranteed to be sorted."""
+        if not (1 <= u <= self.lorder):
+            raise ValueError("Invalid choice of vertex")
+        return self.ladj[u]
+
+    def left_neighbors(self, v):
+        """Outputs the neighbors of right vertex `u`
+
+The sequence of neighbors is guaranteed to be sorted."""
+        if not (1 <= v <= self.rorder):
+            raise ValueError("Invalid choice of vertex")
+        return self.radj[v]
+
+    @classmethod
+    def from_networkx(cls, G):
+        return BipartiteGraph.from_networkx(G).freeze()
+
+    @classmethod
+    def from_file(cls, fileorname, fileformat=None):
+        return BipartiteGraph.from_file(fileorname, fileformat).freeze()
+
+    def freeze(self):
+        return self
+
+
 class CompleteBipartiteGraph(BipartiteGraph):
     def __init__(self, L, R):
         BipartiteGraph.__init__(self, L, R)
@@ -880,6 +1862,9 @@ class CompleteBipartiteGraph(BipartiteGraph):
     def add_edge(self, u, v):
         pass
 
+    def add_edges_from(self, edges):
+        pass
+
     def number_of_edges(self):
         return self.lorder * self.rorder
 
@@ -889,6 +1874,13 @@ class CompleteBipartiteGraph(BipartiteGraph):
     def left_neighbors(self, v):
         return range(1, self.lorder + 1)
 
+    def freeze(self):
+        """An immutable copy of the graph, in compact representation
+
+        See :py:class:`FrozenBipartiteGraph`."""
+        return FrozenBipartiteGraph(self.lorder, self.rorder, self.edges(),
+                                    name=self.name)
+
 
 def _has_dot_support():
     """Test the presence of DOT support in networkx
@@ -920,7 +1912,17 @@ def _has_gml_support():
 
 
 def guess_fileformat(fileorname, fileformat=None):
-    """Guess the file format for the file or filename """
+    """Guess the file format for the file or filename
+
+    Compression extensions are ignored.
+
+    Examples
+    --------
+    >>> guess_fileformat('graph.gml.gz')
+    'gml'
+    >>> guess_fileformat('graph.kthlist')
+    'kthlist'
+    """
     if fileformat is not None:
         return fileformat
 
@@ -929,6 +1931,7 @@ def guess_fileformat(fileorname, fileformat=None):
             name = fileorname
         else:
             name = fileorname.name
+        name = strip_compression_extension(name)
         return os.path.splitext(name)[-1][1:]
     except (AttributeError, ValueError, IndexError):
         raise ValueError(
@@ -967,8 +1970,9 @@ def _process_graph_io_arguments(iofile, graph_type, file_format, multi_edges):
     # Check/discover file format specification
     if file_format == 'autodetect':
         try:
-            extension = os.path.splitext(iofile.name)[-1][1:]
-        except AttributeError:
+            extension = strip_compression_extension(iofile.name)
+            extension = os.path.splitext(extension)[-1][1:]
+        except (AttributeError, TypeError):
             raise ValueError(
                 "Cannot guess a file format from an IO stream with no name. Please specify the format manually."
             )
@@ -1018,7 +2022,9 @@ def readGraph(input_file,
         filename. Otherwise if the input_file is a file object (or
         a text stream), the graph is read from there.
 
-        Input files are assumed to be UTF-8 by default.
+        Input files are assumed to be UTF-8 by default. Files with
+        a compression extension (e.g. '.gz', '.xz') are decompressed
+        on the fly.
 
     graph_type: string in {"simple","digraph","dag","bipartite"}
 
@@ -1055,7 +2061,7 @@ def readGraph(input_file,
 
     # file name instead of file object
     if isinstance(input_file, str):
-        with open(input_file, 'r', encoding='utf-8') as file_handle:
+        with open_file(input_file, 'r') as file_handle:
             return readGraph(file_handle, graph_type, file_format, multi_edges)
 
     graph_class, file_format = _process_graph_io_arguments(input_file,
@@ -1137,7 +2143,9 @@ def writeGraph(G, output_file, graph_type, file_format='autodetect'):
         filename. Otherwise if ``output_file`` is a file object (or
         a text stream), the graph is written there.
 
-        The file is written in UTF-8 by default.
+        The file is written in UTF-8 by default. File names with
+        a compression extension (e.g. '.gz', '.xz') are compressed on
+        the fly.
 
     graph_type: string in {"simple","digraph","dag","bipartite"}
         see also :py:func:`cnfgen.graph.supported_formats`
@@ -1171,7 +2179,7 @@ def writeGraph(G, output_file, graph_type, file_format='autodetect'):
 
     # file name instead of file object
     if isinstance(output_file, str):
-        with open(output_file, 'w', encoding='utf-8') as file_handle:
+        with open_file(output_file, 'w') as file_handle:
             return writeGraph(G, file_handle, graph_type, file_format)
 
     _, file_format = _process_graph_io_arguments(output_file, graph_type,
@@ -1325,9 +2333,7 @@ def _read_bipartite_kthlist(inputfile):
     R = size - bipartition_ambiguous[0]+1
     G = BipartiteGraph(L, R, name)
 
-    for u in edges:
-        for v in edges[u]:
-            G.add_edge(u, v - L)
+    G.add_edges_from((u, v - L) for u in edges for v in edges[u])
 
     if size != G.number_of_vertices():
         raise ValueError("{} vertices expected. Got {} instead.".format(
@@ -1365,6 +2371,7 @@ def _read_nonbipartite_kthlist(inputfile, graph_class):
     parser = _kthlist_parse(inputfile)
     size, name = next(parser)
     G = graph_class(size, name)
+    edges = []
 
     previous = 0
     for succ, predecessors, lineno in parser:
@@ -1373,12 +2380,13 @@ def _read_nonbipartite_kthlist(inputfile, graph_class):
             raise ValueError(
                 "Vertex at line {} is smaller than the previous one.".format(lineno))
 
-        # after vertices, add the edges
-        for v in predecessors:
-            G.add_edge(v, succ)
+        # after vertices, collect the edges
+        edges.extend((v, succ) for v in predecessors)
 
         previous = succ
 
+    G.add_edges_from(edges)
+
     if size != G.order():
         raise ValueError("{} vertices expected. Got {} instead.".format(
             size, G.order()))
@@ -1404,6 +2412,7 @@ def _read_graph_dimacs_format(inputfile, graph_class):
     n = -1
     m = -1
     m_cnt = 0
+    edges = []
 
     # is the input topologically sorted?
     for i, l in enumerate(inputfile.readlines()):
@@ -1438,15 +2447,21 @@ def _read_graph_dimacs_format(inputfile, graph_class):
             m_cnt += 1
             _, v, w = l.split()
             try:
-                G.add_edge(int(v), int(w))
+                v, w = int(v), int(w)
+                if not (1 <= v <= n and 1 <= w <= n):
+                    raise ValueError
+                if v == w and graph_class is Graph:
+                    raise ValueError
             except ValueError:
                 raise ValueError("[Syntax error] " +
                                  "Line {} syntax error: edge must be 'e u v' where u, v are vertices".format(i))
+            edges.append((v, w))
 
     if m != m_cnt:
         raise ValueError("[Syntax error] " +
                          "{} edges were expected.".format(m))
 
+    G.add_edges_from(edges)
     return G
 
 def _read_non_bipartite_dot_format(inputfile, graph_class):
@@ -1494,8 +2509,7 @@ def _read_non_bipartite_dot_format(inputfile, graph_class):
         edges.append((src,dst))
     G = graph_class(len(vertices))
     G.name = D.get_name().strip('"') or ""
-    for src,dst in edges:
-        G.add_edge(vertices[src],vertices[dst])
+    G.add_edges_from((vertices[src], vertices[dst]) for src, dst in edges)
 
     return G
 
@@ -1550,12 +2564,14 @@ def _read_bipartite_dot_format(inputfile, graph_class):
     G.name = D.get_name().strip('"') or ""
 
     # Load edges
+    edges = []
     for edge in D.get_edges():
         src=edge.get_source()
         dst=edge.get_destination()
         if src not in left or dst not in right:
             raise ValueError("DOT file: invalid edge {}--{} ".format(src,dst))
-        G.add_edge(left[src],right[dst])
+        edges.append((left[src],right[dst]))
+    G.add_edges_from(edges)
 
     return G
 
@@ -1623,6 +2639,7 @@ def _read_graph_matrix_format(inputfile):
 
         G = BipartiteGraph(n, m)
         G.name = ''
+        edges = []
 
         # read edges
         for i in range(1, n + 1):
@@ -1630,7 +2647,7 @@ def _read_graph_matrix_format(inputfile):
 
                 (b, l) = next(scanner)
                 if b == 1:
-                    G.add_edge(i, j)
+                    edges.append((i, j))
                 elif b == 0:
                     pass
                 else:
@@ -1640,6 +2657,8 @@ def _read_graph_matrix_format(inputfile):
     except StopIteration:
         raise ValueError("[Input error] Unexpected end of the matrix")
 
+    G.add_edges_from(edges)
+
     # check that there are is no more data
     try:
         (b, l) = next(scanner)
@@ -1938,9 +2957,7 @@ def bipartite_random_left_regular(l, r, d, seed=None):
     d = min(r, d)
 
     L, R = G.parts()
-    for u in L:
-        for v in sorted(random.sample(R, d)):
-            G.add_edge(u, v)
+    G.add_edges_from((u, v) for u in L for v in random.sample(R, d))
 
     return G
 
@@ -1987,22 +3004,121 @@ def bipartite_random_m_edges(L, R, m, seed=None):
 
     if m > L * R // 3:
         # Sampling strategy (dense)
-        E = [(u, v) for u in U for v in V]
-        for u, v in random.sample(E, m):
-            G.add_edge(u, v)
+        if 2 * m > L * R:
+            skip = _floyd_sample(L * R, L * R - m)
+            G.add_edges_from(e for r, e in enumerate(product(U, V))
+                             if r not in skip)
+        else:
+            G.add_edges_from((1 + r // R, 1 + r % R)
+                             for r in _floyd_sample(L * R, m))
     else:
         # Sampling strategy (sparse)
-        count = 0
-        while count < m:
+        edges = set()
+        while len(edges) < m:
             u = random.randint(1, L)
             v = random.randint(1, R)
-            if not G.has_edge(u, v):
-                G.add_edge(u, v)
-                count += 1
+            edges.add((u, v))
+        G.add_edges_from(edges)
     assert G.number_of_edges() == m
     return G
 
 
+def _geometric_skips(total, p):
+    """Positions among `total` picked independently with probability `p`
+
+    Instead of flipping a coin for each position, the distance to the
+    next picked position is sampled from a geometric distribution, so
+    the running time is proportional to the number of picked
+    positions [BB05]_.
+
+    >>> list(_geometric_skips(5, 1))
+    [0, 1, 2, 3, 4]
+    >>> list(_geometric_skips(5, 0))
+    []
+    >>> random.seed(1)
+    >>> picked = list(_geometric_skips(100, 0.1))
+    >>> all(0 <= a < b < 100 for a, b in zip(picked, picked[1:]))
+    True
+
+    References
+    ----------
+    .. [BB05] V. Batagelj and U. Brandes. Efficient generation of large
+              random networks. Physical Review E, 71(3), 2005.
+    """
+    if p <= 0:
+        return
+    if p >= 1:
+        yield from range(total)
+        return
+    logq = math.log1p(-p)
+    pos = -1
+    while True:
+        pos += 1 + int(math.log(1.0 - random.random()) / logq)
+        if pos >= total:
+            return
+        yield pos
+
+
+def _floyd_sample(total, k):
+    """A set of `k` distinct integers sampled from ``range(total)``
+
+    Floyd's algorithm uses time and memory proportional to `k`, and
+    the range is never materialized [BF87]_.
+
+    >>> random.seed(1)
+    >>> S = _floyd_sample(10**12, 5)
+    >>> len(S), all(0 <= x < 10**12 for x in S)
+    (5, True)
+    >>> sorted(_floyd_sample(6, 6))
+    [0, 1, 2, 3, 4, 5]
+
+    References
+    ----------
+    .. [BF87] J. Bentley and B. Floyd. Programming pearls: a sample
+              of brilliance. Communications of the ACM, 30(9), 1987.
+    """
+    picked = set()
+    for j in range(total - k, total):
+        t = random.randint(0, j)
+        picked.add(j if t in picked else t)
+    return picked
+
+
+def _pair_rank(u, v):
+    """Position of the pair :math:`u<v` in colexicographic order"""
+    return (v - 1) * (v - 2) // 2 + u - 1
+
+
+def _pair_of_rank(rank):
+    """The pair :math:`u<v` at position `rank` in colexicographic order
+
+    >>> [_pair_of_rank(r) for r in range(6)]
+    [(1, 2), (1, 3), (2, 3), (1, 4), (2, 4), (3, 4)]
+    >>> _pair_rank(*_pair_of_rank(10**15))
+    1000000000000000
+    """
+    v = int((1 + math.sqrt(1 + 8 * rank)) / 2)
+    while v * (v - 1) // 2 > rank:
+        v -= 1
+    while v * (v + 1) // 2 <= rank:
+        v += 1
+    return rank - v * (v - 1) // 2 + 1, v + 1
+
+
+def _missing_ranks(total, taken, k):
+    """Sample `k` ranks in ``range(total)`` outside the `taken` ones
+
+    The ranks are sampled among the missing ones with
+    :py:func:`_floyd_sample`, and the `x`-th missing rank is found by
+    binary search on the sorted taken ranks. Only the taken ranks and
+    the sampled ones are kept in memory.
+    """
+    taken = sorted(taken)
+    shifted = [r - i for i, r in enumerate(taken)]
+    return [x + bisect_right(shifted, x)
+            for x in _floyd_sample(total - len(taken), k)]
+
+
 def bipartite_random(L, R, p, seed=None):
     """Returns a random bipartite graph with independent edges
 
@@ -2040,12 +3156,8 @@ def bipartite_random(L, R, p, seed=None):
     G = BipartiteGraph(L, R)
     G.name = "bipartite_random_graph({},{},{})".format(L, R, p)
 
-    U, V = G.parts()
-
-    for u in U:
-        for v in V:
-            if random.random() <= p:
-                G.add_edge(u, v)
+    G.add_edges_from((1 + pos // R, 1 + pos % R)
+                     for pos in _geometric_skips(L * R, p))
     return G
 
 
@@ -2092,15 +3204,11 @@ def multipartite_random(t, n, p, seed=None, shuffleblocks=False):
     if shuffleblocks:
         random.shuffle(V)
 
+    edges = []
     for i, j in combinations(range(t), 2):
-        for a in range(n * i, n * (i + 1)):
-            for b in range(n * j, n * (j + 1)):
-                if p==1:
-                    G.add_edge(V[a], V[b])
-                elif p == 0:
-                    continue
-                elif random.random() < p:
-                    G.add_edge(V[a], V[b])
+        for pos in _geometric_skips(n * n, p):
+            edges.append((V[n * i + pos // n], V[n * j + pos % n]))
+    G.add_edges_from(edges)
 
     G.name = 'Random {2}-biased {0}-partite graph with {1} vertices per part'.format(
         t, n, p)
@@ -2142,14 +3250,19 @@ def random_gnp(n, p, seed=None):
 
     G = Graph.empty_graph(n)
 
-    for i in range(1,n):
-        for j in range(i+1,n+1):
-            if p==1:
-                G.add_edge(i,j)
-            elif p == 0:
-                continue
-            elif random.random() < p:
-                G.add_edge(i,j)
+    # Walk over the pairs (i,j) with i<j in lexicographic order. The
+    # row of i has n-i pairs.
+    edges = []
+    i, j = 1, 2
+    last = 0
+    for pos in _geometric_skips(n * (n - 1) // 2, p):
+        j += pos - last
+        last = pos
+        while j > n:
+            j -= n - i - 1
+            i += 1
+        edges.append((i, j))
+    G.add_edges_from(edges)
 
     G.name = 'Random {}-biased graph of {} vertices'.format(p, n)
     return G
@@ -2190,72 +3303,138 @@ def random_gnm(n, m, seed=None):
 
     if m > n*n // 6:
         # Sampling strategy (dense)
-        E = list(combinations(G.vertices(),2))
-        for u, v in random.sample(E, m):
-            G.add_edge(u, v)
+        total = n*(n-1)//2
+        if 2*m > total:
+            skip = _floyd_sample(total, total - m)
+            G.add_edges_from(e for r, e in enumerate(combinations(G.vertices(), 2))
+                             if r not in skip)
+        else:
+            G.add_edges_from(_pair_of_rank(r) for r in _floyd_sample(total, m))
     else:
         # Sampling strategy (sparse)
-        count = 0
-        while count < m:
+        edges = set()
+        while len(edges) < m:
             u = random.randint(1, n)
             v = random.randint(1, n)
-            if (u != v) and not G.has_edge(u, v):
-                G.add_edge(u, v)
-                count += 1
+            if u != v:
+                edges.add((min(u, v), max(u, v)))
+        G.add_edges_from(edges)
     assert G.number_of_edges() == m
     return G
 
 
-def _random_gnd_kimvu(n, d, tentatives=None):
+def _repair_pairing(U, V, bipartite, tries):
+    """Turn a random pairing of stubs into a simple graph
 
-    def _still_good_edges(edges, deg_sequence):
-        for u,v in combinations(deg_sequence,2):
-            if u > v:
-                u,v = v,u
-            if (u, v) not in edges:
-                return True
-        return False
+    The i-th edge of the pairing joins ``U[i]`` and ``V[i]``. Loops
+    and repeated edges are removed one by one with *switchings*: the
+    bad edge :math:`\\{u,v\\}` and a random good edge
+    :math:`\\{x,y\\}` are replaced by :math:`\\{u,y\\}` and
+    :math:`\\{x,v\\}`, which keeps all degrees unchanged. For bounded
+    degrees the expected number of bad edges is constant, hence the
+    repair takes expected linear time overall. The switchings are
+    those of [MW90]_, without the rejection steps that make their
+    sampler exactly uniform.
+
+    Returns ``False`` if the repair needs more than ``tries``
+    switching attempts, and ``True`` otherwise.
+
+    References
+    ----------
+    .. [MW90] B. D. McKay and N. C. Wormald. Uniform generation of
+              random regular graphs of moderate degree. Journal of
+              Algorithms, 11(1), 1990.
+    """
+    def key(u, v):
+        if bipartite or u < v:
+            return (u, v)
+        return (v, u)
+
+    m = len(U)
+    count = {}
+    bad = []
+    for i in range(m):
+        k = key(U[i], V[i])
+        if k in count:
+            count[k] += 1
+            bad.append(i)
+        else:
+            count[k] = 1
+            if not bipartite and U[i] == V[i]:
+                bad.append(i)
+
+    for i in bad:
+        u, v = U[i], V[i]
+        if (bipartite or u != v) and count[key(u, v)] == 1:
+            continue  # fixed while repairing another copy
+        while True:
+            if tries == 0:
+                return False
+            tries -= 1
+            j = random.randrange(m)
+            x, y = U[j], V[j]
+            if not bipartite and random.random() < 0.5:
+                x, y = y, x
+            if (not bipartite and (x == y or u == y or x == v)) or \
+               count[key(x, y)] > 1:
+                continue
+            k1, k2 = key(u, y), key(x, v)
+            if k1 == k2 or k1 in count or k2 in count:
+                continue
+            for k in (key(u, v), key(x, y)):
+                count[k] -= 1
+                if count[k] == 0:
+                    del count[k]
+            count[k1] = 1
+            count[k2] = 1
+            V[i] = y
+            U[j], V[j] = x, v
+            break
+    return True
 
-    G=Graph(n)
-    tentative = 0
-    complement =  d > (n-1- d)  # cheaper to sample the complement graph
-    if complement:
-        d = n - 1 - d
 
-    while tentatives is None or tentative < tentatives:
+# Expected number of stubs to pair before using switchings instead
+# of rejection sampling
+REGULAR_REJECTION_BUDGET = 100000
 
-        # tentative edge set
-        degrees = {v:d for v in range(1,n+1)}
-        copies  = [ v for v in degrees for _ in range(degrees[v])]
-        edges = set()
-        tentative += 1
-
-        while copies:
-            random.shuffle(copies)
-            for i in range(0,len(copies),2):
-                s1, s2 = copies[i], copies[i+1]
-                if s1 > s2:
-                    s1, s2 = s2, s1
-                if s1 != s2 and ((s1, s2) not in edges):
-                    edges.add((s1, s2))
-                    degrees[s1] -= 1
-                    degrees[s2] -= 1
-                    if degrees[s1]==0: degrees.pop(s1)
-                    if degrees[s2]==0: degrees.pop(s2)
-
-            if _still_good_edges(edges, degrees):
-                copies  = [ v for v in degrees for _ in range(degrees[v])]
-            else:
-                copies  = [ ]
 
-        if len(edges) == n*d // 2 :  # good outcome
-            if complement:
-                G.add_edges_from(e for e in combinations(range(1,n+1),2) if e not in edges)
-            else:
-                G.add_edges_from(edges)
-            return G
+def _random_regular_pairing(left, right, d, e, bipartite):
+    """Edges of a random simple graph with given regular degrees
+
+    The stubs of the vertices in ``left`` (``d`` each) are randomly
+    paired with the stubs of the vertices in ``right`` (``e`` each).
+    For non bipartite graphs ``left`` and ``right`` are the same
+    vertices, and the stubs are paired among themselves.
 
-    raise RuntimeError("Exceeded the number of tries")
+    A simple pairing is a uniformly random simple graph. When the
+    expected cost of drawing pairings until one is simple is within
+    ``REGULAR_REJECTION_BUDGET`` stubs, this is what happens, and the
+    sample is exactly uniform. Otherwise the pairing is repaired into
+    a simple graph, and the distribution of the sample is only
+    asymptotically uniform: it is biased, and more so on small graphs.
+    """
+    # asymptotic probability that a random pairing is simple
+    if bipartite:
+        rate = math.exp(-(d - 1) * (e - 1) / 2)
+    else:
+        rate = math.exp(-(d * d - 1) / 4)
+    stubs = len(left) * d
+    rejection = stubs <= rate * REGULAR_REJECTION_BUDGET
+    while True:
+        if bipartite:
+            U = [v for v in left for _ in range(d)]
+            V = [v for v in right for _ in range(e)]
+            random.shuffle(V)
+        else:
+            stubs = [v for v in left for _ in range(d)]
+            random.shuffle(stubs)
+            U, V = stubs[0::2], stubs[1::2]
+        if rejection:
+            # no switchings allowed: accept only simple pairings
+            if _repair_pairing(U, V, bipartite, 0):
+                return zip(U, V)
+        elif _repair_pairing(U, V, bipartite, 100 * len(U) + 1000):
+            return zip(U, V)
 
 
 def random_gnd(n, d, seed=None):
@@ -2264,14 +3443,14 @@ def random_gnd(n, d, seed=None):
     Build a random regular graph with :math:`n` vertices and degree
     :math:`d`. It must hold that d*n is even.
 
-    We use the method by
-
-    Jeong Han Kim and Van H. Vu,
-    Generating random regular graphs,
-    Proceedings of the thirty-fifth ACM symposium on Theory of computing,
-    San Diego, CA, USA, pp 213--222, 2003.
-    http://portal.acm.org/citation.cfm?id=780542.780576
-
+    The stubs of the vertices are paired at random (the
+    *configuration model*) and then the loops and the repeated
+    edges are removed by switchings [MW90]_. The sampling takes
+    expected linear time for bounded degree. The distribution is only
+    asymptotically uniform, and it is biased on small graphs, hence
+    when it is cheap enough the pairing is drawn again until it is
+    simple, and the sample is exactly uniform. When
+    :math:`d > (n-1)/2` the complement graph is sampled instead.
 
     Parameters
     ----------
@@ -2303,8 +3482,19 @@ def random_gnd(n, d, seed=None):
         G = Graph.empty_graph(n)
     elif d==(n-1):
         G = Graph.complete_graph(n)
+    elif d > n - 1 - d:
+        # cheaper to sample the complement graph
+        H = Graph(n)
+        H.add_edges_from(_random_regular_pairing(range(1, n+1), None,
+                                                 n - 1 - d, None, False))
+        G = Graph(n)
+        G.add_edges_from((u, v) for u in range(1, n+1)
+                         for v in range(u+1, n+1)
+                         if (u, v) not in H.edgeset)
     else:
-        G = _random_gnd_kimvu(n,d)
+        G = Graph(n)
+        G.add_edges_from(_random_regular_pairing(range(1, n+1), None,
+                                                 d, None, False))
     G.name="random {}-regular graph on {} verices".format(d,n)
     return G
 
@@ -2348,31 +3538,7 @@ def grid(dimensions, torus=False):
     if len(spans)==0:  # grid [1,1,1,...,1] is a single vertex graph
         return Graph(1)
 
-    V = { v:i for i,v in enumerate(product(*spans),start=1) }
-    G = Graph(len(V))
-    if torus:
-        G.name="torus graph of dimensions "
-    else:
-        G.name="grid graph of dimensions "
-    G.name += "x".join(str(d) for d in dimensions)
-
-    for v in V:
-        src = list(v)
-        for i in range(len(spans)):
-            d = len(spans[i])
-
-            if d==1: continue  # no self loop
-            if d==2 and src[i]==1: continue  # no multi arc (even in torus)
-            if src[i]==d-1 and not torus: continue
-
-            src[i] += 1
-            src[i] %= d
-            w = tuple(src)
-            src[i] -= 1
-            src[i] %= d
-
-            G.add_edge(V[v],V[w])
-    return G
+    return GridGraph(dimensions, torus)
 
 def torus(dimensions):
     return grid(dimensions, torus=True)
@@ -2430,9 +3596,8 @@ def bipartite_shift(N, M, pattern=[]):
 
     L, R = G.parts()
     pattern.sort()
-    for u in L:
-        for offset in pattern:
-            G.add_edge(u, 1 + (u - 1 + offset) % M)
+    G.add_edges_from((u, 1 + (u - 1 + offset) % M)
+                     for u in L for offset in pattern)
 
     return G
 
@@ -2443,6 +3608,12 @@ def bipartite_random_regular(l, r, d, seed=None):
     The graph is d-regular on the left side and regular on the right
     size, so it must be that d*l / r is an integer number.
 
+    The stubs on the two sides are paired at random, and then the
+    repeated edges are removed by switchings [MW90]_, or when it is
+    cheap enough the pairing is drawn again until it has no repeated
+    edges (see :py:func:`random_gnd`). When :math:`d > r/2` the
+    bipartite complement is sampled instead.
+
     Parameters
     ----------
     l : int
@@ -2462,12 +3633,7 @@ def bipartite_random_regular(l, r, d, seed=None):
     ------
     ValueError
         if one among ``l``, ``r`` and ``d`` is negative or
-        if ``r`` does not divides `l*d`
-
-    References
-    ----------
-    [1] http://...
-
+        if ``r`` does not divides `l*d` or if ``d>r``
     """
 
     import random
@@ -2481,38 +3647,22 @@ def bipartite_random_regular(l, r, d, seed=None):
         raise ValueError(
             "bipartite_random_regular(l,r,d) needs r to divid l*d.")
 
+    if d > r:
+        raise ValueError(
+            "bipartite_random_regular(l,r,d) needs d<=r.")
+
     G = BipartiteGraph(l, r)
     G.name = "bipartite_random_regular({},{},{})".format(l, r, d)
 
     L, R = G.parts()
-    A = list(L) * d
-    B = list(R) * (l * d // r)
-    assert len(B) == l * d
-
-    for i in range(l * d):
-        # Sample an edge, do not add it if it existed
-        # We expect to sample at most d^2 edges
-        for retries in range(3 * d * d):
-            ea = random.randint(i, l * d - 1)
-            eb = random.randint(i, l * d - 1)
-            if not G.has_edge(A[ea], B[eb]):
-                G.add_edge(A[ea], B[eb])
-                A[i], A[ea] = A[ea], A[i]
-                B[i], B[eb] = B[eb], B[i]
-                break
-        else:
-            # Sampling takes too long, maybe no good edge exists
-            failure = True
-            for ea in range(i, l * d):
-                for eb in range(i, l * d):
-                    if not G.has_edge(A[ea], B[eb]):
-                        failure = False
-                        break
-                if not failure:
-                    break
-            if failure:
-                return bipartite_random_regular(l, r, d)
-
+    e = l * d // r
+    if 2 * d > r:
+        H = BipartiteGraph(l, r)
+        H.add_edges_from(_random_regular_pairing(L, R, r - d, l - e, True))
+        G.add_edges_from((u, v) for u in L for v in R
+                         if (u, v) not in H.edgeset)
+    else:
+        G.add_edges_from(_random_regular_pairing(L, R, d, e, True))
     return G
 
 
@@ -2537,21 +3687,7 @@ def dag_pyramid(height):
     if height < 0:
         raise ValueError("The height of the tree must be >= 0")
 
-    n = (height+1)*(height+2) // 2  # number of vertices
-    D = DirectedGraph(n, 'Pyramid of height {}'.format(height))
-
-    # edges
-    leftsrc = 1
-    dest = height+2
-    for layer in range(1, height+1):
-        for i in range(1, height-layer+2):
-            D.add_edge(leftsrc, dest)
-            D.add_edge(leftsrc+1, dest)
-            leftsrc += 1
-            dest += 1
-        leftsrc += 1
-
-    return D
+    return PyramidDAG(height)
 
 
 def dag_complete_binary_tree(height):
@@ -2576,19 +3712,7 @@ def dag_complete_binary_tree(height):
     if height < 0:
         raise ValueError("The height of the tree must be >= 0")
 
-    # vertices plus 1
-    N = 2 * (2**height)
-    name = 'Complete binary tree of height {}'.format(height)
-    D = DirectedGraph(N-1, name)
-
-    # edges
-    leftsrc = 1
-    for dest in range(N // 2 + 1, N):
-        D.add_edge(leftsrc, dest)
-        D.add_edge(leftsrc+1, dest)
-        leftsrc += 2
-
-    return D
+    return CompleteBinaryTreeDAG(height)
 
 
 def dag_path(length):
@@ -2612,13 +3736,7 @@ def dag_path(length):
     if length < 0:
         raise ValueError("The lenght of the path must be >= 0")
 
-    name = 'Directed path of length {}'.format(length)
-    D = DirectedGraph(length+1, name)
-    # edges
-    for i in range(1, length+1):
-        D.add_edge(i, i + 1)
-
-    return D
+    return PathDAG(length)
 
 
 def split_random_edges(G,k, seed=None):
@@ -2711,24 +3829,25 @@ def add_random_missing_edges(G, m, seed=None):
             v = random.sample(Right, 1)[0]
             return (u, v)
 
-        def available_edges():
-            return [(u, v) for u in Left for v in Right if not G.has_edge(u, v)]
+        def missing_edges(k):
+            R = len(Right)
+            taken = ((u - 1) * R + v - 1 for u, v in G.edges())
+            return ((1 + r // R, 1 + r % R)
+                    for r in _missing_ranks(total_number_of_edges, taken, k))
 
     else:
 
         V = G.number_of_vertices()
-        total_number_of_edges = V * (V - 1) / 2
+        total_number_of_edges = V * (V - 1) // 2
 
         def edge_sampler():
             return random.sample(range(1, V+1), 2)
 
-        def available_edges():
-            result = []
-            for u in range(1, V):
-                for v in range(u+1, V+1):
-                    if not G.has_edge(u, v):
-                        result.append((u, v))
-            return result
+        def missing_edges(k):
+            taken = (_pair_rank(u, v) for v in G.vertices()
+                     for u in G.neighbors(v) if u < v)
+            return (_pair_of_rank(r)
+                    for r in _missing_ranks(total_number_of_edges, taken, k))
 
     # How many edges we want in the end?
     goal = G.number_of_edges() + m
@@ -2750,11 +3869,9 @@ def add_random_missing_edges(G, m, seed=None):
     if G.number_of_edges() < goal:
         # Very unlikely case: sampling process failed and the solution
         # is to use the sampling process tailored for denser graph, so
-        # that a correct result is guaranteed. This requires
-        # generating all available edges
-        for u, v in random.sample(available_edges(),
-                                  goal - G.number_of_edges()):
-            G.add_edge(u, v)
+        # that a correct result is guaranteed. The missing edges are
+        # sampled by rank, without listing them all.
+        G.add_edges_from(missing_edges(goal - G.number_of_edges()))
 
 
 def supported_graph_formats():
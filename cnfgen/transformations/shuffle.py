@@ -1,9 +1,78 @@
 #!/usr/bin/env python
 
 import random
+from array import array
 from copy import copy
+from tempfile import TemporaryFile
 
 from cnfgen.formula.cnf import CNF
+from cnfgen.utils.parsedimacs import parse_dimacs, dimacs_text
+from cnfgen.utils.parsedimacs import write_dimacs_header, write_dimacs_fragment
+from cnfgen.utils.binaryformat import is_binary_file, from_binary_file
+
+# Average number of clauses in each bucket of `shuffle_dimacs`
+BUCKET_SIZE = 1 << 20
+
+# Number of clauses collected for a bucket before writing them
+BUCKET_WRITE_SIZE = 256
+
+# Maximum number of buckets open at each level of `shuffle_dimacs`
+MAX_OPEN_BUCKETS = 128
+
+
+def _shuffled_header(header):
+    """Header of the reshuffled formula"""
+    header = copy(header)
+    if 'description' in header:
+        header['description'] += " (reshuffled)"
+
+    i = 1
+    while 'transformation {}'.format(i) in header:
+        i += 1
+    header['transformation {}'.format(i)] = "Formula reshuffling"
+    return header
+
+
+def _literal_substitution(N, polarity_flips, variables_permutation):
+    """Map from the old literals to the new ones
+
+    The map is an array indexed by the old literals, so that
+    a negative literal is mapped by the entries at the end."""
+    perr = 'polarity_flips is either \'fixed\', \'shuffle\' or in {-1,+1]}^n'
+    verr = 'variables_permutation is either \'fixed\', \'shuffle\' or a permutation of [1,...,N]'
+
+    # polarity flips
+    if polarity_flips == 'fixed':
+        polarity_flips = array('b', [1]) * N
+    elif polarity_flips == 'shuffle':
+        polarity_flips = array('b', [random.choice([-1, 1]) for x in range(N)])
+    else:
+        if len(polarity_flips) != N:
+            raise ValueError(perr)
+        for i in range(N):
+            if abs(polarity_flips[i]) != 1:
+                raise ValueError(perr)
+
+    # variables permutation
+    if variables_permutation == 'fixed':
+        variables_permutation = range(1, N+1)
+    elif variables_permutation == 'shuffle':
+        variables_permutation = array('q', range(1, N+1))
+        random.shuffle(variables_permutation)
+    else:
+        if len(variables_permutation) != N:
+            raise ValueError(verr)
+        tmp = sorted(variables_permutation)
+        for i in range(N):
+            if i+1 != tmp[i]:
+                raise ValueError(verr)
+
+    # precompute literal mapping
+    substitution = array('q', [0]) * (2 * N + 1)
+    for i in range(1, N+1):
+        substitution[i] = polarity_flips[i-1] * variables_permutation[i-1]
+        substitution[-i] = -substitution[i]
+    return substitution
 
 
 def Shuffle(F,
@@ -48,51 +117,20 @@ def Shuffle(F,
         Specifies the permutation of the clauses.
     """
 
-    # empty cnf
     out = CNF()
-    out.header = copy(F.header)
-    if 'description' in out.header:
-        out.header['description'] += " (reshuffled)"
-
-    i = 1
-    while 'transformation {}'.format(i) in out.header:
-        i += 1
-    out.header['transformation {}'.format(i)] = "Formula reshuffling"
+    out.header = _shuffled_header(F.header)
 
+    # The clauses are permuted, hence they are needed all together
+    # (e.g. the clauses of a lazy formula are computed here once)
+    clauses = list(F)
     N = F.number_of_variables()
-    M = F.number_of_clauses()
+    M = len(clauses)
     out.update_variable_number(N)
 
-    # Manage the parameters
-    perr = 'polarity_flips is either \'fixed\', \'shuffle\' or in {-1,+1]}^n'
-    verr = 'variables_permutation is either \'fixed\', \'shuffle\' or a permutation of [1,...,N]'
     cerr = 'clauses_permutation is either \'fixed\', \'shuffle\' or a permutation of [0,...,M-1]'
 
-    # polarity flips
-    if polarity_flips == 'fixed':
-        polarity_flips = [1] * N
-    elif polarity_flips == 'shuffle':
-        polarity_flips = [random.choice([-1, 1]) for x in range(N)]
-    else:
-        if len(polarity_flips) != N:
-            raise ValueError(perr)
-        for i in range(N):
-            if abs(polarity_flips[i]) != 1:
-                raise ValueError(perr)
-
-    # variables permutation
-    if variables_permutation == 'fixed':
-        variables_permutation = range(1, N+1)
-    elif variables_permutation == 'shuffle':
-        variables_permutation = list(range(1, N+1))
-        random.shuffle(variables_permutation)
-    else:
-        if len(variables_permutation) != N:
-            raise ValueError(verr)
-        tmp = sorted(variables_permutation)
-        for i in range(N):
-            if i+1 != tmp[i]:
-                raise ValueError(verr)
+    substitution = _literal_substitution(N, polarity_flips,
+                                         variables_permutation)
 
     #
     # permutation of clauses
@@ -112,16 +150,145 @@ def Shuffle(F,
                 raise ValueError(cerr)
         clauses_mapping = sorted(enumerate(clauses_permutation), key=lambda x: x[1])
 
-
-    # precompute literal mapping
-    substitution = [None] * (2 * N + 1)
-    for i in range(1, N+1):
-        substitution[i] = polarity_flips[i-1] * variables_permutation[i-1]
-        substitution[-i] = -substitution[i]
-
     # load clauses
     for (old, new) in clauses_mapping:
         assert new == out.number_of_clauses()
-        out.add_clause(substitution[lit] for lit in F[old])
+        out.add_clause(substitution[lit] for lit in clauses[old])
 
     return out
+
+
+def shuffle_dimacs(inputfile, output,
+                   polarity_flips='shuffle',
+                   variables_permutation='shuffle',
+                   clauses_permutation='shuffle',
+                   bucket_size=BUCKET_SIZE,
+                   export_header=True):
+    """Reshuffle a DIMACS file without loading it in memory
+
+    Same as :py:func:`Shuffle`, but the formula is read from a DIMACS
+    file and the reshuffled formula is written on another one. The
+    input is read once, the literals are renamed on the fly and each
+    clause is written to a temporary bucket file picked at random.
+    Then the clauses of each bucket are loaded, permuted and written
+    on the output. The result is a uniformly random permutation of the
+    clauses, and only a bucket at a time is kept in memory. At most
+    `MAX_OPEN_BUCKETS` buckets are used: when more would be needed,
+    each bucket is scattered again in smaller ones.
+
+    The polarity flips and the variables permutation are the same as
+    the ones of :py:func:`Shuffle` with the same random seed, while
+    the clause permutation depends on the seed and on `bucket_size`.
+
+    Parameters
+    ----------
+    inputfile: file object
+        the DIMACS file to be shuffled, or a file in CNFgen
+        binary format
+    output: file object
+        where to write the reshuffled formula
+    polarity_flips: string or iterable(int)
+        Specifies the flips of polarity (see :py:func:`Shuffle`)
+    variables_permutation: string or iterable(int)
+        Specifies the permutation of the variables
+        (see :py:func:`Shuffle`)
+    clauses_permutation: string
+        either 'fixed' or 'shuffle'
+    bucket_size: int
+        the average number of clauses in a bucket
+    export_header : bool
+        determines whether the formula header should be inserted as
+        a comment in the DIMACS output.
+
+    Raises
+    ------
+    ValueError
+        in case the input is not in DIMACS format
+    """
+    if clauses_permutation not in ('fixed', 'shuffle'):
+        raise ValueError(
+            "clauses_permutation is either 'fixed' or 'shuffle'")
+    name = getattr(inputfile, 'name', '<unknown>')
+    F = CNF(description='Formula from DIMACS file {}'.format(name))
+
+    if is_binary_file(inputfile):
+        # the clauses are memory mapped, not loaded
+        dimacs = from_binary_file(CNF, inputfile)
+        N = dimacs.number_of_variables()
+        M = dimacs.number_of_clauses()
+    else:
+        dimacs = parse_dimacs(inputfile)
+        N = next(dimacs)
+        M = next(dimacs)
+    F.update_variable_number(N)
+    F.header = _shuffled_header(F.header)
+    substitution = _literal_substitution(N, polarity_flips,
+                                         variables_permutation)
+    renamed = ([substitution[lit] for lit in clause] for clause in dimacs)
+
+    if clauses_permutation == 'fixed':
+        write_dimacs_header(F, output, m=M, export_header=export_header)
+        write_dimacs_fragment(renamed, output)
+        return
+
+    scattered = _scatter(renamed, M, bucket_size, dimacs_text)
+    write_dimacs_header(F, output, m=M, export_header=export_header)
+    _shuffle_buckets(scattered, output, bucket_size)
+
+
+def _scatter(items, count, bucket_size, render):
+    """Scatter `count` items at random among temporary files
+
+    There are about `count/bucket_size` files, but no more than
+    `MAX_OPEN_BUCKETS`. The items are written in blocks, and each
+    block is converted to text by `render`.
+
+    Returns
+    -------
+    list(file object, int), bool
+        the files, each with the number of its items, and whether
+        they are small enough to be shuffled in memory
+    """
+    B = max(1, -(-count // bucket_size))
+    final = B <= MAX_OPEN_BUCKETS
+    B = min(B, MAX_OPEN_BUCKETS)
+    buckets = [TemporaryFile(mode='w+') for _ in range(B)]
+    try:
+        pending = [[] for _ in range(B)]
+        counts = [0] * B
+        for item in items:
+            b = random.randrange(B)
+            pending[b].append(item)
+            counts[b] += 1
+            if len(pending[b]) >= BUCKET_WRITE_SIZE:
+                buckets[b].write(render(pending[b]))
+                pending[b] = []
+        for b in range(B):
+            buckets[b].write(render(pending[b]))
+    except BaseException:
+        for bucket in buckets:
+            bucket.close()
+        raise
+    return list(zip(buckets, counts)), final
+
+
+def _shuffle_buckets(scattered, output, bucket_size):
+    """Permute the lines of each bucket and concatenate them
+
+    Buckets too large to be shuffled in memory are scattered again
+    (see :py:func:`_scatter`)."""
+    buckets, final = scattered
+    try:
+        for bucket, count in buckets:
+            bucket.seek(0)
+            if final:
+                lines = bucket.readlines()
+                random.shuffle(lines)
+                output.writelines(lines)
+            else:
+                _shuffle_buckets(_scatter(bucket, count, bucket_size, ''.join),
+                                 output, bucket_size)
+            bucket.close()
+    finally:
+        for bucket, _ in buckets:
+            bucket.close()
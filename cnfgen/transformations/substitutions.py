@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding:utf-8 -*-
 
-from itertools import combinations, product, permutations
+from itertools import combinations, product, permutations, chain
 from copy import copy
 
 from cnfgen.localtypes import positive_int, any_int, one_of_values
@@ -30,6 +30,82 @@ def add_description(F, text):
     F.header['transformation {}'.format(i)] = text
 
 
+class SubstitutedClauses:
+    """The clauses of a formula after a substitution
+
+    The clauses are computed every time the object is iterated, from
+    the clauses of the original formula, so that they are never
+    stored. The number of clauses and of literals is computed without
+    building the clauses. Objects of this class are clause streams
+    for :py:meth:`cnfgen.formula.basecnf.BaseCNF.add_clause_stream`.
+
+    Parameters
+    ----------
+    formula : cnfgen.CNF
+        the original formula
+    subst : function
+        a function that maps literals to sequences of clauses
+
+    Examples
+    --------
+    >>> F = CNF([[1, -2], [2]])
+    >>> S = SubstitutedClauses(F, relocated_gadget([[1, 2]], [[-1], [-2]], 2))
+    >>> len(S), S.number_of_literals()
+    (3, 8)
+    >>> list(S)
+    [(1, 2, -3), (1, 2, -4), (3, 4)]
+    """
+    def __init__(self, formula, subst):
+        self.formula = formula
+        self.subst = subst
+        # Substitutions of the literals, e.g. for n variables
+        #
+        # [None, F1, F2,..., Fn, -Fn, -F(n-1), ..., -F2, -F1]
+        #
+        # The literals are transformed the first time they occur.
+        self._substitutions = [None] * (2 * formula.number_of_variables() + 1)
+        self._size = None
+
+    def _domains(self, clause):
+        substitutions = self._substitutions
+        domains = []
+        for lit in clause:
+            if substitutions[lit] is None:
+                substitutions[lit] = self.subst(lit)
+            domains.append(substitutions[lit])
+        return domains
+
+    def __iter__(self):
+        for clause in self.formula:
+            # a substituted clause is the OR of the CNF for the literals
+            domains = self._domains(clause)
+            # apply distribution
+            yield from map(tuple, map(chain.from_iterable, product(*domains)))
+
+    def _compute_size(self):
+        if self._size is None:
+            clauses = 0
+            literals = 0
+            for clause in self.formula:
+                count = 1
+                width = 0
+                for domain in self._domains(clause):
+                    width = width * len(domain) + \
+                        count * sum(len(c) for c in domain)
+                    count *= len(domain)
+                clauses += count
+                literals += width
+            self._size = (clauses, literals)
+        return self._size
+
+    def __len__(self):
+        return self._compute_size()[0]
+
+    def number_of_literals(self):
+        """Total number of literals in the clauses"""
+        return self._compute_size()[1]
+
+
 def apply_substitution(formula, subst):
     """Apply the substitution ``f`` to a formula
 
@@ -43,81 +119,127 @@ def apply_substitution(formula, subst):
     subst : function
         a function that maps literals to sequences of clauses
     """
-    # Load original variable names
-    #
-    # For n variables we get
-    #
-    # substitution  = [None, F1, F2,..., Fn, -Fn, -F(n-1), ..., -F2, -F1]
-    #
-    N = formula.number_of_variables()
-    substitutions = [None] * (2 * N + 1)
-
-    # Transform all possible literals
-    for i in range(1, N+1):
-        substitutions[i] = subst(i)
-        substitutions[-i] = subst(-i)
-
-    # build and add new clauses
-    for clause in formula:
-
-        # a substituted clause is the OR of the CNF for the literals
-        domains = [substitutions[lit] for lit in clause]
-        domains = tuple(domains)
-        # apply distribution
-        block = (
-            tuple([lit for clause in clause_tuple for lit in clause])
-            for clause_tuple in product(*domains)
-        )
-        yield from block
+    return iter(SubstitutedClauses(formula, subst))
+
+
+def relocated_gadget(positive, negative, stride):
+    """A substitution that relocates a fixed gadget
+
+    Most substitutions replace the variable :math:`x_i` with the same
+    gadget on a block of new variables, and the block of :math:`x_i`
+    is the block of :math:`x_1` shifted by :math:`(i-1)` times some
+    `stride`. Hence the gadget is computed once for :math:`x_1` and
+    :math:`\\neg x_1`, and the one for a literal on :math:`x_i` is
+    obtained by adding the shift to all its variables.
+
+    Parameters
+    ----------
+    positive : list of clauses
+        the substitution of the literal :math:`x_1`
+    negative : list of clauses
+        the substitution of the literal :math:`\\neg x_1`
+    stride : int
+        distance between the blocks of consecutive variables
+
+    Returns
+    -------
+    a function that maps literals to sequences of clauses, as required
+    by :py:func:`apply_substitution`
+
+    Examples
+    --------
+    >>> subst = relocated_gadget([[1, 2]], [[-1], [-2]], 2)
+    >>> subst(3)
+    [(5, 6)]
+    >>> subst(-2)
+    [(-3,), (-4,)]
+    """
+    positive = [tuple(clause) for clause in positive]
+    negative = [tuple(clause) for clause in negative]
+
+    def relocate(lit):
+        if lit > 0:
+            offset = (lit - 1) * stride
+            template = positive
+        else:
+            offset = (-lit - 1) * stride
+            template = negative
+        if offset == 0:
+            return template
+        return [tuple([v + offset if v > 0 else v - offset for v in clause])
+                for clause in template]
+    return relocate
+
+
+def _gadget(k, build):
+    """Clauses added by ``build(F, [1, ..., k])`` on an empty formula"""
+    temp = CNF()
+    build(temp, list(range(1, k+1)))
+    return list(temp)
 
 
 #
 # Substitutions
 #
-def FlipPolarity(F):
+def FlipPolarity(F, formula_class=CNF):
     """Flip the polarity of variables
 
     F : cnfgen.CNF
         formula
     """
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
+    newF.update_variable_number(F.number_of_variables())
     add_description(newF,"All polarities have been flipped")
 
-    def subst(lit):
-        return [[-lit]]
-    newF.add_clauses_from(apply_substitution(F, subst))
+    subst = relocated_gadget([[-1]], [[1]], 1)
+    newF.add_clause_stream(SubstitutedClauses(F, subst))
     return newF
 
 
-def XorSubstitution(F, k):
+def XorSubstitution(F, k, maxwidth=None, formula_class=CNF):
     """Apply Xor substitution of rank ``k``
 
     F : cnfgen.CNF
         formula
     k : int
         arity of the xor substitution
+    maxwidth : int, optional
+        if set, each variable of ``F`` is kept as an auxiliary
+        variable, constrained to be equal to the xor of its ``k``
+        substitutes. The parities are split in chains of width at
+        most ``maxwidth``. The encoding has polynomial size in ``k``.
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     add_description(newF, "Substitution with XOR of arity {}".format(k))
 
-    def xorify(lit):
-        polarity = 1 if lit > 0 else 0
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        temp = CNF()
-        temp.add_parity(nvars, polarity)
-        return list(temp)
-
-    newF.add_clauses_from(
-        apply_substitution(F, xorify))
+    if maxwidth is not None:
+        n = F.number_of_variables()
+        z = newF.new_block(n, label='xorsub_{}')
+        for i in range(n):
+            nvars = [i*k + j for j in range(1, k+1)]
+            newF.add_parity([z(i+1)] + nvars, 0,
+                            check=False, maxwidth=maxwidth)
+        # the variables of F are replaced by the ones in z
+        zvar = n * k + 1
+        newF.add_clause_stream(
+            SubstitutedClauses(F, relocated_gadget([[zvar]], [[-zvar]], 1)))
+        return newF
+
+    xorify = relocated_gadget(
+        _gadget(k, lambda temp, nvars: temp.add_parity(nvars, 1)),
+        _gadget(k, lambda temp, nvars: temp.add_parity(nvars, 0)),
+        k)
+
+    newF.add_clause_stream(SubstitutedClauses(F, xorify))
 
     return newF
 
-def ExactlyOneSubstitution(F, k):
+def ExactlyOneSubstitution(F, k, formula_class=CNF):
     """Apply exactly-oine substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -126,31 +248,27 @@ def ExactlyOneSubstitution(F, k):
         arity of the xor substitution
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     add_description(newF, "Substitution with exaclty-one, of arity {}".format(k))
 
-    def oneify(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        temp = CNF()
-        if lit > 0:
-            temp.add_linear(nvars, '==', 1)
-        else:
-            for i in range(len(nvars)):
-                nvars[i] *= -1
-                temp.add_clause(nvars)
-                nvars[i] *= -1
-        return list(temp)
+    # not exactly-one: each true variable forces another one
+    negative = []
+    for i in range(1, k+1):
+        negative.append([v if v != i else -v for v in range(1, k+1)])
+    oneify = relocated_gadget(
+        _gadget(k, lambda temp, nvars: temp.add_linear(nvars, '==', 1)),
+        negative,
+        k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, oneify))
+    newF.add_clause_stream(SubstitutedClauses(F, oneify))
 
     return newF
 
 
-def LinearSubstitution(F, k, op, C):
+def LinearSubstitution(F, k, op, C, formula_class=CNF):
     """Linear substitution of rank ``k``
 
     Substitute each variable x(i) with a linear form
@@ -173,29 +291,24 @@ def LinearSubstitution(F, k, op, C):
 
     i = opchoices.index(op)
     negop = opchoices[-i-1]
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     desc = "Substitution x --> x1 + x2 + ... x{} {} {}".format(k, op, C)
     add_description(newF, desc)
 
-    def linear(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        temp = CNF()
-        if lit > 0:
-            temp.add_linear(nvars, op, C)
-        else:
-            temp.add_linear(nvars, negop, C)
-        return list(temp)
+    linear = relocated_gadget(
+        _gadget(k, lambda temp, nvars: temp.add_linear(nvars, op, C)),
+        _gadget(k, lambda temp, nvars: temp.add_linear(nvars, negop, C)),
+        k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, linear))
+    newF.add_clause_stream(SubstitutedClauses(F, linear))
 
     return newF
 
 
-def MajoritySubstitution(F, k):
+def MajoritySubstitution(F, k, formula_class=CNF):
     """Apply Majority substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -204,28 +317,23 @@ def MajoritySubstitution(F, k):
         arity of the majority substitution
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     add_description(newF, "Substitution with majority of arity {}".format(k))
 
-    def majorify(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        temp = CNF()
-        if lit > 0:
-            temp.add_loose_majority(nvars)
-        else:
-            temp.add_strict_minority(nvars)
-        return list(temp)
+    majorify = relocated_gadget(
+        _gadget(k, lambda temp, nvars: temp.add_loose_majority(nvars)),
+        _gadget(k, lambda temp, nvars: temp.add_strict_minority(nvars)),
+        k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, majorify))
+    newF.add_clause_stream(SubstitutedClauses(F, majorify))
 
     return newF
 
 
-def AllEqualSubstitution(F, k, invert=False):
+def AllEqualSubstitution(F, k, invert=False, formula_class=CNF):
     """Apply all-equals substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -236,7 +344,7 @@ def AllEqualSubstitution(F, k, invert=False):
         apply the not-all-equal substitution
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
@@ -245,27 +353,22 @@ def AllEqualSubstitution(F, k, invert=False):
     else:
         add_description(newF, "Substitution with not-all-equals of arity {}".format(k))
 
-    def aesubst(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        clauses = []
-        if invert:
-            lit *= -1
-        if lit > 0:
-            # one true implies all true
-            clauses = []
-            clauses.append([nvars[0],-nvars[-1]])
-            clauses.extend([[-nvars[i-1], nvars[i]] for i in range(1,len(nvars))])
-        else:
-            # at least one true
-            clauses = [nvars, [-v for v in nvars]]
-        return clauses
+    nvars = list(range(1, k+1))
+    # one true implies all true
+    allequal = [[nvars[0], -nvars[-1]]]
+    allequal.extend([[-nvars[i-1], nvars[i]] for i in range(1, k)])
+    # at least one true and at least one false
+    notallequal = [nvars, [-v for v in nvars]]
+    if invert:
+        aesubst = relocated_gadget(notallequal, allequal, k)
+    else:
+        aesubst = relocated_gadget(allequal, notallequal, k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, aesubst))
+    newF.add_clause_stream(SubstitutedClauses(F, aesubst))
 
     return newF
 
-def NotAllEqualSubstitution(F, k):
+def NotAllEqualSubstitution(F, k, formula_class=CNF):
     """Apply not-all-equals substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -274,10 +377,11 @@ def NotAllEqualSubstitution(F, k):
         arity of the not-all-equals substitution
     """
     positive_int(k, 'k')
-    return AllEqualSubstitution(F, k, invert=True)
+    return AllEqualSubstitution(F, k, invert=True,
+                                formula_class=formula_class)
 
 
-def OrSubstitution(F, k):
+def OrSubstitution(F, k, formula_class=CNF):
     """Apply Or substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -286,25 +390,20 @@ def OrSubstitution(F, k):
         arity of the or substitution
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     add_description(newF, "Substitution with OR of arity {}".format(k))
 
-    def orify(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        if lit > 0:
-            return [nvars]
-        else:
-            return [[-nvar] for nvar in nvars]
+    nvars = list(range(1, k+1))
+    orify = relocated_gadget([nvars], [[-nvar] for nvar in nvars], k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, orify))
+    newF.add_clause_stream(SubstitutedClauses(F, orify))
 
     return newF
 
-def AndSubstitution(F, k):
+def AndSubstitution(F, k, formula_class=CNF):
     """Apply AND substitution of rank ``k``
 
     F : cnfgen.CNF
@@ -313,26 +412,22 @@ def AndSubstitution(F, k):
         arity of the or substitution
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='{{'+escape_curly(name)+'}}^{}')
     add_description(newF, "Substitution with AND of arity {}".format(k))
 
-    def andify(lit):
-        nvars = [(abs(lit)-1)*k + i for i in range(1, k+1)]
-        if lit > 0:
-            return [[nvar] for nvar in nvars]
-        else:
-            return [-nvar for nvar in nvars]
+    nvars = list(range(1, k+1))
+    andify = relocated_gadget([[nvar] for nvar in nvars],
+                              [[-nvar for nvar in nvars]], k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, andify))
+    newF.add_clause_stream(SubstitutedClauses(F, andify))
 
     return newF
 
 
-def IfThenElseSubstitution(F):
+def IfThenElseSubstitution(F, formula_class=CNF):
     """Apply if-then-else substitution
 
     Each original variable is substituted with a function on three
@@ -343,7 +438,7 @@ def IfThenElseSubstitution(F):
     F : cnfgen.CNF
         formula
     """
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     N = F.number_of_variables()
     for name in F.all_variable_labels():
@@ -354,17 +449,14 @@ def IfThenElseSubstitution(F):
         newF.new_variable('{{'+escape_curly(name)+'}}^{e}')
     add_description(newF, "If-Then-Else substitution formula")
 
-    def ite(lit):
-        var = abs(lit)
-        sign = lit//var
-        return [[-var, sign*(N+var)], [var, sign*(2*N+var)]]
+    ite = relocated_gadget([[-1, N+1], [1, 2*N+1]],
+                           [[-1, -(N+1)], [1, -(2*N+1)]], 1)
 
-    newF.add_clauses_from(
-        apply_substitution(F, ite))
+    newF.add_clause_stream(SubstitutedClauses(F, ite))
     return newF
 
 
-def FormulaLifting(F, k):
+def FormulaLifting(F, k, formula_class=CNF):
     """Formula lifting: Y variable select X values
 
     F : cnfgen.CNF
@@ -373,7 +465,7 @@ def FormulaLifting(F, k):
         arity of the lifting
     """
     positive_int(k, 'k')
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
     for name in F.all_variable_labels():
         newF.new_block(k, label='X_{{'+escape_curly(name)+'}}^{}')
@@ -385,41 +477,37 @@ def FormulaLifting(F, k):
     for y in range(k+1, N+1, 2*k):
         newF.add_linear([y+i for i in range(k)], '==', 1)
 
-    def lift(lit):
-        sign = lit//abs(lit)
-        oldvar = abs(lit)
-        Xoff = (oldvar-1)*2*k
-        Yoff = (oldvar-1)*2*k + k
-        return [[-(Yoff + i), sign*(Xoff + i)] for i in range(1, k+1)]
+    lift = relocated_gadget([[-(k + i), i] for i in range(1, k+1)],
+                            [[-(k + i), -i] for i in range(1, k+1)],
+                            2*k)
 
-    newF.add_clauses_from(
-        apply_substitution(F, lift))
+    newF.add_clause_stream(SubstitutedClauses(F, lift))
 
     return newF
 
 
 
-def AtLeastKSubstitution(F, N, k):
+def AtLeastKSubstitution(F, N, k, formula_class=CNF):
     """Substitution: at least ``k`` true variables out of ``N`` copies"""
-    return LinearSubstitution(F, N, '>=', k)
+    return LinearSubstitution(F, N, '>=', k, formula_class=formula_class)
 
 
-def AtMostKSubstitution(F, N, k):
+def AtMostKSubstitution(F, N, k, formula_class=CNF):
     """Substitution: at most ``k`` true variables out of ``N`` copies"""
-    return LinearSubstitution(F, N, '<=', k)
+    return LinearSubstitution(F, N, '<=', k, formula_class=formula_class)
 
 
-def ExactlyKSubstitution(F, N, k):
+def ExactlyKSubstitution(F, N, k, formula_class=CNF):
     """Substitution: exactly ``k`` true variables out of ``N`` copies"""
-    return LinearSubstitution(F, N, '==', k)
+    return LinearSubstitution(F, N, '==', k, formula_class=formula_class)
 
 
-def AnythingButKSubstitution(F, N, k):
+def AnythingButKSubstitution(F, N, k, formula_class=CNF):
     """Substitution: anything bit ``C`` true variables out of ``N`` copies"""
-    return LinearSubstitution(F, N, '!=', k)
+    return LinearSubstitution(F, N, '!=', k, formula_class=formula_class)
 
 
-def VariableCompression(F, B, function):
+def VariableCompression(F, B, function, formula_class=CNF):
     """Vabiable compression transformation
 
     The original variable are substituted with the XOR (or MAJ) of
@@ -444,7 +532,7 @@ def VariableCompression(F, B, function):
         raise ValueError(
             "Left side of graph B must have size equal to the number of variables in F")
 
-    newF = CNF()
+    newF = formula_class()
     newF.header = copy(F.header)
 
     L = B.left_order()
@@ -470,9 +558,9 @@ def VariableCompression(F, B, function):
         return list(temp)
 
     if function == 'xor':
-        newF.add_clauses_from(apply_substitution(F, applyxor))
+        newF.add_clause_stream(SubstitutedClauses(F, applyxor))
     elif function == 'maj':
-        newF.add_clauses_from(apply_substitution(F, applymaj))
+        newF.add_clause_stream(SubstitutedClauses(F, applymaj))
     else:
         raise RuntimeError("Function {} not supported for compression".format(func))
 
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Convert CNF formulas to and from NumPy arrays
+
+A formula is represented by two arrays: the literals of all clauses
+one after the other, and the offsets where each clause starts, with
+a final offset equal to the total number of literals. This is the
+same layout as :py:class:`cnfgen.formula.basecnf.CompactClauses`, so
+the conversion does not go through the clauses one by one.
+
+NumPy is an optional dependency, and it is needed only by the
+functions in this module. The clause-variable incidence matrix also
+needs SciPy.
+"""
+
+from itertools import chain
+
+from cnfgen.formula.basecnf import CompactClauses, MappedClauses
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy not installed')
+    return numpy
+
+
+def to_arrays(formula, incidence=False):
+    """Literals and clause offsets of a formula as NumPy arrays
+
+    Parameters
+    ----------
+    formula:
+        a cnf formula
+    incidence: bool
+        also produce the clause-variable incidence matrix
+
+    Returns
+    -------
+    (literals, offsets) or (literals, offsets, matrix)
+        ``literals`` is an array of 32 bits integers, and the literals
+        of the i-th clause are ``literals[offsets[i]:offsets[i+1]]``,
+        where ``offsets`` is an array of 64 bits integers. The
+        incidence matrix is a ``scipy.sparse.csr_matrix`` with
+        a row for each clause and a column for each variable, with
+        entry 1 (resp. -1) when the variable occurs positively
+        (resp. negatively) in the clause. A literal repeated in
+        a clause counts once, and there is no entry for a variable
+        that occurs with both signs.
+
+    Raises
+    ------
+    ImportError
+        when NumPy (or SciPy, for the incidence matrix) is not installed
+    """
+    np = _import_numpy()
+    if incidence:
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError('scipy not installed')
+
+    store = getattr(formula, '_clauses', None)
+    if isinstance(store, CompactClauses):
+        literals = np.frombuffer(store.literals, dtype=np.int32).copy()
+        offsets = np.frombuffer(store.offsets, dtype=np.int64).copy()
+    else:
+        clauses = list(formula)
+        literals = np.fromiter(chain.from_iterable(clauses),
+                               dtype=np.int32,
+                               count=formula.number_of_literals())
+        offsets = np.zeros(len(clauses) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, clauses),
+                              dtype=np.int64,
+                              count=len(clauses)),
+                  out=offsets[1:])
+    if not incidence:
+        return literals, offsets
+
+    matrix = csr_matrix((np.sign(literals),
+                         np.abs(literals) - 1,
+                         offsets),
+                        shape=(len(offsets) - 1,
+                               formula.number_of_variables()))
+    # repeated and complementary literals are summed together
+    matrix.sum_duplicates()
+    matrix.data = np.sign(matrix.data).astype(np.int8)
+    matrix.eliminate_zeros()
+    return literals, offsets, matrix
+
+
+def from_arrays(cnfclass, literals, offsets, nvars=None, header=None):
+    """Build a formula from the arrays of literals and clause offsets
+
+    This is the inverse of :py:func:`to_arrays`. The arrays are
+    validated as a whole, and the clauses of the formula are stored
+    in a :py:class:`cnfgen.formula.basecnf.MappedClauses` object on
+    top of a copy of the arrays, without adding the clauses one by one.
+
+    Parameters
+    ----------
+    cnfclass: subclass of cnfgen.basecnf.BaseCNF
+        the type of CNF object to produce
+    literals: array of integers
+        the literals of all clauses, one after the other
+    offsets: array of integers
+        the positions where the clauses start, followed by the
+        number of literals
+    nvars: int, optional
+        the number of variables (default: the largest variable
+        occurring in the clauses)
+    header: dict, optional
+        the header of the formula
+
+    Raises
+    ------
+    ImportError
+        when NumPy is not installed
+    ValueError
+        when the arrays do not represent a sequence of clauses
+    """
+    np = _import_numpy()
+    literals = np.asarray(literals)
+    offsets = np.asarray(offsets)
+    if literals.ndim != 1 or offsets.ndim != 1:
+        raise ValueError("literals and offsets must be one dimensional arrays")
+    if literals.size > 0 and literals.dtype.kind not in 'iu':
+        raise ValueError("literals must be integers")
+    if offsets.size > 0 and offsets.dtype.kind not in 'iu':
+        raise ValueError("offsets must be integers")
+    if offsets.size == 0 or offsets[0] != 0 or offsets[-1] != literals.size:
+        raise ValueError(
+            "offsets must start at 0 and end at the number of literals")
+    if np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must be non decreasing")
+
+    maxvar = int(np.abs(literals.astype(np.int64)).max()) if literals.size > 0 else 0
+    if literals.size > 0 and (np.any(literals == 0) or maxvar >= 2**31):
+        raise ValueError("literals must be non zero 32 bits integers")
+    if nvars is None:
+        nvars = maxvar
+    elif nvars < maxvar:
+        raise ValueError(
+            "literal {} does not fit among {} variables".format(maxvar, nvars))
+
+    literals = np.array(literals, dtype=np.int32)
+    offsets = np.array(offsets, dtype=np.int64)
+    F = cnfclass()
+    if header is not None:
+        F.header = header
+    F.update_variable_number(nvars)
+    F._clauses = MappedClauses(memoryview(literals).cast('B').cast('i'),
+                               memoryview(offsets).cast('B').cast('q'),
+                               (literals, offsets))
+    return F
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Read and write CNF formulas in a binary format
+
+Parsing DIMACS text is slow when the same large formulas are loaded
+over and over. The binary format stores the clauses as flat arrays
+of integers, which are memory mapped when the file is loaded: no
+data is parsed or copied, and processes that load the same file
+share the same pages of memory.
+
+The file is made of
+
+- the magic string ``CNFGENB1``;
+- the length of the metadata, as a 64 bits little endian integer;
+- the metadata, as UTF-8 encoded JSON, padded to a multiple of 8 bytes;
+- the offsets of the clauses, as 64 bits little endian integers;
+- the literals of all clauses, as 32 bits little endian integers,
+  padded to a multiple of 8 bytes;
+- the labels of the variables in the variable groups, one per line.
+
+The metadata contains the header of the formula, the number of
+variables, clauses and literals, and for each variable group its
+first variable, its size and the position of its labels.
+"""
+
+import io
+import sys
+import json
+import mmap
+import shutil
+import tempfile
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+from cnfgen.formula.basecnf import CompactClauses, MappedClauses
+from cnfgen.formula.variables import SingletonVariableGroup
+
+BINARY_MAGIC = b'CNFGENB1'
+
+# Number of clauses converted to arrays before each write
+BINARY_BLOCK_SIZE = 1 << 16
+
+
+def is_binary_file(fileorname):
+    """Test whether a file is in CNFgen binary format
+
+    The file is given either as a name or as a file object, in text
+    or binary mode. The beginning of a file object is peeked at, or
+    read and then reset with a seek, so that it can still be read
+    from the start. Objects that allow neither are not binary files."""
+    if isinstance(fileorname, str):
+        try:
+            with open(fileorname, 'rb') as f:
+                return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+        except (OSError, TypeError):
+            return False
+    stream = getattr(fileorname, 'buffer', fileorname)
+    try:
+        if hasattr(stream, 'peek'):
+            head = stream.peek(len(BINARY_MAGIC))
+        elif stream.seekable():
+            pos = stream.tell()
+            head = stream.read(len(BINARY_MAGIC))
+            stream.seek(pos)
+        else:
+            return False
+    except (OSError, ValueError, AttributeError):
+        return False
+    return head[:len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def _padding(size):
+    return (-size) % 8
+
+
+def _write_array(output, data):
+    """Write an array in little endian byte order"""
+    if sys.byteorder != 'little':
+        data = array(data.typecode, data)
+        data.byteswap()
+    output.write(data.tobytes())
+
+
+def _label_groups(formula):
+    """Metadata and labels of the variable groups of a formula"""
+    groups = []
+    labels = []
+    pos = 0
+    for vg in getattr(formula, '_groups', []):
+        if len(vg) == 0:
+            continue
+        if isinstance(vg, SingletonVariableGroup):
+            names = [vg.name]
+        else:
+            names = list(vg.label())
+        text = "\n".join(names).encode('utf-8')
+        groups.append([vg[0], len(vg), pos, pos + len(text)])
+        labels.append(text)
+        pos += len(text)
+    return groups, b''.join(labels)
+
+
+def to_binary_file(formula, fileorname):
+    """Save a formula in binary format
+
+    Parameters
+    ----------
+    formula:
+        a cnf formula
+    fileorname: file object or string
+        destination file given either as object or as filename.
+        A text file object is written through its binary buffer.
+    """
+    if isinstance(fileorname, str):
+        with open(fileorname, 'wb') as filehandle:
+            to_binary_file(formula, filehandle)
+            return
+    output = fileorname
+    if hasattr(output, 'buffer'):
+        output.flush()
+        output = output.buffer
+
+    store = getattr(formula, '_clauses', None)
+    if isinstance(store, CompactClauses):
+        offsets = array('q', store.offsets)
+        literals = array('i', store.literals)
+        size = len(literals)
+    else:
+        # a single pass on the clauses, which may be generated on the
+        # fly: the literals are kept in a temporary file until the
+        # header, that contains their number, has been written.
+        offsets = array('q', [0])
+        literals = tempfile.TemporaryFile()
+        size = 0
+        clauses = iter(formula)
+        while True:
+            block = list(islice(clauses, BINARY_BLOCK_SIZE))
+            if not block:
+                break
+            buffer = array('i')
+            for c in block:
+                buffer.extend(c)
+                offsets.append(len(buffer) + size)
+            size += len(buffer)
+            _write_array(literals, buffer)
+
+    groups, labels = _label_groups(formula)
+    meta = OrderedDict()
+    meta['header'] = formula.header
+    meta['variables'] = formula.number_of_variables()
+    meta['clauses'] = len(offsets) - 1
+    meta['literals'] = size
+    meta['groups'] = groups
+    meta = json.dumps(meta, default=str).encode('utf-8')
+    meta += b' ' * _padding(len(meta))
+
+    output.write(BINARY_MAGIC)
+    output.write(len(meta).to_bytes(8, 'little'))
+    output.write(meta)
+    _write_array(output, offsets)
+    if isinstance(literals, array):
+        _write_array(output, literals)
+    else:
+        with literals:
+            literals.seek(0)
+            shutil.copyfileobj(literals, output)
+    output.write(b'\0' * _padding(4 * size))
+    output.write(labels)
+
+
+def from_binary_file(cnfclass, fileorname):
+    """Load a formula saved in binary format
+
+    The file is memory mapped, and the clauses of the formula are
+    stored in a :py:class:`cnfgen.formula.basecnf.MappedClauses`
+    object on top of the mapped memory.
+
+    Parameters
+    ----------
+    cnfclass: subclass of cnfgen.basecnf.BaseCNF
+        the type of CNF object to produce
+    fileorname: file object or string
+        source file given either as object or as filename. Text
+        file objects are read through their binary buffer.
+
+    Raises
+    ------
+    ValueError
+        when the file is not in binary format
+    """
+    if isinstance(fileorname, str):
+        with open(fileorname, 'rb') as filehandle:
+            return from_binary_file(cnfclass, filehandle)
+    fileorname = getattr(fileorname, 'buffer', fileorname)
+    try:
+        if not isinstance(fileorname, (io.BufferedReader, io.FileIO)):
+            # e.g. the file descriptor of a decompressed stream
+            raise ValueError
+        data = mmap.mmap(fileorname.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError, AttributeError):
+        # e.g. pipes cannot be mapped
+        data = fileorname.read()
+    if bytes(data[:len(BINARY_MAGIC)]) != BINARY_MAGIC:
+        raise ValueError("not a CNFgen binary file")
+    pos = len(BINARY_MAGIC)
+    size = int.from_bytes(data[pos:pos + 8], 'little')
+    pos += 8
+    try:
+        meta = json.loads(bytes(data[pos:pos + size]).decode('utf-8'),
+                          object_pairs_hook=OrderedDict)
+        n, m, L = meta['variables'], meta['clauses'], meta['literals']
+    except (ValueError, KeyError) as e:
+        raise ValueError("invalid metadata in CNFgen binary file") from e
+    pos += size
+
+    if len(data) < pos + 8 * (m + 1) + 4 * L:
+        raise ValueError("truncated CNFgen binary file")
+    view = memoryview(data)
+    offsets = view[pos:pos + 8 * (m + 1)].cast('q')
+    pos += 8 * (m + 1)
+    literals = view[pos:pos + 4 * L].cast('i')
+    pos += 4 * L + _padding(4 * L)
+    if any(len(data) < pos + end for _, _, _, end in meta['groups']):
+        raise ValueError("truncated CNFgen binary file")
+    if sys.byteorder != 'little':
+        offsets = array('q', offsets)
+        offsets.byteswap()
+        literals = array('i', literals)
+        literals.byteswap()
+
+    F = cnfclass()
+    F.header = meta['header']
+    if hasattr(F, 'new_labelled_group'):
+        for first, count, start, end in meta['groups']:
+            F.update_variable_number(first - 1)
+            F.new_labelled_group(count, view[pos + start:pos + end])
+    F.update_variable_number(n)
+    F._clauses = MappedClauses(literals, offsets, data)
+    return F
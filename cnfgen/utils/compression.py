@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+"""Transparent access to compressed files
+
+Formula and graph files can be compressed, and the compression format
+is determined by the extension of the file name:
+
+- ``.gz`` gzip
+- ``.bz2`` bzip2
+- ``.xz`` and ``.lzma`` LZMA
+- ``.zst`` Zstandard (needs the optional ``zstandard`` package)
+
+The data is compressed and decompressed on the fly, so that the
+uncompressed content never hits the disk.
+"""
+
+import io
+import os
+
+
+COMPRESSION_EXTENSIONS = ['gz', 'bz2', 'xz', 'lzma', 'zst']
+
+
+def compression_from_name(name):
+    """The compression format corresponding to a file name
+
+    Examples
+    --------
+    >>> compression_from_name('formula.cnf.gz')
+    'gz'
+    >>> compression_from_name('graph.gml.xz')
+    'xz'
+    >>> compression_from_name('formula.cnf') is None
+    True
+    """
+    ext = os.path.splitext(name)[-1][1:]
+    if ext in COMPRESSION_EXTENSIONS:
+        return ext
+    return None
+
+
+def strip_compression_extension(name):
+    """Remove the extension of the compression format, if any
+
+    Examples
+    --------
+    >>> strip_compression_extension('formula.cnf.gz')
+    'formula.cnf'
+    >>> strip_compression_extension('formula.opb')
+    'formula.opb'
+    """
+    if compression_from_name(name) is None:
+        return name
+    return os.path.splitext(name)[0]
+
+
+class CompressedTextFile(io.TextIOWrapper):
+    """Text stream on top of a compressed binary stream
+
+    The `name` attribute is the name of the file on disk, so that the
+    format can be guessed from it."""
+    def __init__(self, filename, binary, encoding='utf-8'):
+        io.TextIOWrapper.__init__(self, binary, encoding=encoding)
+        self._filename = filename
+
+    @property
+    def name(self):
+        return self._filename
+
+
+def _open_binary(filename, mode, compression):
+    """Open a compressed file as a binary stream"""
+    if compression == 'gz':
+        import gzip
+        return gzip.open(filename, mode + 'b')
+    if compression == 'bz2':
+        import bz2
+        return bz2.open(filename, mode + 'b')
+    if compression in ['xz', 'lzma']:
+        import lzma
+        return lzma.open(filename, mode + 'b',
+                         format=lzma.FORMAT_XZ if compression == 'xz' else lzma.FORMAT_ALONE)
+    if compression == 'zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstandard not installed. '
+                              'Zstandard compressed files are not supported')
+        return zstandard.open(filename, mode + 'b')
+    raise ValueError("Unknown compression format {}".format(compression))
+
+
+def open_file(filename, mode='r', encoding='utf-8'):
+    """Open a text file, possibly compressed
+
+    If the extension of `filename` corresponds to a compression
+    format, the file content is compressed/decompressed on the fly.
+    Otherwise the file is opened as usual.
+
+    Parameters
+    ----------
+    filename: str
+        the name of the file
+    mode: str
+        either 'r', 'w', or 'a'
+    encoding: str
+        the encoding of the text
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> name = os.path.join(tempfile.mkdtemp(), 'test.cnf.gz')
+    >>> with open_file(name, 'w') as f:
+    ...     _ = f.write('p cnf 0 0\\n')
+    >>> with open(name, 'rb') as f:
+    ...     f.read(2) == b'\\x1f\\x8b'
+    True
+    >>> with open_file(name) as f:
+    ...     print(f.name, f.read(), end='')
+    ... # doctest: +ELLIPSIS
+    /.../test.cnf.gz p cnf 0 0
+    """
+    mode = mode.replace('t', '')
+    if mode not in ['r', 'w', 'a']:
+        raise ValueError("Invalid mode '{}' for text files".format(mode))
+    compression = compression_from_name(filename)
+    if compression is None:
+        return open(filename, mode, encoding=encoding)
+    binary = _open_binary(filename, mode, compression)
+    return CompressedTextFile(filename, binary, encoding=encoding)
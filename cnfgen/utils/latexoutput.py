@@ -43,6 +43,7 @@ from io import StringIO
 
 from cnfgen.formula.basecnf import BaseCNF
 from cnfgen.formula.baseopb import BaseOPB
+from cnfgen.utils.compression import open_file
 
 def to_latex_string(F):
     """LaTeX string of the CNF formula
@@ -168,7 +169,7 @@ def to_latex_document(F, fileorname, export_header=True, extra_text=""):
     if fileorname is None:
         output = sys.stdout
     elif isinstance(fileorname, str):
-        with open(fileorname, 'w', encoding='utf-8') as filehandle:
+        with open_file(fileorname, 'w') as filehandle:
             to_latex_document(F, filehandle,
                               export_header=export_header,
                               extra_text=extra_text)
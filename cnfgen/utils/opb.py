@@ -14,6 +14,28 @@ References
 import sys
 from cnfgen.formula.basecnf import BaseCNF
 from cnfgen.formula.baseopb import BaseOPB
+from cnfgen.utils.parsedimacs import write_in_blocks
+from cnfgen.utils.compression import open_file
+
+
+def _opb_clauses_text(clauses):
+    """Render a list of clauses as OPB constraints"""
+    fmt = "".join(["".join(["+1 x%d " if lit >= 0 else "+1 ~x%d "
+                            for lit in cls]) + ">= 1 ;\n"
+                   for cls in clauses])
+    return fmt % tuple([abs(lit) for cls in clauses for lit in cls])
+
+
+def _opb_constraints_text(constraints):
+    """Render a list of pseudo boolean constraints as OPB text"""
+    lines = []
+    for lin in constraints:
+        op = ">=" if lin[-2] == ">=" else "="
+        lines.extend(["{:+} x{} ".format(c, l) if l >= 0
+                      else "{:+} ~x{} ".format(c, -l)
+                      for (c, l) in lin[:-2]])
+        lines.append("{} {} ;\n".format(op, lin[-1]))
+    return "".join(lines)
 
 
 def to_opb_file(formula, fileorname=None,
@@ -38,7 +60,7 @@ def to_opb_file(formula, fileorname=None,
     if fileorname is None:
         output = sys.stdout
     elif isinstance(fileorname, str):
-        with open(fileorname, 'w', encoding='utf-8') as filehandle:
+        with open_file(fileorname, 'w') as filehandle:
             to_opb_file(formula, filehandle,
                         export_header=export_header,
                         export_varnames=export_varnames)
@@ -77,20 +99,6 @@ def to_opb_file(formula, fileorname=None,
 
     # Clauses
     if isinstance(formula,BaseCNF):
-        for cls in formula:
-            for lit in cls:
-                if lit>=0:
-                    output.write("+1 x{} ".format(lit) )
-                else:
-                    output.write("+1 ~x{} ".format(-lit))
-            output.write(">= 1 ;\n")
+        write_in_blocks(output, formula, _opb_clauses_text)
     elif isinstance(formula,BaseOPB):
-        for lin in formula:
-            op = ">=" if lin[-2]==">=" else "="
-            value = lin[-1]
-            for (c,l) in lin[:-2]:
-                if l>=0:
-                    output.write("{:+} x{} ".format(c,l) )
-                else:
-                    output.write("{:+} ~x{} ".format(c,-l) )
-            output.write("{} {} ;\n".format(op,value))
+        write_in_blocks(output, formula, _opb_constraints_text)
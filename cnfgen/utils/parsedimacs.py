@@ -12,6 +12,73 @@ References
 """
 
 import sys
+import mmap
+import shutil
+from itertools import islice, chain
+
+from cnfgen.formula.basecnf import ClauseSpool
+from cnfgen.utils.compression import open_file, compression_from_name
+
+# Number of clauses rendered before each write on the output file
+WRITE_BLOCK_SIZE = 8192
+
+# Number of characters read at once from DIMACS files
+DIMACS_READ_SIZE = 1 << 22
+
+
+def write_in_blocks(output, items, render, block_size=WRITE_BLOCK_SIZE):
+    """Render a sequence of items on a file, in large blocks
+
+    The items are grouped in lists of `block_size` elements, and each
+    list is rendered by `render` as a single string and written with
+    a single call to `output.write`.
+
+    Parameters
+    ----------
+    output: file object
+        a text file
+    items: iterable
+        the items to be written (e.g. clauses)
+    render: function
+        maps a list of items into their text representation
+    block_size: int
+        number of items per block
+
+    Examples
+    --------
+    >>> from io import StringIO
+    >>> out = StringIO()
+    >>> write_in_blocks(out, range(5), lambda b: "{}\\n".format(b), 2)
+    >>> print(out.getvalue(), end='')
+    [0, 1]
+    [2, 3]
+    [4]
+    """
+    items = iter(items)
+    while True:
+        block = list(islice(items, block_size))
+        if not block:
+            return
+        output.write(render(block))
+
+
+def dimacs_text(clauses):
+    """Render a list of clauses as DIMACS text
+
+    The whole list is rendered with a single string formatting
+    operation, which is much faster than converting the literals one
+    at the time.
+
+    Examples
+    --------
+    >>> print(dimacs_text([[1, -2], [], [3]]), end='')
+    1 -2 0
+    0
+    3 0
+    """
+    fmt = "".join(["%d " * len(cls) + "0\n" for cls in clauses])
+    return fmt % tuple(chain.from_iterable(clauses))
+
 
 def to_dimacs_file(formula, fileorname=None,
                    export_header=True,
@@ -23,7 +90,9 @@ def to_dimacs_file(formula, fileorname=None,
     formula:
         a cnf formula
     fileorname: file object or string (or stdout if None)
-        destination file given either as object or as filename
+        destination file given either as object or as filename.
+        File names with a compression extension (e.g. '.gz', '.xz')
+        are compressed on the fly.
     export_header : bool
         determines whether the formula header should be inserted as
         a comment in the DIMACS output.
@@ -35,7 +104,7 @@ def to_dimacs_file(formula, fileorname=None,
     if fileorname is None:
         output = sys.stdout
     elif isinstance(fileorname, str):
-        with open(fileorname, 'w', encoding='utf-8') as filehandle:
+        with open_file(fileorname, 'w') as filehandle:
             to_dimacs_file(formula, filehandle,
                            export_header=export_header,
                            export_varnames=export_varnames)
@@ -43,9 +112,41 @@ def to_dimacs_file(formula, fileorname=None,
     else:
         output = fileorname
 
+    write_dimacs_header(formula, output,
+                        export_header=export_header,
+                        export_varnames=export_varnames)
+    # Clauses already spooled in DIMACS format
+    if isinstance(getattr(formula, '_clauses', None), ClauseSpool):
+        formula._clauses.copy_to(output)
+        return
+    # Clauses
+    write_in_blocks(output, formula, dimacs_text)
+
+def write_dimacs_header(formula, output, m=None,
+                        export_header=True,
+                        export_varnames=False):
+    """Write the comments and the ``p cnf`` line of a formula
+
+    Parameters
+    ----------
+    formula:
+        a cnf formula
+    output: file object
+        where to write the header
+    m : int, optional
+        the number of clauses in the ``p cnf`` line
+        (default: the number of clauses of the formula)
+    export_header : bool
+        determines whether the formula header should be inserted as
+        a comment in the DIMACS output.
+    export_varnames : bool, optional
+        determines whether a map from variable indices to variable
+        names should be appended to the header.
+    """
     # Count the number of variables and clauses
     n = formula.number_of_variables()
-    m = formula.number_of_clauses()
+    if m is None:
+        m = formula.number_of_clauses()
 
     # Produce header in ascii compatible format
     if export_header:
@@ -63,13 +164,194 @@ def to_dimacs_file(formula, fileorname=None,
 
     # Formula specification
     output.write("p cnf {0} {1}\n".format(n, m))
-    # Clauses
-    for cls in formula:
-        for lit in cls:
-            output.write(str(lit)+" ")
-        output.write("0\n")
 
-def parse_dimacs(infile):
+
+def shard_range(total, i, k):
+    """Positions of the clauses in the `i`-th of `k` shards
+
+    The `total` clauses are split into `k` consecutive slices of
+    almost the same size, numbered from 1 to `k`.
+
+    Examples
+    --------
+    >>> [shard_range(10, i, 3) for i in range(1, 4)]
+    [(0, 3), (3, 6), (6, 10)]
+    """
+    if not 1 <= i <= k:
+        raise ValueError("shard {} out of {} does not exist".format(i, k))
+    return ((i - 1) * total // k, i * total // k)
+
+
+def manifest_name(filename):
+    """Name of the manifest file of a DIMACS fragment"""
+    return filename + '.manifest'
+
+
+def write_dimacs_fragment(clauses, output):
+    """Write a sequence of clauses as a DIMACS fragment
+
+    The fragment contains just the clauses, without header and
+    without ``p cnf`` line.
+
+    Parameters
+    ----------
+    clauses: iterable
+        the clauses in the fragment
+    output: file object
+        where to write the fragment
+
+    Returns
+    -------
+    int
+        the number of clauses in the fragment
+
+    Examples
+    --------
+    >>> from io import StringIO
+    >>> out = StringIO()
+    >>> write_dimacs_fragment([[1, -2], [3]], out)
+    2
+    >>> print(out.getvalue(), end='')
+    1 -2 0
+    3 0
+    """
+    count = 0
+
+    def render(block):
+        nonlocal count
+        count += len(block)
+        return dimacs_text(block)
+
+    write_in_blocks(output, clauses, render)
+    return count
+
+
+def write_manifest(filename, i, k, n, m, seed):
+    """Write the manifest of a DIMACS fragment
+
+    The manifest is saved next to the fragment (see
+    :py:func:`manifest_name`), and records that the fragment is the
+    `i`-th of `k` shards, the number `n` of variables of the whole
+    formula, the number `m` of clauses in the fragment, and the
+    random `seed` used to generate the formula.
+    """
+    with open(manifest_name(filename), 'w') as manifest:
+        manifest.write("shard {} {}\nvariables {}\nclauses {}\nseed {}\n".format(
+            i, k, n, m, seed))
+
+
+def read_manifest(filename):
+    """Read the manifest of a DIMACS fragment
+
+    Returns
+    -------
+    (int, int, int, int, int)
+        the shard index, the number of shards, the number of
+        variables, the number of clauses in the fragment and the
+        random seed of the formula
+    """
+    data = {}
+    with open(manifest_name(filename)) as manifest:
+        for line in manifest:
+            fields = line.split()
+            if fields:
+                data[fields[0]] = [int(x) for x in fields[1:]]
+    try:
+        (i, k), (n,), (m,), (seed,) = \
+            data['shard'], data['variables'], data['clauses'], data['seed']
+    except (KeyError, ValueError) as e:
+        raise ValueError(
+            "invalid manifest for fragment '{}'".format(filename)) from e
+    return i, k, n, m, seed
+
+
+def merge_dimacs_fragments(fragments, output):
+    """Concatenate DIMACS fragments into a DIMACS file
+
+    The fragments are the output of :py:func:`write_dimacs_fragment`,
+    with their manifests (see :py:func:`write_manifest`), and must
+    be all the shards of the same formula, in any order. The
+    ``p cnf`` line is computed from the manifests, and the fragments
+    are copied verbatim in the order of the shards, without parsing.
+
+    Parameters
+    ----------
+    fragments: list(str)
+        the file names of the fragments
+    output: file object
+        where to write the DIMACS file
+
+    Raises
+    ------
+    ValueError
+        when the fragments are not exactly the shards of one formula
+    """
+    manifests = sorted((read_manifest(name), name) for name in fragments)
+    if len(manifests) == 0:
+        raise ValueError("no fragments to merge")
+    _, k, n, _, seed = manifests[0][0]
+    if [info[0] for info, _ in manifests] != list(range(1, k + 1)) or \
+       any(info[1] != k or info[2] != n for info, _ in manifests):
+        raise ValueError("the fragments are not the {} shards of a formula".format(k))
+    if any(info[4] != seed for info, _ in manifests):
+        raise ValueError("the fragments come from different random seeds")
+    m = sum(info[3] for info, _ in manifests)
+    output.write("p cnf {0} {1}\n".format(n, m))
+    for _, name in manifests:
+        with open_file(name) as fragment:
+            shutil.copyfileobj(fragment, output)
+
+
+def _read_blocks(infile, size):
+    """Read a file in large blocks made of complete lines
+
+    Works with text files, binary files and memory maps, and the
+    blocks are either `str` or `bytes` accordingly."""
+    rest = None
+    while True:
+        try:
+            data = infile.read(size)
+        except UnicodeDecodeError as e:
+            raise ValueError("the input is not a DIMACS text file") from e
+        if not data:
+            break
+        if rest:
+            data = rest + data
+        newline = b'\n' if isinstance(data, bytes) else '\n'
+        cut = data.rfind(newline) + 1
+        if cut == 0:
+            rest = data
+            continue
+        yield data[:cut]
+        rest = data[cut:]
+    if rest:
+        yield rest
+
+
+def _parse_literals(text, n, first_line):
+    """Convert the text of some lines of literals to integers
+
+    The whole text is converted at once. In case of errors the text is
+    scanned again line by line, to report the first invalid one."""
+    try:
+        lits = list(map(int, text.split()))
+        if len(lits) == 0 or (-n <= min(lits) and max(lits) <= n):
+            return lits
+    except ValueError:
+        pass
+    newline = b'\n' if isinstance(text, bytes) else '\n'
+    for offset, line in enumerate(text.split(newline)):
+        try:
+            for lv in map(int, line.split()):
+                if not -n <= lv <= n:
+                    raise ValueError
+        except ValueError:
+            raise ValueError("Invalid literal at line {}".format(
+                first_line + offset)) from None
+    raise ValueError("Invalid literal at line {}".format(first_line))
+
+
+def parse_dimacs(infile, blocksize=DIMACS_READ_SIZE):
     """Parse a dimacs cnf in file object
 
     Given a file object, this function extracts the number of
@@ -80,10 +362,16 @@ def parse_dimacs(infile):
     - m : the number of clauses
     - c1, c2, c3, ...  : a sequence of m clauses
 
+    The file is read in blocks of about `blocksize` characters, and
+    the literals in each block are converted to integers all at once.
+
     Parameters
     ----------
     infile: file object
-        the file containing the dimacs text
+        the file containing the dimacs text. It can be a text file,
+        a binary file or a memory map.
+    blocksize: int
+        the size of the blocks read from the file
 
     Returns
     -------
@@ -92,7 +380,15 @@ def parse_dimacs(infile):
 
     Raises
     ------
-    ValueError : in case there are mistakes in the file content"""
+    ValueError : in case there are mistakes in the file content
+
+    Examples
+    --------
+    >>> from io import BytesIO
+    >>> data = BytesIO(b"c comment\\np cnf 3 2\\n1 -2 0 3\\n-1 0\\n")
+    >>> list(parse_dimacs(data, blocksize=5))
+    [3, 2, (1, -2), (3, -1)]
+    """
 
     n = None   # None unless a spec line is met
     m = None
@@ -101,50 +397,79 @@ def parse_dimacs(infile):
     line_counter = 0
     literal_buffer = []
 
-    for line in infile.readlines():
+    for block in _read_blocks(infile, blocksize):
+        if isinstance(block, bytes):
+            comment, spec, newline = b'c', b'p', b'\n'
+        else:
+            comment, spec, newline = 'c', 'p', '\n'
+
+        # Comments and spec lines are processed one by one, while the
+        # lines of literals after them are converted all at once
+        last = max(block.rfind(comment), block.rfind(spec))
+        if last >= 0:
+            cut = block.find(newline, last) + 1 or len(block)
+        else:
+            cut = len(block) if n is None else 0
+        head, tail = block[:cut], block[cut:]
+
+        lits = []
+        for line in head.splitlines():
+            line_counter += 1
+            line = line.strip()
+
+            # Empty line
+            if len(line) == 0 or line[:1] == comment:
+                continue
+
+            # parse spec line
+            if line[:1] == spec:
+                if n is not None:
+                    raise ValueError(
+                        "There is a another spec at line {}".format(line_counter))
+                try:
+                    _, _, nstr, mstr = line.split()
+                    n = int(nstr)
+                    m = int(mstr)
+                    if n < 0 or m < 0:
+                        raise ValueError
+                except ValueError:
+                    raise ValueError("Spec at line {} should have "
+                                     "format 'p cnf <n> <m>' with n>=0, m>=0".format(line_counter))
+                yield n
+                yield m
+                continue
+
+            if n is None:
+                raise ValueError(
+                    "Non comment line {} before p cnf <n> <m>".format(line_counter))
 
-        line_counter += 1
-        line = line.strip()
+            lits.extend(_parse_literals(line, n, line_counter))
 
-        # Empty line
-        if len(line) == 0 or line[0] == 'c':
-            continue
-
-        # parse spec line
-        if line[0] == 'p':
-            if n is not None:
+        if tail:
+            if n is None and len(tail.split()) > 0:
+                blank = tail[:len(tail) - len(tail.lstrip())]
                 raise ValueError(
-                    "There is a another spec at line {}".format(line_counter))
+                    "Non comment line {} before p cnf <n> <m>".format(
+                        line_counter + 1 + blank.count(newline)))
+            lits.extend(_parse_literals(tail, n or 0, line_counter + 1))
+            line_counter += tail.count(newline)
+
+        # split the literals into clauses
+        start = 0
+        while True:
             try:
-                _, _, nstr, mstr = line.split()
-                n = int(nstr)
-                m = int(mstr)
-                if n < 0 or m < 0:
-                    raise ValueError
+                end = lits.index(0, start)
             except ValueError:
-                raise ValueError("Spec at line {} should have "
-                                 "format 'p cnf <n> <m>' with n>=0, m>=0".format(line_counter))
-            yield n
-            yield m
-            continue
-
-        if n is None:
-            raise ValueError(
-                "Non comment line {} before p cnf <n> <m>".format(line_counter))
-
-        # parse literals
-        try:
-            for lv in [int(lit) for lit in line.split()]:
-                if lv == 0:
-                    clauses_count += 1
-                    yield tuple(literal_buffer)
-                    literal_buffer = []
-                elif 1 <= abs(lv) <= n:
-                    literal_buffer.append(lv)
-                else:
-                    raise ValueError
-        except ValueError:
-            raise ValueError("Invalid literal at line {}".format(line_counter))
+                literal_buffer.extend(lits[start:])
+                break
+            if literal_buffer:
+                literal_buffer.extend(lits[start:end])
+                yield tuple(literal_buffer)
+                literal_buffer = []
+            else:
+                yield tuple(lits[start:end])
+            clauses_count += 1
+            start = end + 1
 
     # Checks at the end of parsing
     if len(literal_buffer) > 0:
@@ -161,6 +486,10 @@ def parse_dimacs(infile):
 def from_dimacs_file(cnfclass, fileorname=None):
     """Read DIMACS into a CNF object
 
+    When `fileorname` is a file name, the file is memory mapped and
+    read as bytes. Files compressed according to their extension
+    (e.g. '.gz', '.xz') are decompressed on the fly.
+
     Parameters
     ----------
     cnfclass: subclass of cnfgen.basecnf.BaseCNF
@@ -170,22 +499,36 @@ def from_dimacs_file(cnfclass, fileorname=None):
     if fileorname is None:
         inputfile = sys.stdin
         name = '<stdin>'
+    elif isinstance(fileorname, str) and compression_from_name(fileorname):
+        with open_file(fileorname, 'r') as filehandle:
+            return _read_dimacs(cnfclass, filehandle, fileorname)
     elif isinstance(fileorname, str):
-        with open(fileorname, 'r', encoding='utf-8') as filehandle:
-            return from_dimacs_file(cnfclass, filehandle)
+        with open(fileorname, 'rb') as filehandle:
+            try:
+                mapped = mmap.mmap(filehandle.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # e.g. empty files or special files cannot be mapped
+                return _read_dimacs(cnfclass, filehandle, fileorname)
+            with mapped:
+                return _read_dimacs(cnfclass, mapped, fileorname)
     else:
         inputfile = fileorname
         try:
             name = fileorname.name
         except AttributeError:
             name = '<unknown>'
+    return _read_dimacs(cnfclass, inputfile, name)
+
 
+def _read_dimacs(cnfclass, inputfile, name):
+    """Build a CNF object from the DIMACS content of a file object"""
     description = 'Formula from DIMACS file {}'.format(name)
     F = cnfclass(description=description)
     dimacs = parse_dimacs(inputfile)
     n = next(dimacs)
     m = next(dimacs)
     F.update_variable_number(n)
-    for c in dimacs:
-        F.add_clause(c)
+    # the parser already checked that literals are in range
+    F.add_clauses_from(dimacs, check=False)
     return F
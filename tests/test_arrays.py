@@ -0,0 +1,93 @@
+import pytest
+
+from cnfgen import CNF, CompactCNF, StreamingCNF
+from cnfgen.families.ordering import OrderingPrinciple
+
+try:
+    import numpy as np
+except ImportError:
+    pytest.skip("numpy not installed. Skipping tests with numpy arrays.",
+                allow_module_level=True)
+
+
+@pytest.mark.parametrize('formula_class', [CNF, CompactCNF, StreamingCNF])
+def test_roundtrip(formula_class):
+    F = OrderingPrinciple(5, formula_class=formula_class)
+    F.add_clause([])
+    F.update_variable_number(30)
+    literals, offsets = F.to_arrays()
+    assert literals.dtype == np.int32
+    assert offsets.dtype == np.int64
+    assert len(offsets) == len(F) + 1
+    G = CNF.from_arrays(literals, offsets, nvars=30)
+    assert list(G) == list(F)
+    assert G.number_of_variables() == 30
+
+
+def test_layout():
+    literals, offsets = CNF([[1, -2], [], [3]]).to_arrays()
+    assert literals.tolist() == [1, -2, 3]
+    assert offsets.tolist() == [0, 2, 2, 3]
+
+
+def test_arrays_are_copied():
+    literals = np.array([1, -2, 2, 3])
+    offsets = np.array([0, 2, 4])
+    F = CNF.from_arrays(literals, offsets)
+    literals[0] = 5
+    F.add_clause([-3])
+    assert list(F) == [[1, -2], [2, 3], [-3]]
+    assert F.number_of_variables() == 3
+    L, _ = F.to_arrays()
+    L[0] = 4
+    assert list(F)[0] == [1, -2]
+
+
+def test_from_python_lists():
+    F = CNF.from_arrays([], [0])
+    assert len(F) == 0
+    assert F.number_of_variables() == 0
+    F = CNF.from_arrays([1, -2], [0, 2], header={'description': 'test'})
+    assert F.header['description'] == 'test'
+    assert list(F) == [[1, -2]]
+
+
+@pytest.mark.parametrize('literals,offsets', [
+    ([1, 0], [0, 2]),
+    ([1, 2], [0, 1]),
+    ([1, 2], [1, 2]),
+    ([1, 2], [0, 2, 1]),
+    ([1, 2], []),
+    ([1.0, 2.0], [0, 2]),
+    ([[1, 2]], [0, 2]),
+    ([2**31], [0, 1]),
+])
+def test_invalid_arrays(literals, offsets):
+    with pytest.raises(ValueError):
+        CNF.from_arrays(literals, offsets)
+
+
+def test_too_few_variables():
+    with pytest.raises(ValueError):
+        CNF.from_arrays([1, -4], [0, 2], nvars=3)
+
+
+def test_incidence_matrix():
+    pytest.importorskip('scipy')
+    F = CNF([[1, -3], [2], [-1, -2, 3]])
+    F.update_variable_number(4)
+    _, _, M = F.to_arrays(incidence=True)
+    assert M.shape == (3, 4)
+    assert M.toarray().tolist() == [[1, 0, -1, 0],
+                                    [0, 1, 0, 0],
+                                    [-1, -1, 1, 0]]
+
+
+def test_incidence_matrix_repeated_literals():
+    pytest.importorskip('scipy')
+    F = CNF([[1, -1, 2], [2, 2], [-3, -3, 1, -3]])
+    _, _, M = F.to_arrays(incidence=True)
+    assert M.toarray().tolist() == [[0, 1, 0],
+                                    [0, 1, 0],
+                                    [1, 0, -1]]
+    assert M.nnz == 4
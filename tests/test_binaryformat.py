@@ -0,0 +1,145 @@
+import copy
+import pickle
+
+import pytest
+
+from cnfgen import CNF, CompactCNF, StreamingCNF
+from cnfgen.families.pigeonhole import GraphPigeonholePrinciple
+from cnfgen.families.ordering import OrderingPrinciple
+from cnfgen.graphs import bipartite_random_regular
+from cnfgen.clitools import cnfgen, cnfshuffle
+from cnfgen.utils.binaryformat import from_binary_file, is_binary_file
+
+
+@pytest.mark.parametrize('formula_class', [CNF, CompactCNF, StreamingCNF])
+def test_roundtrip(tmp_path, formula_class):
+    F = OrderingPrinciple(5, formula_class=formula_class)
+    F.add_clause([])
+    F.update_variable_number(25)
+    name = str(tmp_path / 'op.cnfb')
+    F.to_file(name)
+    G = CNF.from_file(name)
+    assert G.to_dimacs() == F.to_dimacs()
+    assert G.header == F.header
+    assert list(G.all_variable_labels()) == list(F.all_variable_labels())
+
+
+def test_clauses_read_once(tmp_path):
+    F = OrderingPrinciple(5, formula_class=StreamingCNF)
+    reads = []
+    clauses = F._clauses
+
+    class Spool:
+        def __iter__(self):
+            reads.append(1)
+            return iter(clauses)
+
+        def __len__(self):
+            return len(clauses)
+
+        def number_of_literals(self):
+            return clauses.number_of_literals()
+
+    F._clauses = Spool()
+    name = str(tmp_path / 'op.cnfb')
+    F.to_file(name)
+    assert len(reads) == 1
+    F._clauses = clauses
+    assert CNF.from_file(name).to_dimacs() == F.to_dimacs()
+
+
+def test_labels_of_graph_variables(tmp_path):
+    G = bipartite_random_regular(4, 3, 3, seed=1)
+    F = GraphPigeonholePrinciple(G)
+    name = str(tmp_path / 'gphp.bin')
+    F.to_file(name, fileformat='binary')
+    H = CNF.from_file(name)
+    assert list(H.all_variable_labels()) == list(F.all_variable_labels())
+
+
+def test_append_after_loading(tmp_path):
+    name = str(tmp_path / 'small.cnfb')
+    CNF([[1, -2], [2, 3]]).to_file(name)
+    F = CNF.from_file(name)
+    F.add_clause([-3, 4])
+    assert list(F) == [[1, -2], [2, 3], [-3, 4]]
+    assert F.number_of_variables() == 4
+
+
+def test_copy_and_pickle_after_loading(tmp_path):
+    name = str(tmp_path / 'small.cnfb')
+    CNF([[1, -2], [2, 3]]).to_file(name)
+    F = CNF.from_file(name)
+    for G in [copy.deepcopy(F), pickle.loads(pickle.dumps(F))]:
+        assert G.to_dimacs() == F.to_dimacs()
+        G.add_clause([-3, 4])
+        assert list(G) == [[1, -2], [2, 3], [-3, 4]]
+    assert list(F) == [[1, -2], [2, 3]]
+
+    name = str(tmp_path / 'op.cnfb')
+    OrderingPrinciple(4).to_file(name)
+    F = CNF.from_file(name)
+    for G in [copy.deepcopy(F), pickle.loads(pickle.dumps(F))]:
+        assert G.to_dimacs() == F.to_dimacs()
+        assert list(G.all_variable_labels()) == list(F.all_variable_labels())
+
+
+def test_not_binary(tmp_path):
+    name = str(tmp_path / 'formula.cnf')
+    CNF([[1, -2]]).to_file(name)
+    with pytest.raises(ValueError):
+        from_binary_file(CNF, name)
+    assert list(CNF.from_file(name)) == [[1, -2]]
+
+
+def test_load_from_file_object(tmp_path):
+    F = OrderingPrinciple(4)
+    name = str(tmp_path / 'op.cnfb')
+    F.to_file(name)
+    for mode in ['rb', 'r']:
+        with open(name, mode) as f:
+            G = CNF.from_file(f)
+            assert G.to_dimacs() == F.to_dimacs()
+    assert cnfgen(['cnfgen', 'dimacs', name], mode='string') == \
+        cnfgen(['cnfgen', 'op', '4'], mode='string')
+    with open(name, 'rb') as f:
+        assert is_binary_file(f)
+        assert f.read(3) == b'CNF'
+
+
+def test_cnfshuffle_binary_input(tmp_path):
+    name = str(tmp_path / 'op.cnfb')
+    dimacs = str(tmp_path / 'op.cnf')
+    OrderingPrinciple(4).to_file(name)
+    OrderingPrinciple(4).to_file(dimacs)
+    for extra in [[], ['--out-of-core']]:
+        out = cnfshuffle(['cnfshuffle', '-S', '3', '-i', name] + extra,
+                         mode='string')
+        assert out == cnfshuffle(['cnfshuffle', '-S', '3', '-i', dimacs] + extra,
+                                 mode='string')
+
+
+def test_cnfshuffle_not_text(tmp_path):
+    name = tmp_path / 'garbage.cnf'
+    name.write_bytes(b'p cnf 2 1\n\xff\xfe 0\n')
+    with pytest.raises(ValueError):
+        cnfshuffle(['cnfshuffle', '-i', str(name)], mode='string')
+
+
+def test_truncated(tmp_path):
+    name = str(tmp_path / 'formula.cnfb')
+    OrderingPrinciple(4).to_file(name)
+    with open(name, 'rb') as f:
+        data = f.read()
+    with open(name, 'wb') as f:
+        f.write(data[:-200])
+    with pytest.raises(ValueError):
+        CNF.from_file(name)
+
+
+def test_cmdline_binary(tmp_path):
+    data = cnfgen(['cnfgen', '-of', 'binary', 'php', '4', '3'], mode='string')
+    name = tmp_path / 'php.cnfb'
+    name.write_bytes(data)
+    F = CNF.from_file(str(name))
+    assert F.to_dimacs() == cnfgen(['cnfgen', 'php', '4', '3'], mode='string')
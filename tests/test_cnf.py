@@ -46,3 +46,99 @@ def test_dimacs_ascii():
     text = buffer.getvalue()
     byte = text.encode('ascii')
     assert len(byte) == len(text)
+
+def test_compact_storage():
+    from cnfgen import CompactCNF, PigeonholePrinciple
+    F = PigeonholePrinciple(5, 4)
+    G = PigeonholePrinciple(5, 4, formula_class=CompactCNF)
+    assert F.number_of_variables() == G.number_of_variables()
+    assert F.clauses() == G.clauses()
+    assert list(F) == list(G)
+    assert F.to_dimacs() == G.to_dimacs()
+    assert G.debug()
+
+
+def test_compact_storage_check():
+    from cnfgen import CompactCNF
+    F = CompactCNF()
+    F.add_clause([])
+    F.add_clause([2, -7])
+    assert F.number_of_variables() == 7
+    assert F[0] == []
+    assert F[-1] == [2, -7]
+    with pytest.raises(ValueError):
+        F.add_clause([1, 0], check=True)
+
+
+@pytest.mark.parametrize('store', ['list', 'compact', 'streaming'])
+def test_bulk_insertion(store):
+    from cnfgen import CompactCNF, StreamingCNF
+    formula_class = {'list': CNF,
+                     'compact': CompactCNF,
+                     'streaming': StreamingCNF}[store]
+    clauses = [[1, -2], [], [3, -1, 5], [-4]]
+    F = formula_class()
+    F.add_clauses_from(iter(clauses))
+    F.add_clauses_from_buffer([9, 1, -2, -6, 9], [1, 3, 3, 4])
+    assert list(F) == clauses + [[1, -2], [], [-6]]
+    assert F.number_of_variables() == 6
+    with pytest.raises(ValueError):
+        F.add_clauses_from([[1], [2, 0]])
+    with pytest.raises(ValueError):
+        F.add_clauses_from_buffer([1, 0], [0, 2])
+    assert len(F) == 7
+
+
+def test_edge_variables_index():
+    from cnfgen.graphs import Graph, BipartiteGraph, DirectedGraph
+    B = BipartiteGraph(3, 4)
+    D = DirectedGraph(5)
+    G = Graph(5)
+    for u, v in [(1, 4), (1, 2), (2, 1), (3, 3), (3, 4), (2, 4)]:
+        B.add_edge(u, v)
+    for u, v in [(1, 5), (2, 3), (4, 1), (3, 5), (2, 5)]:
+        G.add_edge(u, v)
+        D.add_edge(u, v)
+    F = CNF()
+    F.new_variable('x')
+    for e in [F.new_bipartite_edges(B),
+              F.new_graph_edges(G),
+              F.new_digraph_edges(D),
+              F.new_digraph_edges(D, sortby='succ')]:
+        for var in e:
+            assert e(*e.to_index(var)) == var
+    e = F.new_graph_edges(G)
+    assert e(5, 1) == e(1, 5)
+
+
+@pytest.mark.parametrize('wordtype,generator', [
+    ('combinations', itertools.combinations),
+    ('combinations_with_replacement', itertools.combinations_with_replacement),
+    ('permutations', itertools.permutations),
+    ('words', lambda s, k: itertools.product(s, repeat=k))])
+def test_word_of_indices_ranking(wordtype, generator):
+    from cnfgen.formula.variables import WordOfIndicesVariables
+    for n in range(6):
+        for k in range(5):
+            F = CNF()
+            F.new_variable('x')
+            p = WordOfIndicesVariables(F, n, k, wordtype=wordtype)
+            expected = list(generator(range(1, n + 1), k))
+            assert len(p) == len(expected)
+            assert list(p.indices()) == expected
+            for var, index in enumerate(expected, start=2):
+                assert p(*index) == var
+                assert p.to_index(var) == index
+
+
+def test_word_of_indices_invalid():
+    F = CNF()
+    p = F.new_combinations(5, 3)
+    q = F.new_permutations(4, 2)
+    r = F.new_combinations_with_replacement(4, 2)
+    for pattern in [(3, 2, 1), (1, 1, 2), (1, 2, 6), (1, 2)]:
+        with pytest.raises(ValueError):
+            p(*pattern)
+    with pytest.raises(ValueError):
+        q(2, 2)
+    assert r(2, 2) == len(p) + len(q) + 5
@@ -108,3 +108,28 @@ def test_fileformat_file(name, fformat, expected, tmpdir):
             lines = output.readlines()
 
     assert find_string_in_file(lines, teststring)
+
+
+@pytest.mark.parametrize("cmd", [['php', '5', '4'],
+                                 ['op', '5', '-T', 'xor', '2'],
+                                 ['randkcnf', '3', '10', '20', '-T', 'shuffle']])
+def test_streaming_output(cmd, tmpdir):
+    path1 = tmpdir.join('ref.cnf')
+    path2 = tmpdir.join('streamed.cnf')
+    cnfgen(['cnfgen', '-q', '-S', '12', '-o', path1] + cmd)
+    cnfgen(['cnfgen', '-q', '-S', '12', '--streaming', '-o', path2] + cmd)
+    with open(path1) as f1, open(path2) as f2:
+        assert f1.read() == f2.read()
+
+
+@pytest.mark.parametrize("ext,fformat", [('cnf.gz', 'dimacs'),
+                                         ('opb.xz', 'opb'),
+                                         ('tex.bz2', 'latex')])
+def test_compressed_output(ext, fformat, tmpdir):
+    from cnfgen.utils.compression import open_file
+    path = str(tmpdir.join('out.' + ext))
+    cnfgen(['cnfgen', '-o', path, 'php', '3', '2'])
+    expected = cnfgen(['cnfgen', '-of', fformat, 'php', '3', '2'], mode='string')
+    with open_file(path) as f:
+        text = f.read()
+    assert expected.splitlines()[-1] in text
@@ -29,3 +29,25 @@ def test_transformation_help():
         with pytest.raises(SystemExit) as cm:
             cnfgen(["cnfgen", 'and', '0', '0', t.name, "-h"])
         assert cm.value.code == 0
+
+
+def test_chained_transformations_are_lazy():
+    from cnfgen import PipelineCNF
+    from cnfgen import PigeonholePrinciple, XorSubstitution, OrSubstitution
+    F = cnfgen(['cnfgen', 'php', 4, 3, '-T', 'xor', 2, '-T', 'or', 2],
+               mode='formula')
+    assert isinstance(F, PipelineCNF)
+    G = OrSubstitution(XorSubstitution(PigeonholePrinciple(4, 3), 2), 2)
+    assert F.size() == G.size()
+    assert list(F) == list(G)
+
+
+def test_shuffle_buffers_the_formula():
+    from cnfgen import PipelineCNF
+    F = cnfgen(['cnfgen', '-S', 1, 'php', 4, 3,
+                '-T', 'xor', 2, '-T', 'shuffle'], mode='formula')
+    assert not isinstance(F, PipelineCNF)
+    G = cnfgen(['cnfgen', '-S', 1, 'php', 4, 3,
+                '-T', 'shuffle', '-T', 'xor', 2], mode='formula')
+    assert isinstance(G, PipelineCNF)
+    assert F.size() == G.size()
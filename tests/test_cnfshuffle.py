@@ -1,8 +1,11 @@
 import random
 import io
+import errno
+import importlib
 import pytest
 
 from itertools import product
+from tempfile import TemporaryFile
 
 from cnfgen.clitools import cnfshuffle
 from cnfgen import Shuffle, RandomKCNF
@@ -46,3 +49,74 @@ def test_cmdline_cnfshuffle_p(seed,p,v,c):
     cnf = RandomKCNF(4, 10, 3)
     lib, cli = run(cnf, seed, p,v,c)
     assert lib, cli
+
+
+def clause_lines(text):
+    return [line for line in text.splitlines()
+            if line and line[0] not in 'cp']
+
+
+@pytest.mark.parametrize("bucket_size", [1, 3, 100])
+def test_cnfshuffle_out_of_core(bucket_size):
+    cnf = RandomKCNF(4, 10, 30)
+    parameters = ['cnfshuffle', '--input', '-', '--seed', '45']
+    outputs = []
+    for extra in [[], ['-x', '--bucket-size', bucket_size],
+                  ['-x', '--bucket-size', bucket_size]]:
+        with redirect_stdin(io.StringIO(cnf.to_dimacs())):
+            outputs.append(cnfshuffle(parameters + extra, mode='string'))
+    inmemory, ooc, again = outputs
+    # same seed, same output
+    assert ooc == again
+    # same renaming of the variables
+    assert ooc.splitlines()[0] == inmemory.splitlines()[0]
+    assert sorted(clause_lines(ooc)) == sorted(clause_lines(inmemory))
+
+
+def test_cnfshuffle_out_of_core_fixed_clauses():
+    cnf = RandomKCNF(4, 10, 30)
+    parameters = ['cnfshuffle', '--input', '-', '--seed', '7', '-c']
+    with redirect_stdin(io.StringIO(cnf.to_dimacs())):
+        inmemory = cnfshuffle(parameters, mode='string')
+    with redirect_stdin(io.StringIO(cnf.to_dimacs())):
+        ooc = cnfshuffle(parameters + ['-x'], mode='string')
+    assert ooc == inmemory
+
+
+def test_cnfshuffle_out_of_core_few_open_files(monkeypatch):
+    shuffle = importlib.import_module('cnfgen.transformations.shuffle')
+    opened = []
+    maximum = 0
+
+    def temporary_file(*args, **kwargs):
+        nonlocal maximum
+        f = TemporaryFile(*args, **kwargs)
+        opened.append(f)
+        maximum = max(maximum, sum(not g.closed for g in opened))
+        return f
+
+    monkeypatch.setattr(shuffle, 'MAX_OPEN_BUCKETS', 3)
+    monkeypatch.setattr(shuffle, 'TemporaryFile', temporary_file)
+    cnf = RandomKCNF(4, 10, 30)
+    parameters = ['cnfshuffle', '--input', '-', '--seed', '45', '-x',
+                  '--bucket-size', '2']
+    with redirect_stdin(io.StringIO(cnf.to_dimacs())):
+        ooc = cnfshuffle(parameters, mode='string')
+    with redirect_stdin(io.StringIO(cnf.to_dimacs())):
+        inmemory = cnfshuffle(parameters[:-3], mode='string')
+    assert sorted(clause_lines(ooc)) == sorted(clause_lines(inmemory))
+    assert len(opened) > 3
+    assert all(f.closed for f in opened)
+    assert maximum <= 3 * 3
+
+
+def test_cnfshuffle_reports_io_errors(monkeypatch):
+    cli = importlib.import_module('cnfgen.clitools.cnfshuffle')
+
+    def fail(argv):
+        raise OSError(errno.EMFILE, "Too many open files")
+
+    monkeypatch.setattr(cli, 'cli', fail)
+    with pytest.raises(SystemExit) as e:
+        cli.main()
+    assert e.value.code != 0
@@ -7,6 +7,7 @@ import pytest
 from tests.utils import assertCnfEqual, assertCnfEqualsIgnoreVariables
 from cnfgen.clitools import cnfgen
 from cnfgen.clitools import redirect_stdin, CLIError
+from cnfgen.utils.parsedimacs import parse_dimacs
 
 def readCNF(fileinput):
     return CNF.from_file(fileinput)
@@ -91,3 +92,53 @@ def test_dimacs_subcommand_goodinput():
 def test_dimacs_subcommand_nofile():
     with pytest.raises(CLIError):
         cnfgen(['cnfgen', 'dimacs', "doesnotexists42342.cnf"])
+
+
+def test_invalid_literal_line_number():
+    dimacs = io.StringIO("c Hej!\np cnf 3 2\n1 -2 0\n\n2 4 0\n")
+    with pytest.raises(ValueError) as e:
+        readCNF(dimacs)
+    assert "line 5" in str(e.value)
+
+
+def test_line_number_before_spec():
+    dimacs = io.StringIO("c x\n\n\n1 2 0\n")
+    with pytest.raises(ValueError) as e:
+        readCNF(dimacs)
+    assert "line 4" in str(e.value)
+
+
+def test_small_blocks():
+    cnf = RandomKCNF(4, 10, 100)
+    text = cnf.to_dimacs()
+    text = text.replace(" 0\n", " 0\nc a comment\n", 10)
+    parsed = list(parse_dimacs(io.StringIO(text), blocksize=7))
+    assert parsed[:2] == [10, 100]
+    assert [list(c) for c in parsed[2:]] == list(cnf)
+
+
+def test_read_from_filename(tmpdir):
+    cnf = RandomKCNF(4, 10, 100)
+    path = str(tmpdir.join('formula.cnf'))
+    cnf.to_file(path)
+    cnf2 = readCNF(path)
+    assert list(cnf2) == list(cnf)
+    assert cnf2.number_of_variables() == 10
+
+
+def test_read_empty_filename(tmpdir):
+    path = str(tmpdir.join('empty.cnf'))
+    open(path, 'w').close()
+    with pytest.raises(ValueError):
+        readCNF(path)
+
+
+@pytest.mark.parametrize("ext", ['gz', 'bz2', 'xz'])
+def test_compressed_roundtrip(ext, tmpdir):
+    cnf = RandomKCNF(4, 10, 100)
+    path = str(tmpdir.join('formula.cnf.' + ext))
+    cnf.to_file(path)
+    with open(path, 'rb') as f:
+        assert b'p cnf' not in f.read()
+    cnf2 = readCNF(path)
+    assert list(cnf2) == list(cnf)
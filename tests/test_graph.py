@@ -4,6 +4,8 @@ import pytest
 
 import cnfgen
 from cnfgen.graphs import Graph, BipartiteGraph,DirectedGraph
+from cnfgen.graphs import FrozenGraph, FrozenBipartiteGraph, FrozenDirectedGraph
+from cnfgen.graphs import CompleteBipartiteGraph
 from cnfgen.graphs import random_gnm,random_gnp,random_gnd,multipartite_random
 from cnfgen.graphs import bipartite_random
 
@@ -62,3 +64,243 @@ def test_d_regular_odd_bad():
 def test_d_regular_large():
     G = random_gnd(100,80)
     assert_d_regular(G,80)
+
+
+def test_d_regular_sparse_large():
+    G = random_gnd(20000, 3, seed=2)
+    assert_d_regular(G, 3)
+    assert list(G.edges()) == list(random_gnd(20000, 3, seed=2).edges())
+
+
+def test_d_regular_small_is_uniform():
+    # 60 hexagons and 10 pairs of triangles
+    triangles = 0
+    for seed in range(2000):
+        G = random_gnd(6, 2, seed=seed)
+        triangles += all(len(set(G.neighbors(u)) & set(G.neighbors(v))) == 1
+                         for u, v in G.edges())
+    assert 200 < triangles < 380
+
+
+@pytest.mark.parametrize('l,r,d', [(6, 6, 4), (8, 4, 2), (4, 8, 6),
+                                   (5, 5, 5), (3, 7, 0), (3000, 2000, 4)])
+def test_bipartite_regular(l, r, d):
+    from cnfgen.graphs import bipartite_random_regular
+    B = bipartite_random_regular(l, r, d, seed=1)
+    assert all(len(B.right_neighbors(u)) == d for u in range(1, l + 1))
+    assert all(len(B.left_neighbors(v)) == l * d // r
+               for v in range(1, r + 1))
+    with pytest.raises(ValueError):
+        bipartite_random_regular(2, 1, 2)
+
+
+def test_random_graphs_extreme_probabilities():
+    for n in range(1, 7):
+        assert random_gnp(n, 0).number_of_edges() == 0
+        assert random_gnp(n, 1).number_of_edges() == n * (n - 1) // 2
+    assert bipartite_random(3, 4, 1).number_of_edges() == 12
+    assert bipartite_random(3, 4, 0).number_of_edges() == 0
+    assert multipartite_random(3, 2, 1).number_of_edges() == 12
+
+
+def test_random_graphs_are_reproducible():
+    G1 = random_gnp(50, 0.2, seed=3)
+    G2 = random_gnp(50, 0.2, seed=3)
+    assert list(G1.edges()) == list(G2.edges())
+    B1 = bipartite_random(20, 30, 0.1, seed=4)
+    B2 = bipartite_random(20, 30, 0.1, seed=4)
+    assert list(B1.edges()) == list(B2.edges())
+    M1 = multipartite_random(3, 10, 0.4, seed=5, shuffleblocks=True)
+    M2 = multipartite_random(3, 10, 0.4, seed=5, shuffleblocks=True)
+    assert list(M1.edges()) == list(M2.edges())
+
+
+def test_sparse_random_graph_large():
+    G = random_gnp(100000, 2e-5, seed=1)
+    assert 0 < G.number_of_edges() < 200000
+
+
+def test_frozen_graphs():
+    G = random_gnm(30, 100, seed=1)
+    F = G.freeze()
+    assert F.freeze() is F
+    assert Graph.normalize(F) is F
+    assert F.number_of_edges() == G.number_of_edges()
+    assert list(F.edges()) == list(G.edges())
+    for u in G.vertices():
+        assert list(F.neighbors(u)) == list(G.neighbors(u))
+        assert F.degree(u) == G.degree(u)
+        for v in G.vertices():
+            assert F.has_edge(u, v) == G.has_edge(u, v)
+    with pytest.raises(TypeError):
+        F.add_edge(1, 2)
+    with pytest.raises(ValueError):
+        FrozenGraph(3, [(1, 1)])
+
+    D = DirectedGraph(5)
+    D.add_edges_from([(1, 4), (4, 2), (3, 5), (2, 5)])
+    FD = D.freeze()
+    assert list(FD.edges()) == list(D.edges())
+    assert list(FD.edges_ordered_by_successors()) == \
+        list(D.edges_ordered_by_successors())
+    assert FD.is_dag() == D.is_dag()
+
+    B = bipartite_random(6, 7, 0.5, seed=2)
+    FB = B.freeze()
+    assert list(FB.edges()) == list(B.edges())
+    for v in range(1, 8):
+        assert FB.left_neighbors(v) == B.left_neighbors(v)
+        assert FB.left_degree(v) == B.left_degree(v)
+
+    K = CompleteBipartiteGraph(3, 4).freeze()
+    assert isinstance(K, FrozenBipartiteGraph)
+    assert K.number_of_edges() == 12
+    assert K.left_neighbors(2) == [1, 2, 3]
+    with pytest.raises(TypeError):
+        K.add_edge(1, 1)
+    assert FrozenDirectedGraph(4).name == \
+        DirectedGraph(4, name=None).name
+
+
+def test_frozen_graph_from_edge_array():
+    from array import array
+    G = FrozenGraph.from_edge_array(4, array('i', [1, 2, 2, 3, 3, 4, 4, 1]))
+    assert list(G.edges()) == [(1, 2), (1, 4), (2, 3), (3, 4)]
+    with pytest.raises(ValueError):
+        FrozenGraph.from_edge_array(4, [1, 2, 3])
+    B = FrozenBipartiteGraph.from_edge_array(2, 2, [1, 2, 2, 2])
+    assert B.left_neighbors(2) == [1, 2]
+
+
+def test_frozen_graph_formula():
+    from cnfgen import TseitinFormula, PebblingFormula, GraphPigeonholePrinciple
+    from cnfgen.graphs import dag_pyramid
+    G = random_gnd(12, 3, seed=3)
+    assert TseitinFormula(G).clauses() == \
+        TseitinFormula(G.freeze()).clauses()
+    D = dag_pyramid(4)
+    assert PebblingFormula(D).clauses() == \
+        PebblingFormula(D.freeze()).clauses()
+    B = bipartite_random(6, 5, 0.5, seed=4)
+    assert GraphPigeonholePrinciple(B).clauses() == \
+        GraphPigeonholePrinciple(B.freeze()).clauses()
+
+
+def test_bulk_edge_insertion():
+    import random
+    random.seed(5)
+    pairs = [(random.randint(1, 20), random.randint(1, 20)) for _ in range(150)]
+    simple = [(u, v) for u, v in pairs if u != v]
+    for G1, G2, edges in [(Graph(20), Graph(20), simple),
+                          (DirectedGraph(20), DirectedGraph(20), pairs),
+                          (BipartiteGraph(20, 20), BipartiteGraph(20, 20), pairs)]:
+        for u, v in edges:
+            G1.add_edge(u, v)
+        G2.add_edges_from(edges[:70])
+        G2.add_edges_from(edges[70:])
+        assert list(G1.edges()) == list(G2.edges())
+        assert G1.number_of_edges() == G2.number_of_edges()
+    assert G1.ladj == G2.ladj
+    assert G1.radj == G2.radj
+
+
+def test_dense_random_edges():
+    from cnfgen.graphs import bipartite_random_m_edges
+    for m in [0, 80, 150, 190]:
+        assert random_gnm(20, m, seed=m).number_of_edges() == m
+        assert bipartite_random_m_edges(10, 20, m, seed=m).number_of_edges() == m
+
+
+def test_add_all_missing_edges():
+    from cnfgen.graphs import add_random_missing_edges
+    G = random_gnm(40, 500, seed=2)
+    add_random_missing_edges(G, 40 * 39 // 2 - 500, seed=3)
+    assert G.number_of_edges() == 40 * 39 // 2
+    B = bipartite_random(12, 10, 0.7, seed=2)
+    add_random_missing_edges(B, 120 - B.number_of_edges(), seed=3)
+    assert B.number_of_edges() == 120
+    with pytest.raises(ValueError):
+        add_random_missing_edges(B, 1)
+
+
+def test_implicit_graphs():
+    from cnfgen.graphs import grid, dag_pyramid, dag_complete_binary_tree
+    from cnfgen.graphs import CompleteGraph, GridGraph, PyramidDAG
+    for G in [Graph.complete_graph(6), grid([3, 1, 4]), grid([4, 2, 5], torus=True)]:
+        H = Graph(G.number_of_vertices())
+        H.add_edges_from(G.edges())
+        assert G.number_of_edges() == H.number_of_edges()
+        for u in G.vertices():
+            assert list(G.neighbors(u)) == list(H.neighbors(u))
+            assert G.degree(u) == H.degree(u)
+            for v in G.vertices():
+                assert G.has_edge(u, v) == H.has_edge(u, v)
+    for D in [dag_pyramid(4), dag_complete_binary_tree(3)]:
+        E = DirectedGraph(D.number_of_vertices())
+        E.add_edges_from(D.edges())
+        assert D.is_dag() and D.number_of_edges() == E.number_of_edges()
+        for u in D.vertices():
+            assert list(D.predecessors(u)) == list(E.predecessors(u))
+            assert list(D.successors(u)) == list(E.successors(u))
+    assert isinstance(Graph.complete_graph(3), CompleteGraph)
+    assert isinstance(grid([2, 2]), GridGraph)
+    assert isinstance(dag_pyramid(2), PyramidDAG)
+
+
+def test_implicit_graphs_become_explicit_when_modified():
+    from cnfgen.graphs import grid, dag_path
+    G = grid([3, 3])
+    G.remove_edge(1, 2)
+    G.add_edge(1, 9)
+    assert type(G) is Graph
+    assert G.number_of_edges() == 12
+    assert list(G.neighbors(1)) == [4, 9]
+    D = dag_path(3)
+    D.add_edge(4, 1)
+    assert type(D) is DirectedGraph
+    assert not D.is_dag()
+
+
+def test_dense_graph():
+    from cnfgen.graphs import DenseGraph, prefer_dense
+    G = random_gnp(40, 0.5, seed=6)
+    D = prefer_dense(G)
+    assert isinstance(D, DenseGraph)
+    assert D.name == G.name
+    assert D.number_of_edges() == G.number_of_edges()
+    assert list(D.edges()) == list(G.edges())
+    assert list(D.non_edges()) == list(G.non_edges())
+    for u in G.vertices():
+        assert list(D.neighbors(u)) == list(G.neighbors(u))
+        assert D.degree(u) == G.degree(u)
+        for v in range(0, 42):
+            assert D.has_edge(u, v) == G.has_edge(u, v)
+    assert list(DenseGraph(40, G.edges()).edges()) == list(G.edges())
+    with pytest.raises(TypeError):
+        D.add_edge(1, 2)
+
+
+def test_prefer_dense_keeps_sparse_graphs():
+    from cnfgen.graphs import prefer_dense
+    G = random_gnp(40, 0.02, seed=6)
+    assert prefer_dense(G) is G
+    assert prefer_dense(Graph(1)).order() == 1
+
+
+def test_families_on_dense_graphs(monkeypatch):
+    import cnfgen.families.subgraph as subgraph
+    import cnfgen.families.graphisomorphism as graphisomorphism
+    import cnfgen.families.dominatingset as dominatingset
+    G = random_gnp(10, 0.6, seed=2)
+    H = random_gnp(10, 0.6, seed=3)
+    K = Graph.complete_graph(3)
+    formulas = [lambda: subgraph.CliqueFormula(G, 3),
+                lambda: subgraph.BinaryCliqueFormula(G, 3),
+                lambda: subgraph.RamseyWitnessFormula(G, 3, 3),
+                lambda: subgraph.SubgraphFormula(G, K, induced=True),
+                lambda: graphisomorphism.GraphIsomorphism(G, H),
+                lambda: dominatingset.DominatingSet(G, 2)]
+    dense = [F().clauses() for F in formulas]
+    for module in [subgraph, graphisomorphism, dominatingset]:
+        monkeypatch.setattr(module, 'prefer_dense', lambda G: G)
+    assert dense == [F().clauses() for F in formulas]
@@ -443,3 +443,15 @@ def test_readGraph_bipartite_bad_bipartition2_monoedge_gml(shared_datadir):
     filename = "bipartite_bad_bipartition2.gml"
     with pytest.raises(ValueError):
         readGraph(str(shared_datadir / filename), graph_type='bipartite')
+
+
+@pytest.mark.parametrize("ext", ['gz', 'bz2', 'xz'])
+def test_compressed_graph_io(ext, tmpdir):
+    G = Graph.complete_graph(5)
+    path = str(tmpdir.join('graph.kthlist.' + ext))
+    writeGraph(G, path, graph_type='simple')
+    with open(path, 'rb') as f:
+        assert b'5 :' not in f.read()
+    H = readGraph(path, graph_type='simple')
+    assert H.order() == 5
+    assert sorted(H.edges()) == sorted(G.edges())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+import itertools
+import pytest
+
+from cnfgen import CNF
+from cnfgen.formula.linear import CARDINALITY_ENCODINGS
+
+
+def satisfiable(clauses, assignment):
+    """Brute force DPLL with unit propagation"""
+    assignment = dict(assignment)
+    while True:
+        unit = None
+        pending = []
+        for clause in clauses:
+            if any(assignment.get(abs(l)) == (l > 0) for l in clause):
+                continue
+            free = [l for l in clause if abs(l) not in assignment]
+            if len(free) == 0:
+                return False
+            if len(free) == 1:
+                unit = free[0]
+                break
+            pending.append(free)
+        if unit is None:
+            break
+        assignment[abs(unit)] = unit > 0
+    if len(pending) == 0:
+        return True
+    var = abs(pending[0][0])
+    return satisfiable(clauses, {**assignment, var: True}) or \
+        satisfiable(clauses, {**assignment, var: False})
+
+
+OPERATORS = {'<=': lambda s, k: s <= k,
+             '>=': lambda s, k: s >= k,
+             '<': lambda s, k: s < k,
+             '>': lambda s, k: s > k,
+             '==': lambda s, k: s == k,
+             '!=': lambda s, k: s != k}
+
+
+@pytest.mark.parametrize('encoding', CARDINALITY_ENCODINGS)
+@pytest.mark.parametrize('op', list(OPERATORS))
+def test_encoding_correctness(encoding, op):
+    for n in range(6):
+        for k in range(-1, n + 2):
+            F = CNF()
+            F.update_variable_number(n)
+            lits = [(-1)**i * (i + 1) for i in range(n)]
+            F.add_linear(lits, op, k, encoding=encoding)
+            clauses = F.clauses()
+            for values in itertools.product([True, False], repeat=n):
+                total = sum(1 for lit, v in zip(lits, values) if v == (lit > 0))
+                expected = OPERATORS[op](total, k)
+                assignment = dict(enumerate(values, start=1))
+                assert satisfiable(clauses, assignment) == expected, \
+                    (encoding, op, n, k, values)
+
+
+@pytest.mark.parametrize('encoding', CARDINALITY_ENCODINGS[1:])
+def test_encoding_is_polynomial(encoding):
+    F = CNF()
+    x = F.new_block(40)
+    F.cardinality_eq(list(x), 20, encoding=encoding)
+    assert len(F) < 20000
+    assert F.number_of_variables() > 40
+
+
+def test_invalid_encoding():
+    F = CNF()
+    with pytest.raises(ValueError):
+        F.add_linear([1, 2, 3], '>=', 2, encoding='magic')
+
+
+@pytest.mark.parametrize('encoding', CARDINALITY_ENCODINGS)
+def test_family_encodings(encoding):
+    from cnfgen import EvenColoringFormula, SubsetCardinalityFormula, Tiling
+    from cnfgen.graphs import Graph, bipartite_random_regular
+    G = Graph.complete_graph(5)
+    B = bipartite_random_regular(6, 6, 4, seed=3)
+    for F in [EvenColoringFormula(G, encoding=encoding),
+              SubsetCardinalityFormula(B, encoding=encoding),
+              Tiling(G, encoding=encoding)]:
+        assert F.debug()
+
+
+def test_auxiliary_variables_have_distinct_names():
+    F = CNF()
+    x = list(F.new_block(6, label='x{}'))
+    for encoding in CARDINALITY_ENCODINGS:
+        F.add_linear(x, '<=', 2, encoding=encoding)
+        F.add_linear(x, '>=', 3, encoding=encoding)
+    labels = list(F.all_variable_labels())
+    assert len(labels) == F.number_of_variables()
+    assert len(set(labels)) == len(labels)
+
+
+@pytest.mark.parametrize('maxwidth', [3, 4, 5])
+def test_parity_chain_correctness(maxwidth):
+    for n in range(8):
+        for constant in [0, 1]:
+            F = CNF()
+            F.update_variable_number(n)
+            lits = [(-1)**i * (i + 1) for i in range(n)]
+            F.add_parity(lits, constant, maxwidth=maxwidth)
+            clauses = F.clauses()
+            assert all(len(c) <= maxwidth for c in clauses)
+            for values in itertools.product([True, False], repeat=n):
+                total = sum(1 for lit, v in zip(lits, values) if v == (lit > 0))
+                assignment = dict(enumerate(values, start=1))
+                assert satisfiable(clauses, assignment) == (total % 2 == constant)
+
+
+def test_parity_chain_invalid_width():
+    F = CNF()
+    with pytest.raises(ValueError):
+        F.add_parity([1, 2, 3, 4], 1, maxwidth=2)
+
+
+def test_xor_families_with_chains():
+    from cnfgen import TseitinFormula, RandomKXOR
+    from cnfgen.graphs import Graph
+    from cnfgen.transformations.substitutions import XorSubstitution
+    G = Graph.complete_graph(8)
+    F = TseitinFormula(G, maxwidth=4)
+    assert F.number_of_variables() > 28
+    assert all(len(c) <= 4 for c in F)
+    F = RandomKXOR(8, 10, 4, seed=7, maxwidth=3)
+    assert all(len(c) <= 3 for c in F)
+    base = CNF([[1, -2], [2], [-1, 3]])
+    F = XorSubstitution(base, 6, maxwidth=3)
+    assert all(len(c) <= 3 for c in F)
+    assert satisfiable(F.clauses(), {})
+    base.add_clause([-3])
+    F = XorSubstitution(base, 6, maxwidth=3)
+    assert not satisfiable(F.clauses(), {})
+
+
+def test_parity_chains_have_distinct_names():
+    F = CNF()
+    x = list(F.new_block(7, label='x{}'))
+    F.add_parity(x, 1, maxwidth=3)
+    F.add_parity(x[::-1], 0, maxwidth=3)
+    labels = list(F.all_variable_labels())
+    assert len(labels) == F.number_of_variables()
+    assert len(set(labels)) == len(labels)
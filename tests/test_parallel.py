@@ -0,0 +1,53 @@
+import pytest
+
+from cnfgen import CNF
+from cnfgen.graphs import Graph
+from cnfgen.formula.variables import words_range, word_count
+from cnfgen.families.ramsey import RamseyNumber, VanDerWaerden
+from cnfgen.families.ordering import OrderingPrinciple
+from cnfgen.families.graphisomorphism import GraphIsomorphism, GraphAutomorphism
+from cnfgen.families.subgraph import SubgraphFormula
+from cnfgen.clitools import cnfgen
+
+
+class ParallelCNF(CNF):
+    jobs = 3
+
+
+@pytest.mark.parametrize('wordtype', ['combinations',
+                                      'combinations_with_replacement',
+                                      'permutations',
+                                      'words'])
+def test_words_range(wordtype):
+    for n in range(5):
+        for k in range(4):
+            full = list(words_range(wordtype, n, k))
+            assert len(full) == word_count(wordtype, n, k)
+            for start in range(len(full) + 1):
+                for stop in range(start, len(full) + 2):
+                    assert list(words_range(wordtype, n, k, start, stop)) == full[start:stop]
+
+
+@pytest.mark.parametrize('family,args', [
+    (RamseyNumber, (3, 4, 8)),
+    (VanDerWaerden, (20, 3, 4)),
+    (VanDerWaerden, (12, 3, 3, 2)),
+    (OrderingPrinciple, (6,)),
+    (OrderingPrinciple, (6, True, True)),
+    (OrderingPrinciple, (6, False, False, True, 2)),
+    (GraphAutomorphism, (Graph.complete_graph(4),)),
+    (GraphIsomorphism, (Graph.complete_graph(4), Graph(4))),
+    (SubgraphFormula, (Graph.complete_graph(6), Graph.complete_graph(3))),
+    (SubgraphFormula, (Graph.complete_graph(6), Graph(3), True)),
+])
+def test_parallel_generation(family, args):
+    F = family(*args)
+    G = family(*args, formula_class=ParallelCNF)
+    assert F.to_dimacs() == G.to_dimacs()
+
+
+def test_parallel_cmdline():
+    seq = cnfgen(['cnfgen', '-q', 'ram', '3', '4', '8'], mode='string')
+    par = cnfgen(['cnfgen', '-q', '--jobs', '2', 'ram', '3', '4', '8'],
+                 mode='string')
+    assert seq == par
@@ -0,0 +1,86 @@
+import errno
+import importlib
+import pytest
+
+from cnfgen.clitools import cnfgen, cnfmerge, CLIError
+from cnfgen.utils.parsedimacs import read_manifest
+
+
+def make_shards(tmp_path, k, args, seed=7):
+    names = []
+    for i in range(1, k + 1):
+        name = str(tmp_path / 'shard{}.cnf'.format(i))
+        cnfgen(['cnfgen', '-o', name, '-S', str(seed),
+                '--shard', '{}/{}'.format(i, k)] + args)
+        names.append(name)
+    return names
+
+
+@pytest.mark.parametrize('args', [
+    ['php', '5', '4'],
+    ['randkcnf', '3', '10', '30'],
+    ['kclique', '3', 'grid', '3', '3'],
+    ['kclique', '3', 'gnp', '12', '.5'],
+    ['op', '4', '-T', 'xor', '2'],
+])
+def test_shard_and_merge(tmp_path, args):
+    names = make_shards(tmp_path, 3, args)
+    merged = cnfmerge(['cnfmerge'] + names[::-1], mode='string')
+    assert merged == cnfgen(['cnfgen', '-S', '7'] + args, mode='string')
+
+
+def test_shard_manifest(tmp_path):
+    names = make_shards(tmp_path, 2, ['php', '5', '4'])
+    assert read_manifest(names[0]) == (1, 2, 20, 22, 7)
+    assert read_manifest(names[1]) == (2, 2, 20, 23, 7)
+    fragment = cnfgen(['cnfgen', '-S', '7', '--shard', '2/2', 'php', '5', '4'],
+                      mode='string')
+    assert len(fragment.splitlines()) == 23
+    assert not fragment.startswith('p ')
+
+
+def test_merge_missing_shard(tmp_path):
+    names = make_shards(tmp_path, 3, ['php', '5', '4'])
+    with pytest.raises(CLIError):
+        cnfmerge(['cnfmerge'] + names[:2], mode='string')
+
+
+def test_merge_different_seeds(tmp_path):
+    names = make_shards(tmp_path, 2, ['randkcnf', '3', '10', '30'])
+    (tmp_path / 'other').mkdir()
+    other = make_shards(tmp_path / 'other', 2, ['randkcnf', '3', '10', '30'],
+                        seed=8)
+    with pytest.raises(CLIError):
+        cnfmerge(['cnfmerge', names[0], other[1]], mode='string')
+
+
+def test_shard_seed_zero(tmp_path):
+    args = ['randkcnf', '3', '10', '30']
+    names = make_shards(tmp_path, 2, args, seed=0)
+    assert read_manifest(names[0])[4] == 0
+    merged = cnfmerge(['cnfmerge'] + names, mode='string')
+    assert merged == cnfgen(['cnfgen', '-S', '0'] + args, mode='string')
+
+
+def test_shard_invalid():
+    with pytest.raises(CLIError):
+        cnfgen(['cnfgen', '--shard', '1/2', 'php', '5', '4'], mode='string')
+    with pytest.raises(CLIError):
+        cnfgen(['cnfgen', '--shard', '3/2', 'php', '5', '4'])
+    with pytest.raises(CLIError):
+        cnfgen(['cnfgen', '--shard', '1/2', 'php', '5', '4'])
+    with pytest.raises(CLIError):
+        cnfgen(['cnfgen', '-of', 'opb', '--shard', '1/2', 'php', '5', '4'],
+               mode='string')
+
+
+def test_cnfmerge_reports_io_errors(monkeypatch):
+    cli = importlib.import_module('cnfgen.clitools.cnfmerge')
+
+    def fail(argv):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(cli, 'cli', fail)
+    with pytest.raises(SystemExit) as e:
+        cli.main()
+    assert e.value.code != 0
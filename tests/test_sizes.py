@@ -0,0 +1,158 @@
+import importlib
+import pytest
+
+from cnfgen import CountingCNF
+from cnfgen.formula.sizes import FormulaSize
+from cnfgen.graphs import Graph, bipartite_random, random_gnd
+
+from cnfgen.families.pigeonhole import PigeonholePrinciple, PigeonholePrincipleSize
+from cnfgen.families.pigeonhole import GraphPigeonholePrinciple, GraphPigeonholePrincipleSize
+from cnfgen.families.pigeonhole import BinaryPigeonholePrinciple, BinaryPigeonholePrincipleSize
+from cnfgen.families.pigeonhole import RelativizedPigeonholePrinciple, RelativizedPigeonholePrincipleSize
+from cnfgen.families.ordering import OrderingPrinciple, OrderingPrincipleSize
+from cnfgen.families.ordering import GraphOrderingPrinciple, GraphOrderingPrincipleSize
+from cnfgen.families.counting import CountingPrinciple, CountingPrincipleSize
+from cnfgen.families.counting import PerfectMatchingPrinciple, PerfectMatchingPrincipleSize
+from cnfgen.families.ramsey import RamseyNumber, RamseyNumberSize
+from cnfgen.families.ramsey import VanDerWaerden, VanDerWaerdenSize
+from cnfgen.families.randomformulas import RandomKCNF, RandomKCNFSize
+from cnfgen.families.randomkxor import RandomKXOR, RandomKXORSize
+from cnfgen.families.tseitin import TseitinFormula, TseitinFormulaSize
+from cnfgen.families.coloring import GraphColoringFormula, GraphColoringFormulaSize
+
+from cnfgen.clitools import cnfgen, CLIError
+
+
+def build_size(family, *args, **kwargs):
+    return family(*args, formula_class=CountingCNF, **kwargs).size()
+
+
+@pytest.mark.parametrize('functional', [False, True])
+@pytest.mark.parametrize('onto', [False, True])
+def test_php_size(functional, onto):
+    for p in range(1, 6):
+        for h in range(1, 6):
+            assert PigeonholePrincipleSize(p, h, functional, onto) == \
+                build_size(PigeonholePrinciple, p, h, functional, onto)
+            G = bipartite_random(p, h, 0.5, seed=p * h)
+            assert GraphPigeonholePrincipleSize(G, functional, onto) == \
+                build_size(GraphPigeonholePrinciple, G, functional, onto)
+
+
+def test_bphp_rphp_size():
+    for p in range(1, 6):
+        for h in range(1, 6):
+            assert BinaryPigeonholePrincipleSize(p, h) == \
+                build_size(BinaryPigeonholePrinciple, p, h)
+            assert RelativizedPigeonholePrincipleSize(p, p + 1, h) == \
+                build_size(RelativizedPigeonholePrinciple, p, p + 1, h)
+
+
+@pytest.mark.parametrize('total', [False, True])
+@pytest.mark.parametrize('smart', [False, True])
+@pytest.mark.parametrize('plant', [False, True])
+@pytest.mark.parametrize('knuth', [0, 2, 3])
+def test_ordering_size(total, smart, plant, knuth):
+    for n in range(1, 6):
+        assert OrderingPrincipleSize(n, total, smart, plant, knuth) == \
+            build_size(OrderingPrinciple, n, total, smart, plant, knuth)
+    G = random_gnd(6, 3, seed=3)
+    assert GraphOrderingPrincipleSize(G, total, smart, plant, knuth) == \
+        build_size(GraphOrderingPrinciple, G, total, smart, plant, knuth)
+
+
+def test_counting_matching_size():
+    for M in range(1, 7):
+        for p in range(2, 4):
+            assert CountingPrincipleSize(M, p) == \
+                build_size(CountingPrinciple, M, p)
+    G = Graph.complete_graph(6)
+    assert PerfectMatchingPrincipleSize(G) == \
+        build_size(PerfectMatchingPrinciple, G)
+
+
+def test_ramsey_vdw_size():
+    assert RamseyNumberSize(3, 3, 6) == build_size(RamseyNumber, 3, 3, 6)
+    assert RamseyNumberSize(3, 4, 7) == build_size(RamseyNumber, 3, 4, 7)
+    assert VanDerWaerdenSize(9, 3, 3) == build_size(VanDerWaerden, 9, 3, 3)
+    assert VanDerWaerdenSize(10, 3, 4, 2) == build_size(VanDerWaerden, 10, 3, 4, 2)
+
+
+def test_random_size():
+    assert RandomKCNFSize(3, 10, 20) == \
+        build_size(RandomKCNF, 3, 10, 20, seed=1)
+    assert RandomKXORSize(4, 10, 5) == \
+        build_size(RandomKXOR, 4, 10, 5, seed=1)
+    assert RandomKXORSize(6, 10, 5, maxwidth=3) == \
+        build_size(RandomKXOR, 6, 10, 5, seed=1, maxwidth=3)
+
+
+@pytest.mark.parametrize('maxwidth', [None, 3, 4])
+def test_tseitin_coloring_size(maxwidth):
+    G = random_gnd(8, 5, seed=5)
+    assert TseitinFormulaSize(G, maxwidth=maxwidth) == \
+        build_size(TseitinFormula, G, maxwidth=maxwidth)
+    assert GraphColoringFormulaSize(G, 3) == \
+        build_size(GraphColoringFormula, G, 3)
+    assert GraphColoringFormulaSize(G, 3, functional=False) == \
+        build_size(GraphColoringFormula, G, 3, functional=False)
+
+
+def test_literal_budget():
+    class SmallCNF(CountingCNF):
+        literal_budget = 99
+    PigeonholePrinciple(4, 4, formula_class=SmallCNF)
+    with pytest.raises(ValueError):
+        PigeonholePrinciple(5, 4, formula_class=SmallCNF)
+
+
+def test_cli_size_only():
+    size = cnfgen(['cnfgen', '--size-only', 'php', '5', '4'], mode='formula')
+    assert size == FormulaSize(20, 45, 100)
+    text = cnfgen(['cnfgen', '--dry-run', 'kclique', '3', 'gnp', '10', '.5'],
+                  mode='string')
+    assert text.startswith('variables 30\n')
+
+
+def test_cli_size_notice(capsys):
+    cnfgen(['cnfgen', '--size-only', 'php', '5', '4'], mode='string')
+    assert capsys.readouterr().err == ''
+    cnfgen(['cnfgen', '--size-only', 'kclique', '3', 'gnp', '10', '.5'],
+           mode='string')
+    assert 'computed by building' in capsys.readouterr().err
+    cnfgen(['cnfgen', '-S', '1', '--size-only', 'tseitin', 'random',
+            'gnp', '12', '.1'], mode='string')
+    assert 'upper bound' in capsys.readouterr().err
+    cnfgen(['cnfgen', '-S', '1', '--size-only', 'tseitin', 'random',
+            'gnd', '8', '4'], mode='string')
+    assert capsys.readouterr().err == ''
+
+
+def test_cli_size_only_transformation():
+    expected = cnfgen(['cnfgen', 'op', '4', '-T', 'xor', '2'], mode='formula')
+    size = cnfgen(['cnfgen', '--dry-run', 'op', '4', '-T', 'xor', '2'],
+                  mode='formula')
+    assert size == expected.size()
+
+
+def test_cli_max_literals():
+    cnfgen(['cnfgen', '--max-literals', '100', 'php', '5', '4'], mode='formula')
+    for args in [['php', '5', '4'],
+                 ['kclique', '3', 'gnp', '10', '.5'],
+                 ['--dry-run', 'kclique', '3', 'gnp', '10', '.5'],
+                 ['op', '4', '-T', 'xor', '2']]:
+        with pytest.raises(CLIError):
+            cnfgen(['cnfgen', '--max-literals', '99'] + args, mode='formula')
+
+
+def test_cli_max_literals_before_building(monkeypatch):
+    cli = importlib.import_module('cnfgen.clitools.cnfgen')
+
+    class NoCNF(cli.CNF):
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("the formula should not be built")
+
+    monkeypatch.setattr(cli, 'CNF', NoCNF)
+    with pytest.raises(CLIError):
+        cnfgen(['cnfgen', '--max-literals', '99',
+                'kclique', '3', 'complete', '10'], mode='formula')
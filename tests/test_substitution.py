@@ -6,7 +6,7 @@ from cnfgen.transformations.substitutions import OrSubstitution, XorSubstitution
 from cnfgen.transformations.substitutions import AllEqualSubstitution, NotAllEqualSubstitution
 from cnfgen.transformations.substitutions import IfThenElseSubstitution
 from cnfgen.transformations.substitutions import ExactlyKSubstitution, ExactlyOneSubstitution
-from cnfgen.transformations.substitutions import FlipPolarity
+from cnfgen.transformations.substitutions import FlipPolarity, AndSubstitution
 from cnfgen.clitools import cnfgen, CLIError
 
 from tests.utils import assertCnfEqual,assertCnfEqualsIgnoreVariables
@@ -22,6 +22,15 @@ def test_or():
     assert lift.number_of_variables() == expected.number_of_variables()
     assert lift.clauses() == expected.clauses()
 
+def test_and():
+    cnf = CNF([[1, -2]])
+    lift = AndSubstitution(cnf, 2)
+    expected = CNF([
+        [1, -3, -4],
+        [2, -3, -4]])
+    assert lift.number_of_variables() == expected.number_of_variables()
+    assert lift.clauses() == expected.clauses()
+
 def test_xor():
     cnf = CNF([[1, -2]])
     lift = XorSubstitution(cnf, 2)